@@ -0,0 +1,81 @@
+"""
+Timing comparison: serial graph vs. parallel fan-out graph.
+
+Node bodies are replaced with sleeps that simulate provider latency, so the
+numbers isolate the effect of the graph topology (no API keys needed for the
+nodes themselves).
+
+    python benchmarks/graph_fanout.py --market 0.8 --news 1.5 --llm 2.0 --runs 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.main import build_workflow
+
+
+def simulated_nodes(market: float, news: float, technicals: float, llm: float):
+    def data_gatherer(state):
+        time.sleep(market)
+        return {"market_data": {"current_price": 100.0}, "price_history": None}
+
+    def technicals_node(state):
+        time.sleep(technicals)
+        return {"technicals": {"overall_signal": {"signal": "Hold"}}}
+
+    def news_node(state):
+        time.sleep(news)
+        return {"news": [{"title": "t", "url": "u", "content": "c"}]}
+
+    def analyst(state):
+        time.sleep(llm)
+        return {"analyst_draft": "draft", "recommendation": "Hold"}
+
+    def risk_manager(state):
+        time.sleep(llm)
+        return {"critique": "APPROVE", "revision_number": state.get("revision_number", 0) + 1}
+
+    return {
+        "data_gatherer": data_gatherer,
+        "technicals": technicals_node,
+        "news": news_node,
+        "analyst": analyst,
+        "risk_manager": risk_manager,
+    }
+
+
+def time_graph(app, runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        app.invoke({"ticker": "BENCH", "revision_number": 0, "max_revisions": 1, "errors": []})
+        durations.append(time.perf_counter() - start)
+    return sum(durations) / len(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--market", type=float, default=0.8, help="simulated yfinance latency (s)")
+    parser.add_argument("--news", type=float, default=1.5, help="simulated Tavily latency (s)")
+    parser.add_argument("--technicals", type=float, default=0.05, help="simulated indicator time (s)")
+    parser.add_argument("--llm", type=float, default=2.0, help="simulated Groq latency per call (s)")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    nodes = simulated_nodes(args.market, args.news, args.technicals, args.llm)
+    serial = build_workflow(parallel=False, nodes=nodes).compile()
+    parallel = build_workflow(parallel=True, nodes=nodes).compile()
+
+    serial_time = time_graph(serial, args.runs)
+    parallel_time = time_graph(parallel, args.runs)
+
+    print(f"serial   : {serial_time:.3f}s / run")
+    print(f"parallel : {parallel_time:.3f}s / run")
+    print(f"saved    : {serial_time - parallel_time:.3f}s ({(1 - parallel_time / serial_time) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
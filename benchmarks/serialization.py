@@ -0,0 +1,76 @@
+"""
+price_history on the wire: the old row-dict path (to_dict(orient='records') + FastAPI's jsonable_encoder + json)
+against columnar JSON (orjson), float32, gzip, Arrow IPC and Parquet.
+
+    python benchmarks/serialization.py --bars 126 --bars 1260 --bars 5040
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from src.tools.serialization import (
+    dumps, encode_arrow, encode_parquet, pa, price_history_columns, price_history_records
+)
+
+
+def synthetic_history(bars: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.005, bars)),
+        "High": close * (1 + rng.uniform(0, 0.02, bars)),
+        "Low": close * (1 - rng.uniform(0, 0.02, bars)),
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 50_000_000, bars),
+    }, index=pd.bdate_range(end="2024-06-28", periods=bars, name="Date"))
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return out, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bars", type=int, action="append", help="rows of OHLCV (repeatable; default 126 1260 5040)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for bars in args.bars or [126, 1260, 5040]:
+        df = synthetic_history(bars)
+        paths = {
+            "records + jsonable_encoder": lambda: json.dumps(jsonable_encoder(price_history_records(df))).encode(),
+            "columnar (orjson)": lambda: dumps(price_history_columns(df)),
+            "columnar float32": lambda: dumps(price_history_columns(df, float32=True)),
+            "columnar float32 + gzip": lambda: gzip.compress(dumps(price_history_columns(df, float32=True)), 6),
+        }
+        if pa is not None:
+            paths["arrow ipc"] = lambda: encode_arrow(df, {})
+            paths["arrow ipc float32"] = lambda: encode_arrow(df, {}, float32=True)
+            paths["parquet (zstd)"] = lambda: encode_parquet(df, {})
+
+        print(f"\n{bars} bars")
+        baseline_bytes = baseline_time = None
+        for name, fn in paths.items():
+            body, seconds = timed(fn, args.repeat)
+            baseline_bytes = baseline_bytes or len(body)
+            baseline_time = baseline_time or seconds
+            print(f"  {name:28s} {len(body):>10,d} B ({len(body) / baseline_bytes:6.1%})"
+                  f"  {seconds * 1000:8.2f} ms ({baseline_time / seconds:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Offline end-to-end benchmarks: the compiled graph, calculate_technicals and the API endpoints, run against
+recorded provider fixtures (yfinance / Tavily / Groq, with their latencies) under controlled concurrency.
+Reports p50 / p95 latency, throughput and peak traced memory per scenario; compares against a baseline.
+
+    python benchmarks/suite.py                                  # synthetic fixtures, every scenario
+    python benchmarks/suite.py --fixtures benchmarks/fixtures --latency-scale 0.2 --concurrency 8 --runs 40
+    python benchmarks/suite.py --json current.json --baseline baseline.json --tolerance 0.25   # exit 1 on regression
+    python benchmarks/suite.py --record NVDA AAPL MSFT          # live run that writes the fixtures (needs API keys)
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Keep every on-disk store out of the working tree (and a developer's warm caches out of the numbers)
+_scratch = tempfile.mkdtemp(prefix="bench-")
+for _var, _name in (("RESULTS_STORE_PATH", "results.sqlite"), ("CHECKPOINT_PATH", "checkpoints.sqlite"),
+                    ("MARKET_CACHE_PATH", "market_data.sqlite"), ("LLM_CACHE_PATH", "llm_responses.sqlite"),
+                    ("PRICE_STORE_PATH", "prices")):
+    os.environ[_var] = os.path.join(_scratch, _name)
+
+import numpy as np
+
+from src.tools.replay import (
+    REPLAY_FIXTURES_PATH, FixtureStore, record_providers, replay_providers, synthetic_fixtures
+)
+
+DEFAULT_TICKERS = ["NVDA", "AAPL", "MSFT", "AMZN", "GOOGL", "META", "TSLA", "AMD"]
+
+
+def initial_state(ticker: str, max_revisions: int) -> dict:
+    return {"ticker": ticker, "revision_number": 0, "max_revisions": max_revisions, "errors": []}
+
+
+def summarize(latencies, wall: float) -> dict:
+    latencies = np.asarray(latencies)
+    return {
+        "runs": int(len(latencies)),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+        "mean_ms": round(float(latencies.mean()) * 1000, 2),
+        "throughput_per_s": round(len(latencies) / wall, 2),
+    }
+
+
+def peak_memory_mb(workload) -> float:
+    """Peak Python heap during one extra pass of `workload` (traced separately so timings stay clean)."""
+    tracemalloc.start()
+    try:
+        workload()
+        return round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+    finally:
+        tracemalloc.stop()
+
+
+# --- scenarios: each returns (latencies, wall seconds) for `runs` calls at `concurrency` ---
+
+async def _gather_limited(calls, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(call):
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(call) for call in calls))
+    return latencies, time.perf_counter() - start
+
+
+def bench_graph(tickers, runs: int, concurrency: int, max_revisions: int):
+    from src.main import get_app
+
+    app = get_app()
+    calls = [lambda t=tickers[i % len(tickers)]: app.ainvoke(initial_state(t, max_revisions)) for i in range(runs)]
+    return asyncio.run(_gather_limited(calls, concurrency))
+
+
+def bench_technicals(histories, runs: int, concurrency: int):
+    from src.tools.technicals import calculate_technicals
+
+    frames = list(histories.values())
+
+    def one(i):
+        start = time.perf_counter()
+        calculate_technicals(frames[i % len(frames)])
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(one, range(runs)))
+    return latencies, time.perf_counter() - start
+
+
+def bench_api(tickers, runs: int, concurrency: int, max_revisions: int):
+    import httpx
+    from src import api
+
+    async def main():
+        transport = httpx.ASGITransport(app=api.api)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            async def analyze(i):
+                # Distinct max_revisions per wave keeps identical requests from coalescing onto one run
+                ticker = tickers[i % len(tickers)]
+                response = await client.post("/analyze", json={"ticker": ticker, "max_revisions": max_revisions + i // len(tickers)})
+                response.raise_for_status()
+
+            return await _gather_limited([lambda i=i: analyze(i) for i in range(runs)], concurrency)
+
+    return asyncio.run(main())
+
+
+def bench_api_latest(tickers, runs: int, concurrency: int, max_revisions: int):
+    import httpx
+    from src import api
+
+    store = api.get_results_store()
+    stored = [t for t in tickers if store.latest(t, max_age=86400)]
+    if not stored:  # run on its own (--only api_latest): store one analysis per ticker first, untimed
+        bench_api(tickers, len(tickers), concurrency, max_revisions)
+        stored = [t for t in tickers if store.latest(t, max_age=86400)]
+
+    async def main():
+        transport = httpx.ASGITransport(app=api.api)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def latest(i):
+                response = await client.get(f"/analysis/{stored[i % len(stored)]}/latest?max_age=86400")
+                response.raise_for_status()
+
+            return await _gather_limited([lambda i=i: latest(i) for i in range(runs)], concurrency)
+
+    return asyncio.run(main())
+
+
+def run_suite(fixtures: FixtureStore, args) -> dict:
+    tickers = [t for t in args.tickers if t in fixtures.market] or sorted(fixtures.market)
+    histories = {t: fixtures.market[t]["history"] for t in tickers}
+    scenarios = {
+        "graph": lambda runs: bench_graph(tickers, runs, args.concurrency, args.max_revisions),
+        "technicals": lambda runs: bench_technicals(histories, runs, args.concurrency),
+        "api_analyze": lambda runs: bench_api(tickers, runs, args.concurrency, args.max_revisions),
+        # reads what api_analyze stored (only tickers it got to), seeding the store when run alone
+        "api_latest": lambda runs: bench_api_latest(tickers, runs, args.concurrency, args.max_revisions),
+    }
+    runs = {"technicals": args.runs * 10, "api_latest": args.runs * 10}
+    results = {}
+    quiet = contextlib.redirect_stdout(io.StringIO()) if not args.verbose else contextlib.nullcontext()
+    with replay_providers(fixtures, latency_scale=args.latency_scale):
+        for name, scenario in scenarios.items():
+            if args.only and name not in args.only:
+                continue
+            n = runs.get(name, args.runs)
+            with quiet:
+                latencies, wall = scenario(n)
+                peak = peak_memory_mb(lambda: scenario(min(n, args.concurrency)))
+            results[name] = {**summarize(latencies, wall), "peak_mb": peak}
+    results["_replay"] = dict(fixtures.stats)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Scenarios whose p95 grew, or whose throughput fell, by more than `tolerance` (fraction)."""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if name.startswith("_") or not before:
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']} -> {current['p95_ms']} ms")
+        if current["throughput_per_s"] < before["throughput_per_s"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['throughput_per_s']} -> {current['throughput_per_s']}/s")
+    return regressions
+
+
+def record(tickers, path: str, max_revisions: int):
+    from src.main import get_app
+
+    with record_providers(path) as fixtures:
+        for ticker in tickers:
+            get_app().invoke(initial_state(ticker, max_revisions))
+    print(f"recorded {len(fixtures.market)} tickers, {len(fixtures.news)} searches, "
+          f"{len(fixtures.llm)} LLM responses -> {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help=f"recorded fixture directory (e.g. {REPLAY_FIXTURES_PATH}); synthetic if omitted")
+    parser.add_argument("--tickers", nargs="+", default=DEFAULT_TICKERS)
+    parser.add_argument("--runs", type=int, default=24, help="graph / API runs per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--max-revisions", type=int, default=2)
+    parser.add_argument("--latency-scale", type=float, default=0.2, help="multiplier on recorded provider latency")
+    parser.add_argument("--only", nargs="+", help="subset of scenarios: graph technicals api_analyze api_latest")
+    parser.add_argument("--json", help="write results here")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--record", nargs="*", metavar="TICKER", help="record live fixtures instead of benchmarking")
+    parser.add_argument("--verbose", action="store_true", help="keep the pipeline's own logging")
+    args = parser.parse_args()
+
+    if args.record is not None:
+        record(args.record or args.tickers, args.fixtures or REPLAY_FIXTURES_PATH, args.max_revisions)
+        return
+
+    fixtures = FixtureStore.load(args.fixtures) if args.fixtures else synthetic_fixtures(args.tickers)
+    results = run_suite(fixtures, args)
+
+    print(f"fixtures: {args.fixtures or 'synthetic'}  concurrency: {args.concurrency}  latency x{args.latency_scale}")
+    print(f"{'scenario':12s} {'runs':>5s} {'p50 ms':>9s} {'p95 ms':>9s} {'mean ms':>9s} {'per s':>8s} {'peak MB':>8s}")
+    for name, r in results.items():
+        if not name.startswith("_"):
+            print(f"{name:12s} {r['runs']:5d} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['mean_ms']:9.2f} "
+                  f"{r['throughput_per_s']:8.2f} {r['peak_mb']:8.2f}")
+    print(f"replay: {results['_replay']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
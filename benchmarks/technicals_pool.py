@@ -0,0 +1,77 @@
+"""
+calculate_technicals for a multi-ticker batch through the async technicals path: in-process (thread) vs. the
+process pool at 1, 2, 4, 8 workers. Reports wall time, throughput and how late a 10 ms event-loop heartbeat
+fires while the batch runs (the GIL contention the pool is there to remove).
+
+    python benchmarks/technicals_pool.py --tickers 64 --bars 1260 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from benchmarks.technicals_batch import synthetic_histories
+from src.tools import compute_pool
+
+HEARTBEAT_SECONDS = 0.01
+
+
+async def run_batch(frames, workers: int, concurrency: int):
+    """Returns (wall seconds, heartbeat lateness samples in seconds)."""
+    lateness, done = [], asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            lateness.append(time.perf_counter() - start - HEARTBEAT_SECONDS)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(df):
+        async with semaphore:
+            await compute_pool.acompute_technicals(df, workers=workers)
+
+    beat = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*(one(df) for df in frames))
+    wall = time.perf_counter() - start
+    done.set()
+    await beat
+    return wall, lateness
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=64)
+    parser.add_argument("--bars", type=int, default=1260)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--concurrency", type=int, default=16, help="technicals calls in flight")
+    args = parser.parse_args()
+
+    frames = list(synthetic_histories(args.tickers, args.bars).values())
+    print(f"{args.tickers} tickers x {args.bars} bars, {args.concurrency} in flight, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8s} {'warm-up s':>10s} {'wall s':>8s} {'per s':>8s} {'speedup':>8s} {'loop lag p95 ms':>16s} {'max ms':>8s}")
+
+    baseline = None
+    for workers in [0] + args.workers:
+        start = time.perf_counter()
+        compute_pool.warm_up(workers)
+        warm = time.perf_counter() - start
+        wall, lateness = asyncio.run(run_batch(frames, workers, args.concurrency))
+        compute_pool.shutdown_technicals_pool()
+
+        baseline = baseline or wall
+        lag = np.asarray(lateness or [0.0]) * 1000
+        label = "thread" if workers == 0 else str(workers)
+        print(f"{label:>8s} {warm:10.2f} {wall:8.2f} {len(frames) / wall:8.1f} {baseline / wall:7.2f}x "
+              f"{np.percentile(lag, 95):16.1f} {lag.max():8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,95 +1,176 @@
-import os
-from langchain_groq import ChatGroq 
+import re
 from langchain_core.messages import SystemMessage, HumanMessage
 from src.agents.state import AgentState
+from src.agents.llm import get_llm
+from src.agents.context import CONTEXT_TOKEN_BUDGET, build_context
+from src.tools.llm_cache import ainvoke_cached, invoke_cached
 
-# Initialize LLM
-llm = ChatGroq(
-    api_key=os.getenv("GROQ_API_KEY"),
-    model="llama-3.3-70b-versatile",
-    temperature=0.2 
+
+SECTIONS = ["Executive Summary", "Fundamental Deep Dive", "Technical Analysis", "Sentiment & News", "Risks"]
+
+# Markdown headings only (the prompt asks for `###`): a prose line that starts with a section name is not one
+_HEADING = re.compile(
+    r"^\s*#{1,6}\s*(?:\d+\.\s*)?(?:\*\*)?\s*(" + "|".join(re.escape(name) for name in SECTIONS) + r")\b",
+    re.IGNORECASE
 )
 
-def analyst_node(state: AgentState):
-    """
-    The 'Brain' of the operation.
-    Reads structured data and writes a draft analysis.
+# Which memo sections a piece of risk feedback points at
+_SECTION_KEYWORDS = {
+    "Executive Summary": ["call", "buy", "sell", "hold", "confidence", "tone", "target", "aggressive", "conviction"],
+    "Fundamental Deep Dive": ["p/e", "valuation", "growth", "margin", "debt", "balance sheet", "cash flow", "fundamental"],
+    "Technical Analysis": ["rsi", "macd", "technical", "signal", "overbought", "oversold", "momentum", "trend"],
+    "Sentiment & News": ["news", "sentiment", "headline", "source", "article"],
+    "Risks": ["risk", "bear case", "downside"],
+}
+
+
+ANALYST_SYSTEM_PROMPT = """You are a veteran hedge fund portfolio manager writing a high-conviction investment memo.
+Rules:
+1. Be decisive: BUY, SELL or HOLD. A low-confidence Hold is a failure.
+2. Cite the provided metrics (P/E, margins, debt).
+3. Cite news by number, e.g. "According to Reuters [1]".
+4. Never say you lack data; infer missing metrics from sector and price action.
+5. Give a confidence score (0-100%); below 50% is unacceptable.
+Format, with these `###` headings:
+### Executive Summary - lines `The Call: BUY/SELL/HOLD` and `Confidence Score: NN%`, then the target price rationale.
+### Fundamental Deep Dive - valuation, growth, balance sheet.
+### Technical Analysis - price action, RSI, MACD.
+### Sentiment & News - key headlines and their impact.
+### Risks - the bear case.
+Tone: professional, objective, data-driven."""
+
+
+def build_analyst_messages(state: AgentState):
     """
-    ticker = state["ticker"]
-    prices = state["market_data"]
-    techs = state["technicals"]
-    news = state["news"]
-    
-    print(f"--- ANALYST ANALYZING: {ticker} ---")
-    
-    # 1. Construct the Context 
-    context = f"""
-    TICKER: {ticker}
-    
-    --- MARKET DATA & FUNDAMENTALS ---
-    Current Price: ${prices.get('current_price', 'N/A')}
-    Market Cap: {prices.get('market_cap', 'N/A')}
-    P/E Ratio: {prices.get('pe_ratio', 'N/A')}
-    Forward P/E: {prices.get('forward_pe', 'N/A')}
-    
-    Revenue Growth: {prices.get('revenue_growth', 'N/A')}
-    Profit Margins: {prices.get('profit_margins', 'N/A')}
-    Debt to Equity: {prices.get('debt_to_equity', 'N/A')}
-    Free Cash Flow: {prices.get('free_cash_flow', 'N/A')}
-    Return on Equity: {prices.get('return_on_equity', 'N/A')}
-    
-    --- TECHNICAL ANALYSIS ---
-    RSI: {techs.get('momentum', {}).get('rsi', {}).get('value', 'N/A')} ({techs.get('momentum', {}).get('rsi', {}).get('signal', 'N/A')})
-    MACD: {techs.get('trend', {}).get('macd', {}).get('trend', 'N/A')}
-    Overall Signal: {techs.get('overall_signal', {}).get('signal', 'Unknown')}
-    Confidence: {techs.get('overall_signal', {}).get('confidence', '0%')}
-    
-    --- RECENT NEWS & SENTIMENT ---
+    Builds the system + human messages for the analyst from the gathered data.
+    Returns (messages, context token count); the data context is kept within the token budget.
     """
-    
-
-    if isinstance(news, list):
-        for i, article in enumerate(news[:5]): 
-            title = article.get('title', 'No Title')
-            url = article.get('url', 'No URL')
-            content = article.get('content', 'No content available')
-            context += f"\nArticle {i+1}: {title}\nSource: {url}\nSummary: {content[:400]}...\n"
-    else:
-        context += f"\nNo specific news data available.\n"
-
-   
-    system_prompt = """You are a veteran Hedge Fund Portfolio Manager with 20 years of experience. 
-    Your job is to produce a high-conviction investment memorandum.
-
-    ### INSTRUCTIONS:
-    1. **BE DECISIVE:** You must output a distinct signal: BUY, SELL, or HOLD. A "Hold" with low confidence is a failure.
-    2. **USE THE DATA:** You have been provided with specific financial metrics (P/E, Margins, Debt). Cite them in your analysis.
-    3. **CITE SOURCES:** You have news articles with URLs. Explicitly reference them (e.g., "According to Reuters [Source 1]...").
-    4. **NO EXCUSES:** Never say "I lack data." If a metric is missing, make a reasonable inference based on the sector and price action.
-    5. **CONFIDENCE SCORE:** You must provide a confidence score (0-100%). Scores below 50% are unacceptable; dig deeper to form a view.
-
-    ### FORMAT:
-    Structure your response as a professional Wall Street Memo:
-    1. **Executive Summary:** The Call (Buy/Sell) and the Target Price rationale.
-    2. **Fundamental Deep Dive:** Analysis of Valuation (P/E), Growth, and Balance Sheet health.
-    3. **Technical Analysis:** Price action, RSI, and MACD trends.
-    4. **Sentiment & News:** Summary of key headlines and their potential impact.
-    5. **Risks:** The bear case (e.g., high debt, falling margins).
-    
-    Tone: Professional, objective, and data-driven."""
+    context, context_tokens = build_context(state)
+    human_message = f"Latest data for {state['ticker']}. Write the analysis.\n\n{context}"
+    critique = state.get("critique") or ""
+    if critique and not critique.startswith("APPROVE"):
+        # Full rewrite of a rejected draft
+        human_message += f"\n\nThe Risk Manager rejected your previous memo:\n{critique}"
 
-    human_message = f"Here is the latest data for {ticker}. Write the analysis.\n\nData Context:\n{context}"
-    
-  
     messages = [
-        SystemMessage(content=system_prompt),
+        SystemMessage(content=ANALYST_SYSTEM_PROMPT),
         HumanMessage(content=human_message)
     ]
-    
-    response = llm.invoke(messages)
-    
-   
+    return messages, context_tokens
+
+
+def split_sections(draft: str):
+    """
+    Splits a memo into [(section name or "" for the preamble, text)] on the FORMAT headings.
+    Each text includes its heading line, so joining the texts gives back the draft.
+    """
+    sections = [("", [])]
+    for line in draft.splitlines(keepends=True):
+        match = _HEADING.match(line)
+        if match:
+            name = next(n for n in SECTIONS if n.lower() == match.group(1).lower())
+            sections.append((name, []))
+        sections[-1][1].append(line)
+    return [(name, "".join(lines)) for name, lines in sections if name or "".join(lines).strip()]
+
+
+def has_sections(text: str) -> bool:
+    return any(name for name, _ in split_sections(text))
+
+
+def merge_sections(draft: str, revised: str) -> str:
+    """Replaces the sections of `draft` that appear in `revised`; unknown new sections are appended."""
+    replacements = {name: text for name, text in split_sections(revised) if name}
+    merged = []
+    for name, text in split_sections(draft):
+        text = replacements.pop(name, text)
+        merged.append(text if text.endswith("\n") else text + "\n")
+    merged.extend(text for text in replacements.values())
+    return "".join(merged).rstrip("\n") + "\n"
+
+
+def affected_sections(critique: str):
+    """Memo sections the risk manager's feedback points at (Executive Summary when nothing matches)."""
+    hits = [
+        name for name, words in _SECTION_KEYWORDS.items()
+        if any(re.search(r"\b" + re.escape(w) + r"\b", critique, re.IGNORECASE) for w in words)
+    ]
+    return hits or ["Executive Summary"]
+
+
+def needs_targeted_revision(state: AgentState) -> bool:
+    """A rejected draft that parses into FORMAT sections is patched instead of rewritten."""
+    critique = state.get("critique") or ""
+    draft = state.get("analyst_draft") or ""
+    if not critique or critique.startswith("APPROVE") or not draft:
+        return False
+    return has_sections(draft)
+
+
+def build_revision_messages(state: AgentState):
+    """
+    Messages for a targeted revision: the critique, the sections it touches and only the data they need.
+    Much shorter than the full prompt, and the model sees exactly what was wrong. Returns (messages, context tokens).
+    """
+    targets = affected_sections(state["critique"])
+    current = {name: text for name, text in split_sections(state["analyst_draft"]) if name}
+    previous = "\n".join(current.get(name, f"### {name}\n(missing)\n") for name in targets)
+
+    system_prompt = f"""You are a veteran Hedge Fund Portfolio Manager revising your own investment memo.
+    The Risk Manager rejected it. Rewrite ONLY these sections: {", ".join(targets)}.
+    Start each section with its name as a `###` heading and output nothing else.
+    Keep the lines `The Call: BUY/SELL/HOLD` and `Confidence Score: NN%` if you rewrite the Executive Summary.
+    Tone: Professional, objective, and data-driven."""
+
+    context, context_tokens = build_context(state, include_news="Sentiment & News" in targets)
+    human_message = (
+        f"Risk Manager feedback:\n{state['critique']}\n\n"
+        f"Sections to rewrite:\n{previous}\n\n"
+        f"Data:\n{context}"
+    )
+    return [SystemMessage(content=system_prompt), HumanMessage(content=human_message)], context_tokens
+
+
+def _analyst_update(state: AgentState, draft: str, context_tokens: int):
+    print(f"Analyst context: {context_tokens} tokens (budget {CONTEXT_TOKEN_BUDGET})")
     return {
-        "analyst_draft": response.content,
-        "recommendation": techs.get('overall_signal', {}).get('signal', 'Hold')
+        "analyst_draft": draft,
+        "recommendation": state["technicals"].get('overall_signal', {}).get('signal', 'Hold'),
+        "context_tokens": context_tokens
     }
+
+
+def analyst_node(state: AgentState):
+    """
+    The 'Brain' of the operation.
+    Reads structured data and writes a draft analysis.
+    On a revision, only the sections the critique points at are rewritten and merged back.
+    """
+    llm = get_llm(temperature=0.2)
+    if needs_targeted_revision(state):
+        print(f"--- ANALYST REVISING: {state['ticker']} ---")
+        messages, context_tokens = build_revision_messages(state)
+        revised = invoke_cached(llm, messages)
+        if has_sections(revised):
+            return _analyst_update(state, merge_sections(state["analyst_draft"], revised), context_tokens)
+        print("Revision came back without section headings, rewriting the full memo")
+
+    print(f"--- ANALYST ANALYZING: {state['ticker']} ---")
+    messages, context_tokens = build_analyst_messages(state)
+    return _analyst_update(state, invoke_cached(llm, messages), context_tokens)
+
+
+async def analyst_node_async(state: AgentState):
+    """Async twin of analyst_node (used by app.ainvoke / the API)."""
+    llm = get_llm(temperature=0.2)
+    if needs_targeted_revision(state):
+        print(f"--- ANALYST REVISING: {state['ticker']} ---")
+        messages, context_tokens = build_revision_messages(state)
+        revised = await ainvoke_cached(llm, messages)
+        if has_sections(revised):
+            return _analyst_update(state, merge_sections(state["analyst_draft"], revised), context_tokens)
+        print("Revision came back without section headings, rewriting the full memo")
+
+    print(f"--- ANALYST ANALYZING: {state['ticker']} ---")
+    messages, context_tokens = build_analyst_messages(state)
+    return _analyst_update(state, await ainvoke_cached(llm, messages), context_tokens)
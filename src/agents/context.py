@@ -0,0 +1,135 @@
+import math
+import os
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# Token-budgeted data context for the analyst prompt.
+# Numbers go in as one compact table (always included), then articles are added in
+# relevance x recency order, near-duplicates dropped, until the budget is spent.
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("ANALYST_CONTEXT_TOKENS", "700"))
+ARTICLE_TOKEN_CAP = int(os.getenv("ANALYST_ARTICLE_TOKENS", "110"))   # per article snippet
+MAX_ARTICLES = 5
+NEWS_HALF_LIFE_DAYS = 3.0
+DUPLICATE_SIMILARITY = 0.6  # Jaccard over word trigrams
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Tokenizer-free estimate of Llama/BPE tokens: one per punctuation mark, one per 4 characters of each word.
+    Rough, but stable and offline, which is what a budget needs.
+    """
+    return sum(math.ceil(len(tok) / 4) for tok in _TOKEN.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts `text` at a word boundary so it fits in `max_tokens`."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    used, end = 0, 0
+    for match in _TOKEN.finditer(text):
+        used += math.ceil(len(match.group()) / 4)
+        if used > max_tokens - 1:  # keep room for the ellipsis
+            break
+        end = match.end()
+    return text[:end].rstrip() + "…"
+
+
+def _age_days(article: Dict[str, Any], now: datetime) -> Optional[float]:
+    published = article.get("published_date")
+    if not published:
+        return None
+    try:
+        when = datetime.fromisoformat(str(published).replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            when = datetime.strptime(str(published), "%a, %d %b %Y %H:%M:%S %Z")
+        except ValueError:
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((now - when).total_seconds() / 86400, 0.0)
+
+
+def rank_articles(news: List[Dict[str, Any]], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Orders articles by Tavily relevance score weighted by recency (undated articles get a neutral weight)."""
+    now = now or datetime.now(timezone.utc)
+
+    def weight(article):
+        age = _age_days(article, now)
+        recency = 0.5 if age is None else 0.5 ** (age / NEWS_HALF_LIFE_DAYS)
+        return float(article.get("score") or 0) * (0.5 + recency)
+
+    return sorted((a for a in news if "error" not in a), key=weight, reverse=True)
+
+
+def _shingles(text: str) -> set:
+    words = re.findall(r"\w+", text.lower())
+    return {tuple(words[i:i + 3]) for i in range(max(len(words) - 2, 1))}
+
+
+def dedupe_articles(articles: List[Dict[str, Any]], threshold: float = DUPLICATE_SIMILARITY) -> List[Dict[str, Any]]:
+    """Drops articles whose title + snippet nearly repeats a higher-ranked one (syndicated wire copies)."""
+    kept, seen = [], []
+    for article in articles:
+        shingles = _shingles(f"{article.get('title', '')} {article.get('content', '')}")
+        if any(len(shingles & other) / len(shingles | other) >= threshold for other in seen if shingles | other):
+            continue
+        kept.append(article)
+        seen.append(shingles)
+    return kept
+
+
+def numeric_table(state: Dict[str, Any]) -> str:
+    """Fundamentals and indicator readings as a compact `Metric|Value` table; N/A rows are left out."""
+    prices = state.get("market_data") or {}
+    techs = state.get("technicals") or {}
+    rsi = techs.get("momentum", {}).get("rsi", {})
+    macd = techs.get("trend", {}).get("macd", {})
+    overall = techs.get("overall_signal", {})
+
+    rows = [
+        ("Price", f"${prices['current_price']}" if prices.get("current_price") is not None else None),
+        ("Mkt Cap", prices.get("market_cap")),
+        ("P/E", prices.get("pe_ratio")),
+        ("Fwd P/E", prices.get("forward_pe")),
+        ("Rev Growth", prices.get("revenue_growth")),
+        ("Margin", prices.get("profit_margins")),
+        ("Debt/Eq", prices.get("debt_to_equity")),
+        ("FCF", prices.get("free_cash_flow")),
+        ("ROE", prices.get("return_on_equity")),
+        ("RSI", f"{rsi['value']} {rsi.get('signal', '')}".strip() if "value" in rsi else None),
+        ("MACD", macd.get("trend")),
+        ("Tech Signal", f"{overall['signal']} ({overall.get('confidence', '0%')})" if "signal" in overall else None),
+    ]
+    lines = ["Metric|Value"] + [f"{name}|{value}" for name, value in rows if value not in (None, "N/A")]
+    return "\n".join(lines)
+
+
+def build_context(state: Dict[str, Any], include_news: bool = True,
+                  budget: int = CONTEXT_TOKEN_BUDGET) -> Tuple[str, int]:
+    """
+    The analyst's data context within `budget` tokens. Returns (context, token count).
+    The numeric table always goes in; articles fill what is left, best first.
+    """
+    context = f"TICKER: {state['ticker']}\n{numeric_table(state)}"
+    used = count_tokens(context)
+
+    news = state.get("news")
+    if include_news and isinstance(news, list):
+        articles = dedupe_articles(rank_articles(news))[:MAX_ARTICLES]
+        lines = []
+        for i, article in enumerate(articles, 1):
+            header = f"[{i}] {article.get('title', 'No Title')} ({article.get('url', 'No URL')})"
+            room = min(ARTICLE_TOKEN_CAP, budget - used - count_tokens(header) - 2)
+            if room < 20:  # not worth a stub
+                break
+            line = f"{header}\n{truncate_to_tokens(article.get('content', ''), room)}"
+            lines.append(line)
+            used += count_tokens(line) + 1
+        context += "\nNEWS:\n" + ("\n".join(lines) if lines else "No specific news data available.")
+
+    return context, count_tokens(context)
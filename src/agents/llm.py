@@ -0,0 +1,29 @@
+import os
+from functools import lru_cache
+from src.tools.http_pool import on_close
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+
+@lru_cache(maxsize=None)
+def get_llm(temperature: float, model: str = DEFAULT_MODEL):
+    """
+    Shared ChatGroq client per (model, temperature), built on first use.
+    Importing langchain_groq and reading credentials is deferred so importing the app stays cheap.
+    """
+    from dotenv import load_dotenv
+    from langchain_groq import ChatGroq
+    from src.tools.http_pool import get_async_client, get_sync_client
+
+    load_dotenv()
+    return ChatGroq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        model=model,
+        temperature=temperature,
+        max_retries=0,  # 429 retries are handled by the rate-limit scheduler (src/tools/rate_limit.py)
+        http_client=get_sync_client("groq"),
+        http_async_client=get_async_client("groq")
+    )
+
+
+on_close(get_llm.cache_clear)
@@ -1,37 +1,76 @@
+import asyncio
 from src.agents.state import AgentState
 from src.tools.market_data import fetch_market_data
-from src.tools.technicals import calculate_technicals
-from src.tools.news import get_market_news
+from src.tools.compute_pool import acompute_technicals, compute_technicals
+from src.tools.news import aget_market_news, get_market_news
+from src.tools.limits import astage_slot, stage_slot
+from src.tools.price_store import as_frame, get_price_store
 
 
+def _prefetched_history(state: AgentState):
+    # Batch runs pre-load history with one bulk download
+    prefetched = as_frame(state.get("price_history"))
+    if prefetched is not None and getattr(prefetched, "empty", True):
+        prefetched = None
+    return prefetched
+
+def _market_data_update(result: dict) -> dict:
+    if "error" in result:
+        return {"errors": [result["error"]]}
+        
+
+    history_df = result.pop("history_df", None)
+    price_history = history_df
+
+    # The state carries a handle to the memory-mapped copy, not the frame (see src/tools/price_store.py)
+    store = get_price_store()
+    if store is not None and history_df is not None and not history_df.empty:
+        try:
+            price_history = store.put(result["ticker"], history_df)
+        except Exception as e:
+            print(f"Price store unavailable, keeping the DataFrame in the state: {e}")
+
+    return {
+        "market_data": result,    
+        "price_history": price_history 
+    }
+
 def market_data_node(state: AgentState):
     """
     1. Fetches market data (Price, Volume, Peers).
     2. Updates the state with 'market_data' (for the LLM).
-    3. Stores the raw 'price_history' DataFrame (for the Technical Analysis node).
+    3. Stores 'price_history' (for the Technical Analysis node): a PriceHandle, or the DataFrame without a price store.
     """
     ticker = state["ticker"]
-    
-  
-    result = fetch_market_data(ticker)
-    
+    prefetched = _prefetched_history(state)
 
-    if "error" in result:
-        return {"errors": [result["error"]]}
-        
+    with stage_slot("market_data"):
+        result = fetch_market_data(ticker, history=prefetched)
 
-    history_df = result.pop("history_df", None)
-    
+    return _market_data_update(result)
+
+async def market_data_node_async(state: AgentState):
+    """Async twin of market_data_node. yfinance has no async API, so the fetch runs in a thread."""
+    ticker = state["ticker"]
+    prefetched = _prefetched_history(state)
+
+    async with astage_slot("market_data"):
+        result = await asyncio.to_thread(fetch_market_data, ticker, prefetched)
+
+    return _market_data_update(result)
+
+def _technicals_update(tech_metrics: dict) -> dict:
+    if "error" in tech_metrics:
+        return {"errors": [tech_metrics["error"]]}
 
     return {
-        "market_data": result,    
-        "price_history": history_df 
+        "technicals": tech_metrics
     }
 
 def technical_analysis_node(state: AgentState):
     """
-    1. Reads the 'price_history' dataframe from the state.
-    2. Calculates technical indicators (RSI, MACD, etc.).
+    1. Reads 'price_history' from the state (PriceHandle or DataFrame).
+    2. Calculates technical indicators (RSI, MACD, etc.), on the process pool if TECHNICALS_WORKERS is set.
     3. Updates 'technicals' in the state.
     """
 
@@ -43,16 +82,30 @@ def technical_analysis_node(state: AgentState):
     print(f"--- ANALYZING TECHNICALS FOR: {state['ticker']} ---")
 
 
-    tech_metrics = calculate_technicals(history_df)
-    
-    if "error" in tech_metrics:
-        return {"errors": [tech_metrics["error"]]}
+    tech_metrics = compute_technicals(history_df)
+
+    return _technicals_update(tech_metrics)
+
+async def technical_analysis_node_async(state: AgentState):
+    """Async twin of technical_analysis_node: the indicator math runs in a worker process (or thread), off the loop."""
+    history_df = state.get("price_history")
+
+    if history_df is None or history_df.empty:
+        return {"errors": ["No price history found for technical analysis"]}
+
+    print(f"--- ANALYZING TECHNICALS FOR: {state['ticker']} ---")
+
+    return _technicals_update(await acompute_technicals(history_df))
+
+
+def _news_update(news_items: list) -> dict:
+    if news_items and "error" in news_items[0]:
+         return {"errors": [news_items[0]['error']]}
 
     return {
-        "technicals": tech_metrics
+        "news": news_items
     }
 
-
 def news_gatherer_node(state: AgentState):
     """
     1. Searches for news based on the ticker.
@@ -62,14 +115,19 @@ def news_gatherer_node(state: AgentState):
 
     query = f"{ticker} stock news analysis market trends"
 
-    news_items = get_market_news(query)
+    with stage_slot("news"):
+        news_items = get_market_news(query)
 
-    if news_items and "error" in news_items[0]:
-         return {"errors": [news_items[0]['error']]}
+    return _news_update(news_items)
 
-    return {
-        "news": news_items
-    }
+async def news_gatherer_node_async(state: AgentState):
+    """Async twin of news_gatherer_node (pooled async Tavily client)."""
+    query = f"{state['ticker']} stock news analysis market trends"
+
+    async with astage_slot("news"):
+        news_items = await aget_market_news(query)
+
+    return _news_update(news_items)
 
 
 def analyst_node(state: AgentState):
@@ -1,21 +1,15 @@
-import os
-from langchain_groq import ChatGroq 
 from langchain_core.messages import SystemMessage, HumanMessage
 from src.agents.state import AgentState
+from src.agents.llm import get_llm
+from src.agents.risk_rules import evaluate_rules
+from src.tools.llm_cache import ainvoke_cached, invoke_cached
 
-llm = ChatGroq(
-    api_key=os.getenv("GROQ_API_KEY"),
-    model="llama-3.3-70b-versatile",
-    temperature=0.0 
-)
 
-def risk_manager_node(state: AgentState):
+def build_review_messages(state: AgentState, checks=None):
     """
-    Reviews the Analyst's draft for logical inconsistencies or hallucinations.
-    Decides if the report is safe to publish or needs revision.
+    Builds the system + human messages for the risk review.
+    `checks` are the judgement items left open by the rule pre-check; the numeric rules are not re-asked.
     """
-    print("--- RISK MANAGER REVIEWING DRAFT ---")
-    
     draft = state["analyst_draft"]
     technicals = state["technicals"]
     prices = state["market_data"]
@@ -23,15 +17,16 @@ def risk_manager_node(state: AgentState):
 
     tech_signal = technicals.get('overall_signal', {}).get('signal', 'Unknown')
     rsi = technicals.get('momentum', {}).get('rsi', {}).get('value', 'N/A')
+    if checks is None:
+        checks = evaluate_rules(draft, technicals)["judgement"]
+    rules = "\n    ".join(f"{i}. {check}" for i, check in enumerate(checks, 1))
     
     system_prompt = f"""You are a Risk Manager at a hedge fund. 
     Your job is to validate the Analyst's investment memo.
+    The RSI rules have already been checked. Judge ONLY the points below.
     
-    HARD RULES:
-    1. If the Analyst recommends 'BUY' but RSI is > 70 (Overbought), REJECT it.
-    2. If the Analyst recommends 'SELL' but RSI is < 30 (Oversold), REJECT it.
-    3. If the Analyst ignores the 'Overall Signal' ({tech_signal}), REJECT it.
-    4. If the Confidence Score is low (< 50%) but the tone is aggressive, REJECT it.
+    CHECKS:
+    {rules}
     
     Output strictly in this format:
     DECISION: [APPROVE or REJECT]
@@ -42,21 +37,60 @@ def risk_manager_node(state: AgentState):
     Market Data:\nPrice: {prices.get('current_price')}\nRSI: {rsi}\nOverall Tech Signal: {tech_signal}"""
     
 
-    response = llm.invoke([SystemMessage(content=system_prompt), HumanMessage(content=human_message)])
-    result = response.content
+    return [SystemMessage(content=system_prompt), HumanMessage(content=human_message)]
 
-    decision = "APPROVE"
-    feedback = "LGTM"
-    
-    if "REJECT" in result:
-        decision = "REJECT"
-        feedback = result.split("FEEDBACK:")[-1].strip()
-    
-    print(f"Risk Manager Decision: {decision}")
-    
+
+def _decision(state: AgentState, approved: bool, feedback: str, source: str):
+    """State update for a review outcome. Approvals are prefixed with APPROVE so should_continue can stop."""
+    print(f"Risk Manager Decision ({source}): {'APPROVE' if approved else 'REJECT'}")
     return {
-        "critique": feedback,
+        "critique": f"APPROVE: {feedback}" if approved else feedback,
         "revision_number": state.get("revision_number", 0) + 1
     }
 
-    
+
+def pre_check(state: AgentState):
+    """
+    Deterministic half of the review. Returns (update, None) when the rules decide,
+    or (None, judgement checks) when the LLM still has to look at the draft.
+    """
+    rules = evaluate_rules(state["analyst_draft"], state["technicals"])
+    if rules["violations"]:
+        return _decision(state, False, " ".join(rules["violations"]), "rules"), None
+    if not rules["judgement"]:
+        return _decision(state, True, f"{rules['call']} call is consistent with RSI and the overall signal.", "rules"), None
+    return None, rules["judgement"]
+
+
+def parse_review(result: str, state: AgentState):
+    """Turns the LLM's DECISION/FEEDBACK reply into the state update."""
+    feedback = result.split("FEEDBACK:")[-1].strip() if "FEEDBACK:" in result else "LGTM"
+    return _decision(state, "REJECT" not in result, feedback, "llm")
+
+
+def risk_manager_node(state: AgentState):
+    """
+    Reviews the Analyst's draft for logical inconsistencies or hallucinations.
+    Decides if the report is safe to publish or needs revision.
+    Hard rules are settled in code; the LLM is only called for what they can't decide.
+    """
+    print("--- RISK MANAGER REVIEWING DRAFT ---")
+
+    update, checks = pre_check(state)
+    if update is not None:
+        return update
+
+    result = invoke_cached(get_llm(temperature=0.0), build_review_messages(state, checks))
+    return parse_review(result, state)
+
+
+async def risk_manager_node_async(state: AgentState):
+    """Async twin of risk_manager_node."""
+    print("--- RISK MANAGER REVIEWING DRAFT ---")
+
+    update, checks = pre_check(state)
+    if update is not None:
+        return update
+
+    result = await ainvoke_cached(get_llm(temperature=0.0), build_review_messages(state, checks))
+    return parse_review(result, state)
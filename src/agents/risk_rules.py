@@ -0,0 +1,80 @@
+import re
+from typing import Any, Dict, List, Optional
+
+# The numeric half of the risk review, evaluated in code.
+# The LLM is only asked for the judgement calls (is a contradicted signal really argued for,
+# is a low-confidence memo written too aggressively), and only when those checks are in play.
+
+RSI_OVERBOUGHT = 70
+RSI_OVERSOLD = 30
+MIN_CONFIDENCE = 50
+
+# Whole words only, and never one option of a template placeholder such as "Buy/Sell" or "BUY/SELL/HOLD"
+_CALL = r"(?<!/)\b(STRONG\s+BUY|STRONG\s+SELL|BUY|SELL|HOLD)\b(?!\s*/)"
+# "The Call: BUY", "Recommendation - Strong Sell", "**Rating:** Hold"
+_LABELLED_CALL = re.compile(r"\b(?:call|recommendation|rating|verdict)\b\W{0,10}" + _CALL, re.IGNORECASE)
+_SHOUTED_CALL = re.compile(_CALL)  # an all-caps BUY/SELL/HOLD anywhere
+_CONFIDENCE = re.compile(r"confidence[^0-9\n]{0,40}(\d{1,3}(?:\.\d+)?)\s*%", re.IGNORECASE)
+_SIGNAL_MENTION = re.compile(r"overall\s+(?:technical\s+)?signal|technical\s+signal", re.IGNORECASE)
+
+_DIRECTION = {"BUY": 1, "SELL": -1, "HOLD": 0}
+
+
+def extract_call(draft: str) -> Optional[str]:
+    """The memo's call normalised to BUY / SELL / HOLD, or None if it can't be found."""
+    match = _LABELLED_CALL.search(draft) or _SHOUTED_CALL.search(draft)
+    if not match:
+        return None
+    return match.group(1).upper().split()[-1]
+
+
+def extract_confidence(draft: str) -> Optional[float]:
+    """First 'Confidence ... NN%' figure in the memo."""
+    match = _CONFIDENCE.search(draft)
+    return float(match.group(1)) if match else None
+
+
+def evaluate_rules(draft: str, technicals: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Checks the hard rules against `technicals`.
+    Returns the extracted facts, any `violations` (reject without asking the LLM) and the
+    `judgement` checks that still need the LLM (empty -> the draft can be approved outright).
+    """
+    call = extract_call(draft)
+    confidence = extract_confidence(draft)
+    rsi = technicals.get("momentum", {}).get("rsi", {}).get("value")
+    signal = technicals.get("overall_signal", {}).get("signal")
+
+    violations: List[str] = []
+    judgement: List[str] = []
+
+    if call is None:
+        judgement.append("The memo must make a clear BUY, SELL or HOLD call.")
+    elif isinstance(rsi, (int, float)):
+        if call == "BUY" and rsi > RSI_OVERBOUGHT:
+            violations.append(f"BUY call while RSI is {rsi} (> {RSI_OVERBOUGHT}, overbought).")
+        if call == "SELL" and rsi < RSI_OVERSOLD:
+            violations.append(f"SELL call while RSI is {rsi} (< {RSI_OVERSOLD}, oversold).")
+
+    signal_direction = _DIRECTION.get(str(signal).upper())
+    if call is not None and signal_direction and _DIRECTION[call] == -signal_direction:
+        if _SIGNAL_MENTION.search(draft) or str(signal).lower() in draft.lower():
+            judgement.append(f"The call ({call}) goes against the overall technical signal ({signal}); "
+                             f"REJECT unless the memo gives a convincing reason.")
+        else:
+            violations.append(f"{call} call contradicts the overall technical signal ({signal}) without addressing it.")
+
+    if confidence is None:
+        judgement.append(f"The memo must state a confidence score; if it is below {MIN_CONFIDENCE}% "
+                         f"and the tone is aggressive, REJECT.")
+    elif confidence < MIN_CONFIDENCE and call in ("BUY", "SELL"):
+        judgement.append(f"Confidence is {confidence:g}% (< {MIN_CONFIDENCE}%); REJECT if the tone is aggressive.")
+
+    return {
+        "call": call,
+        "confidence": confidence,
+        "rsi": rsi,
+        "overall_signal": signal,
+        "violations": violations,
+        "judgement": judgement,
+    }
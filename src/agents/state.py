@@ -1,15 +1,24 @@
 from typing import TypedDict, Annotated, List, Dict, Any
 import operator
+
+
+def merge_dicts(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Reducer for dict channels: keys from the newer update win, nothing is dropped."""
+    return {**(left or {}), **(right or {})}
+
+
 class AgentState(TypedDict):
 
     ##input
     ticker: str # unquie stock id for the company 
 
     ##Data
-    market_data: Dict[str, Any] #price, volume, Market cap
-    technicals: Dict[str, Any]  # RSI, MACD, Trend
+    # market data and news are gathered in parallel branches of the graph,
+    # so dict channels use a merge reducer instead of blind overwrite
+    market_data: Annotated[Dict[str, Any], merge_dicts] #price, volume, Market cap
+    technicals: Annotated[Dict[str, Any], merge_dicts]  # RSI, MACD, Trend
     news: List[Dict[str, Any]]  # List of news articles (Title, Content)
-    price_history: Any
+    price_history: Any  # PriceHandle into the memory-mapped price store (DataFrame when the store is off)
 
     #structured logic
     recommendation: str   #buy, sell, hold 
@@ -18,6 +27,7 @@ class AgentState(TypedDict):
     #Reasoning
     analyst_draft: str  #written by the analyst
     critique: str       #feedback from risk manager
+    context_tokens: int  #size of the analyst's data context (token budget check)
 
     #contol 
     revision_number: int  #loop count
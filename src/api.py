@@ -1,51 +1,398 @@
 
-from fastapi import FastAPI, HTTPException 
-from pydantic import BaseModel
-from src.main import app as graph_app  
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
+from pydantic import BaseModel, Field
+from src.main import get_app, get_checkpointed_app
+from src.tools.market_data import fetch_price_history_batch, cache_stats
+from src.tools.news import news_coalescing_stats
+from src.tools.single_flight import AsyncSingleFlight
+from src.tools.limits import get_limits
+from src.tools.llm_cache import llm_cache_stats
+from src.streaming import PROGRESS_MODES, aiter_events
+from src.jobs import Job, JobQueue, JobQueueFull
+from src.screener import SCREEN_TOP_N, run_screen
+from src.tools.http_pool import aclose_clients
+from src.tools.compute_pool import shutdown_technicals_pool, warm_up
+from src.tools.tracing import render_prometheus, start_trace
+from src.tools.rate_limit import rate_limit_stats, request_priority
+from src.tools.checkpoints import aresume_or_start, get_checkpointer, thread_config
+from src.tools.results_store import get_results_store
+from src.tools.price_store import as_frame, materialize
+from src.tools.serialization import (
+    ARROW_MEDIA_TYPE, PARQUET_MEDIA_TYPE, FastJSONResponse, dumps, encode_arrow, encode_parquet, negotiate,
+    price_history_columns, price_history_records
+)
 import uvicorn # type: ignore
 
+PriceFormat = Literal["columnar", "records"]
+
 class AnalysisRequest(BaseModel):
     ticker: str
     max_revisions: int = 2
+    price_format: PriceFormat = "columnar"  # "records" = the old list of row dicts
+    float32: bool = False  # price columns at single precision
+
+class BatchAnalysisRequest(BaseModel):
+    tickers: List[str] = Field(..., min_length=1, max_length=100)
+    max_revisions: int = 2
+    max_concurrency: int = Field(4, ge=1, le=32)  # graph runs in flight for this batch
+
+class ScreenRequest(BaseModel):
+    tickers: List[str] = Field(..., min_length=1, max_length=1000)
+    top_n: int = Field(SCREEN_TOP_N, ge=0, le=100)  # always analyzed, strongest first
+    min_score: Optional[int] = Field(None, ge=0)  # plus every name with |score| >= min_score ...
+    min_adx: Optional[float] = Field(None, ge=0)  # ... and ADX >= min_adx
+    max_revisions: int = 2
+    max_concurrency: int = Field(4, ge=1, le=32)
+    analyze: bool = True  # False = ranking only, no LLM calls
+
+class JobRequest(BaseModel):
+    ticker: str
+    max_revisions: int = 2
+    priority: Literal["interactive", "batch"] = "interactive"  # provider quota scheduling, see rate_limit
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Technicals process pool (TECHNICALS_WORKERS > 0): workers spawned and warmed before the first request
+    await asyncio.to_thread(warm_up)
+    # Unfinished checkpoint threads from earlier freshness windows can never be resumed
+    await asyncio.to_thread(get_checkpointer().expire, ANALYSIS_FRESHNESS_SECONDS)
+    yield
+    await job_queue.aclose()
+    await asyncio.to_thread(shutdown_technicals_pool)
+    # Release pooled keep-alive connections (Groq / Tavily)
+    await aclose_clients()
 
-api = FastAPI(title="Hedge Fund Agent API", version="1.0")
+api = FastAPI(title="Hedge Fund Agent API", version="1.0", lifespan=lifespan, default_response_class=FastJSONResponse)
+# gzip for clients that accept it. NDJSON is left alone so batch lines still arrive as each ticker finishes,
+# Parquet is compressed already.
+api.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv("GZIP_MIN_BYTES", "1024")),
+    compresslevel=6,
+    exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/x-ndjson", PARQUET_MEDIA_TYPE),
+)
+
+# Identical /analyze requests arriving while a run is in flight attach to it instead of starting another.
+# The freshness window is part of the key, so a request never joins a run started in an older data window.
+ANALYSIS_FRESHNESS_SECONDS = float(os.getenv("ANALYSIS_FRESHNESS_SECONDS", "900"))
+analysis_flight = AsyncSingleFlight("analysis")
+
+def build_initial_state(ticker: str, max_revisions: int) -> dict:
+    return {
+        "ticker": ticker,
+        "max_revisions": max_revisions,
+        "revision_number": 0,
+        "market_data": {},
+        "price_history": None,
+        "technicals": {},
+        "news": [],
+        "analyst_draft": "",
+        "critique": "",
+        "final_report": "",
+        "errors": []
+    }
+
+def format_result(result: dict, timings: Optional[dict] = None, price_format: Optional[PriceFormat] = "columnar",
+                  float32: bool = False) -> dict:
+    """
+    JSON payload for a finished run. price_history is columnar by default (see src.tools.serialization);
+    price_format=None leaves it out, for the binary responses that carry it as a table.
+    """
+    price_history = as_frame(result.get("price_history"))
+    payload = {
+        "ticker": result["ticker"],
+        "market_data": result["market_data"],
+        "analyst_draft": result["analyst_draft"],
+        "critique": result["critique"],
+        "news": result["news"][:3],
+        "technicals": result["technicals"],
+        "context_tokens": result.get("context_tokens"),
+    }
+    if price_format == "columnar":
+        payload["price_history"] = price_history_columns(price_history, float32=float32)
+    elif price_format == "records":
+        payload["price_history"] = price_history_records(price_history)
+    if timings is not None:
+        # Per-request breakdown: wall time per node, provider calls / bytes, LLM tokens, revisions
+        payload["timings"] = timings
+    return payload
+
+def respond(result: dict, timings: Optional[dict], accept: Optional[str], price_format: PriceFormat = "columnar",
+            float32: bool = False, **extra) -> Response:
+    """
+    Content negotiation for a finished run: Arrow IPC stream or Parquet when the Accept header asks for it
+    (price table as columns, everything else as JSON in the `result` schema metadata), fast JSON otherwise.
+    """
+    kind = negotiate(accept)
+    if kind == "json":
+        return FastJSONResponse({**format_result(result, timings, price_format, float32), **extra})
+    metadata = {**format_result(result, timings, price_format=None), **extra}
+    if kind == "arrow":
+        return Response(encode_arrow(as_frame(result.get("price_history")), metadata, float32), media_type=ARROW_MEDIA_TYPE)
+    return Response(encode_parquet(as_frame(result.get("price_history")), metadata, float32), media_type=PARQUET_MEDIA_TYPE)
 
 @api.get("/")
 def health_check():
     return {"status": "active", "model": "Llama-3.3-70b"}
 
+def _save_result(result: dict, timings: Optional[dict] = None) -> Optional[str]:
+    """Persists a finished run; a store failure is logged, never fails the request."""
+    try:
+        return get_results_store().save(result, timings)
+    except Exception as e:
+        print(f"Could not store analysis for {result.get('ticker')}: {e}")
+        return None
+
+def _finish_thread(thread_id: str):
+    """Drops the completed run's checkpoints, and those of runs that died in an earlier freshness window."""
+    checkpointer = get_checkpointer()
+    checkpointer.delete_thread(thread_id)
+    checkpointer.expire(ANALYSIS_FRESHNESS_SECONDS)
+
+async def _run_analysis(ticker: str, max_revisions: int, thread_id: str) -> dict:
+    """
+    Runs the checkpointed graph on `thread_id`. If a previous run on that thread died part-way,
+    it resumes from the last completed node instead of starting over.
+    """
+    app = get_checkpointed_app()
+    with start_trace() as trace, get_checkpointer().running(thread_id):
+        start = await aresume_or_start(app, thread_id, build_initial_state(ticker, max_revisions))
+        result = await app.ainvoke(start, thread_config(thread_id))
+    await asyncio.to_thread(_finish_thread, thread_id)
+    timings = trace.summary()
+    run_id = await asyncio.to_thread(_save_result, result, timings)
+    return result, timings, run_id
+
 @api.post("/analyze")
-async def run_analysis(request: AnalysisRequest):
+async def run_analysis(request: AnalysisRequest, accept: Optional[str] = Header(None)):
     """
     Triggers the LangGraph workflow for a specific ticker.
+    Concurrent identical requests share one run (timings.coalesced is set on the shared copies).
+    Send `Accept: application/vnd.apache.arrow.stream` (or `application/vnd.apache.parquet`) for a binary price table.
     """
     try:
-        initial_state = {
-            "ticker": request.ticker,
-            "max_revisions": request.max_revisions,
-            "revision_number": 0,
-            "market_data": {},
-            "technicals": {},
-            "news": [],
-            "analyst_draft": "",
-            "critique": "",
-            "final_report": "",
-            "errors": []
-        }
-        
-        result = await graph_app.ainvoke(initial_state)
-
-        return {
-            "ticker": result["ticker"],
-            "market_data": result["market_data"],
-            "analyst_draft": result["analyst_draft"],
-            "critique": result["critique"],
-            "news": result["news"][:3],
-            "technicals": result["technicals"],
-            "price_history": result["price_history"].reset_index().to_dict(orient='records') if result["price_history"] is not None else []
-        }
+        ticker = request.ticker.upper().strip()
+        key = (ticker, request.max_revisions, int(time.time() // ANALYSIS_FRESHNESS_SECONDS))
+        thread_id = ":".join(map(str, key))
+        (result, timings, run_id), shared = await analysis_flight.do(
+            key, lambda: _run_analysis(ticker, request.max_revisions, thread_id)
+        )
+        if shared:
+            timings = {**timings, "coalesced": True}
+        return respond(result, timings, accept, request.price_format, request.float32, run_id=run_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@api.get("/analysis/{ticker}/latest")
+def latest_analysis(ticker: str, max_age: float = ANALYSIS_FRESHNESS_SECONDS, max_revisions: Optional[int] = None,
+                    price_format: PriceFormat = "columnar", float32: bool = False,
+                    accept: Optional[str] = Header(None)):
+    """
+    Most recent stored analysis for `ticker` no older than `max_age` seconds (404 if there is none).
+    A read from the results store: no graph run, no provider or LLM calls.
+    """
+    stored = get_results_store().latest(ticker.upper().strip(), max_age=max_age, max_revisions=max_revisions)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"No analysis for {ticker.upper()} in the last {max_age:.0f}s")
+    return respond(
+        stored["state"], stored["timings"], accept, price_format, float32,
+        run_id=stored["run_id"],
+        created_at=stored["created_at"],
+        age_seconds=round(time.time() - stored["created_at"], 1),
+    )
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+@api.post("/analyze/stream")
+async def stream_analysis(request: AnalysisRequest):
+    """
+    Server-Sent Events version of /analyze:
+    - `node`   when each graph node finishes (with its state update)
+    - `token`  analyst / risk manager tokens as they are generated (a new `step` = a new revision)
+    - `result` the same payload /analyze returns
+    - `error`  if the run fails
+    """
+    async def event_source():
+        try:
+            with start_trace() as trace:
+                async for event in aiter_events(get_app(), build_initial_state(request.ticker, request.max_revisions)):
+                    if event["type"] == "result":
+                        timings = trace.summary()
+                        await asyncio.to_thread(_save_result, event["state"], timings)
+                        yield _sse("result", format_result(event["state"], timings, request.price_format, request.float32))
+                    else:
+                        yield _sse(event["type"], {k: v for k, v in event.items() if k != "type"})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # no proxy buffering
+    )
+
+async def _stream_batch(tickers: List[str], max_revisions: int, max_concurrency: int):
+    """
+    Yields one NDJSON line per ticker, in completion order.
+    Price history for the whole batch is fetched with a single bulk download first;
+    per-stage caps (market data / news / LLM) are enforced inside the nodes.
+    """
+    try:
+        with request_priority("batch"):
+            histories = await asyncio.to_thread(fetch_price_history_batch, tickers)
+    except Exception as e:
+        # Fall back to per-ticker history downloads inside the graph
+        print(f"Bulk price download failed, falling back to per-ticker: {e}")
+        histories = {}
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(ticker: str) -> dict:
+        async with semaphore:
+            try:
+                initial_state = build_initial_state(ticker, max_revisions)
+                initial_state["price_history"] = histories.get(ticker)
+                # Batch runs queue behind interactive requests for provider quota
+                with request_priority("batch"), start_trace() as trace:
+                    result = await get_app().ainvoke(initial_state)
+                timings = trace.summary()
+                await asyncio.to_thread(_save_result, result, timings)
+                return {"ticker": ticker, "status": "ok", "result": format_result(result, timings)}
+            except Exception as e:
+                return {"ticker": ticker, "status": "error", "detail": str(e)}
+
+    tasks = [asyncio.create_task(run_one(t)) for t in tickers]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            item = await next_done
+            yield dumps(item) + b"\n"
+    finally:
+        # Client disconnected -> stop the remaining runs
+        for task in tasks:
+            task.cancel()
+
+@api.post("/analyze/batch")
+async def run_batch_analysis(request: BatchAnalysisRequest):
+    """
+    Runs the workflow for many tickers concurrently and streams results (NDJSON) as each one finishes.
+    """
+    tickers = list(dict.fromkeys(t.upper().strip() for t in request.tickers if t.strip()))
+    if not tickers:
+        raise HTTPException(status_code=400, detail="No valid tickers supplied")
+
+    return StreamingResponse(
+        _stream_batch(tickers, request.max_revisions, request.max_concurrency),
+        media_type="application/x-ndjson"
+    )
+
+@api.post("/screen")
+async def screen_universe(request: ScreenRequest):
+    """
+    Ranks the whole universe on technicals (one bulk download, one vectorized pass) and runs the agents
+    only for the top_n / threshold survivors. Returns the ranking, their memos and the LLM calls avoided.
+    """
+    if not any(t.strip() for t in request.tickers):
+        raise HTTPException(status_code=400, detail="No valid tickers supplied")
+    try:
+        return await run_screen(request.tickers, request.top_n, request.min_score, request.min_adx,
+                                request.max_revisions, request.max_concurrency, request.analyze,
+                                on_result=_save_result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _run_job(job: Job):
+    """Worker body for a job: runs the graph, recording which nodes are running / done as it goes."""
+    initial_state = build_initial_state(job.ticker, job.max_revisions)
+    with request_priority(job.priority), start_trace() as trace:
+        async for event in aiter_events(get_app(), initial_state, modes=PROGRESS_MODES):
+            if event["type"] == "start":
+                job.node_started(event["node"])
+            elif event["type"] == "node":
+                job.node_finished(event["node"])
+            elif event["type"] == "result":
+                job.result = materialize(event["state"])  # polled for up to JOB_RETENTION_SECONDS
+    job.timings = trace.summary()
+    job.run_id = await asyncio.to_thread(_save_result, job.result, job.timings)
+
+# Submit / poll / cancel (JOB_WORKERS workers, JOB_QUEUE_SIZE queued jobs at most)
+job_queue = JobQueue(_run_job)
+
+def _job_status(job: Job) -> dict:
+    return {**job.summary(), "queue_position": job_queue.position(job), "url": f"/jobs/{job.id}"}
+
+@api.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """
+    Queues an analysis and returns at once with the job id; poll GET /jobs/{id} for progress and the result.
+    Answers 429 (with Retry-After) when the queue is full.
+    """
+    ticker = request.ticker.upper().strip()
+    if not ticker:
+        raise HTTPException(status_code=400, detail="No valid ticker supplied")
+    try:
+        job = job_queue.submit(Job(ticker, request.max_revisions, request.priority))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return _job_status(job)
+
+@api.get("/jobs")
+def job_queue_stats():
+    """Worker pool and queue counters."""
+    return job_queue.stats()
+
+@api.get("/jobs/{job_id}")
+def job_status(job_id: str, price_format: PriceFormat = "columnar", float32: bool = False):
+    """Status, queue position, running / completed graph nodes; the full result once the job is done."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    status = _job_status(job)
+    if job.result is not None:
+        status["result"] = {**format_result(job.result, job.timings, price_format, float32), "run_id": job.run_id}
+    return status
+
+@api.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Cancels a queued or running job; deleting a finished job drops its record."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    if not job_queue.cancel(job):
+        job_queue.remove(job)
+    return _job_status(job)
+
+@api.get("/limits")
+def stage_limits():
+    """Current per-stage concurrency caps (set via MARKET_DATA_CONCURRENCY / NEWS_CONCURRENCY / LLM_CONCURRENCY)."""
+    return get_limits()
+
+@api.get("/rate-limits")
+def provider_rate_limits():
+    """Per-provider scheduler state: quota configured (YFINANCE_RPM / TAVILY_RPM / GROQ_RPM / GROQ_TPM), budget left, queue, 429s."""
+    return rate_limit_stats()
+
+@api.get("/cache/stats")
+def market_cache_stats():
+    """
+    Hit/miss counters for the market data cache (info + price history tiers) and the LLM response cache,
+    plus how many requests were coalesced onto an in-flight fetch / analysis.
+    """
+    return {**cache_stats(), "llm": llm_cache_stats(),
+            "coalesced_news": news_coalescing_stats(), "coalesced_analysis": analysis_flight.stats()}
+
+@api.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint: node latency histograms, provider calls / bytes, LLM tokens, revision loops."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     uvicorn.run("src.api:api", host="0.0.0.0", port=8000, reload=True)
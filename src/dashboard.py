@@ -2,14 +2,131 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import os
+import threading
+import time
 
 # --- IMPORT THE AGENT DIRECTLY (Monolith Architecture) ---
 try:
-    from src.main import app
+    from src.main import get_app
+    from src.streaming import iter_events
+    from src.tools.results_store import get_results_store
+    from src.tools.price_store import as_frame, materialize
 except ImportError:
     import sys
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from src.main import app
+    from src.main import get_app
+    from src.streaming import iter_events
+    from src.tools.results_store import get_results_store
+    from src.tools.price_store import as_frame, materialize
+
+NODE_LABELS = {
+    "data_gatherer": "Market data collected",
+    "news": "News gathered",
+    "technicals": "Technical indicators computed",
+    "analyst": "Analyst draft written",
+    "risk_manager": "Risk manager review done",
+}
+
+# Upper bound on how long a finished report is served from cache (the sidebar can ask for fresher)
+RESULT_TTL_SECONDS = int(os.getenv("DASHBOARD_RESULT_TTL", "3600"))
+
+# --- 0. CACHED RESOURCES (one per server process, shared by every session and rerun) ---
+@st.cache_resource
+def load_app():
+    """Compiled graph; the LLM and HTTP clients it uses are pooled behind it."""
+    return get_app()
+
+@st.cache_resource
+def load_store():
+    return get_results_store()
+
+class BackgroundRun:
+    """One graph run on a worker thread. Pages poll it, so reruns never block on (or restart) the analysis."""
+
+    def __init__(self, app, ticker: str, max_revisions: int):
+        self.ticker = ticker
+        self.max_revisions = max_revisions
+        self.completed = []
+        self.memo = ""
+        self.state = None
+        self.created_at = None
+        self.error = None
+        self.started_at = time.time()
+        self.done = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(app,), daemon=True, name=f"analysis-{ticker}")
+        self._thread.start()
+
+    def _run(self, app):
+        initial_state = {
+            "ticker": self.ticker,
+            "max_revisions": self.max_revisions,
+            "revision_number": 0
+        }
+        memo_step = None
+        try:
+            for event in iter_events(app, initial_state):
+                if event["type"] == "node":
+                    self.completed.append(event["node"])
+                    if event["node"] == "analyst":
+                        # Covers cached drafts, which arrive without tokens
+                        self.memo = event["update"].get("analyst_draft", self.memo)
+                elif event["type"] == "token" and event["node"] == "analyst":
+                    if event["step"] != memo_step:  # new revision -> start over
+                        self.memo, memo_step = "", event["step"]
+                    self.memo += event["content"]
+                elif event["type"] == "result":
+                    self.state = materialize(event["state"] or {})  # kept in session state across reruns
+            self.created_at = time.time()
+            try:
+                get_results_store().save({**self.state, "max_revisions": self.max_revisions},
+                                         created_at=self.created_at)
+            except Exception as e:
+                print(f"DEBUG: Could not store analysis: {e}")
+        except Exception as e:
+            self.error = str(e)
+            print(f"DEBUG: Internal Error during analysis: {e}")
+        finally:
+            self.done.set()
+
+@st.cache_resource
+def background_runs():
+    """
+    (ticker, max_revisions) -> latest BackgroundRun. A second session asking for the same report joins
+    the running one; finished runs stay until replaced so every attached session can pick up the result.
+    """
+    return {"lock": threading.Lock(), "runs": {}}
+
+def start_run(key) -> BackgroundRun:
+    registry = background_runs()
+    with registry["lock"]:
+        run = registry["runs"].get(key)
+        if run is None or run.done.is_set():
+            run = registry["runs"][key] = BackgroundRun(load_app(), *key)
+        return run
+
+@st.cache_data(ttl=RESULT_TTL_SECONDS, show_spinner=False, max_entries=256)
+def load_result(ticker: str, max_revisions: int, max_age: float):
+    """Newest stored report, shared across sessions; cleared whenever a run finishes."""
+    stored = load_store().latest(ticker, max_age=max_age, max_revisions=max_revisions)
+    return {"state": stored["state"], "created_at": stored["created_at"]} if stored else None
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def price_chart(ticker: str, created_at: float, _history: pd.DataFrame) -> go.Figure:
+    """Candlestick for one stored run, built once (keyed by ticker + run time, the frame itself isn't hashed)."""
+    fig = go.Figure(data=[go.Candlestick(
+        x=_history.index,
+        open=_history['Open'],
+        high=_history['High'],
+        low=_history['Low'],
+        close=_history['Close']
+    )])
+    fig.update_layout(
+        xaxis_rangeslider_visible=False,
+        template="plotly_dark",
+        height=500,
+        margin=dict(l=0, r=0, t=0, b=0)
+    )
+    return fig
 
 # --- 1. CONFIGURATION ---
 st.set_page_config(page_title="Equity Research", layout="wide")
@@ -20,90 +137,133 @@ with st.sidebar:
     st.header("Trade Settings")
     ticker = st.text_input("Ticker Symbol", value="NVDA").upper()
     max_revisions = st.number_input("Max Risk Revisions", min_value=1, max_value=5, value=2)
+    reuse_minutes = st.number_input("Reuse reports newer than (minutes)", min_value=0,
+                                    max_value=RESULT_TTL_SECONDS // 60, value=min(15, RESULT_TTL_SECONDS // 60),
+                                    help="0 always runs the agents")
     run_btn = st.button("Generate Analysis", type="primary")
 
+results = st.session_state.setdefault("results", {})  # (ticker, max_revisions) -> {"state", "created_at"}
+
+def cached_report(key):
+    """This session's copy if fresh enough, else the newest stored one (any session), else None."""
+    max_age = reuse_minutes * 60
+    report = results.get(key)
+    if report and time.time() - report["created_at"] <= max_age:
+        return report
+    try:
+        report = load_result(*key, max_age)
+    except Exception as e:
+        print(f"DEBUG: Results store unavailable: {e}")
+        return None
+    if report and time.time() - report["created_at"] <= max_age:
+        results[key] = report
+        return report
+    return None
+
 # --- 3. MAIN LOGIC ---
 if run_btn:
-    with st.spinner(f"Running autonomous agents for {ticker}..."):
-        try:
-            # --- EXECUTION ---
-            initial_state = {
-                "ticker": ticker, 
-                "max_revisions": max_revisions,
-                "revision_count": 0
-            }
-            final_state = app.invoke(initial_state)
-            
-            # --- 4. PARSE DATA ---
-            market_data = final_state.get("market_data", {})
-            technicals = final_state.get("technicals", {})
-            news = final_state.get("news", [])
-            analyst_draft = final_state.get("analyst_draft", "No report generated.")
-            critique = final_state.get("critique")
-            
-            # --- 5. DISPLAY METRICS ---
-            col1, col2, col3 = st.columns(3)
-            current_price = market_data.get("current_price", "N/A")
-            signal = technicals.get('overall_signal', {}).get('signal', 'Neutral')
-            
-            col1.metric("Ticker", ticker)
-            col2.metric("Current Price", f"${current_price}")
-            col3.metric("Analyst Decision", signal)
-
-            # --- 6. PLOTLY CHART (Optimized) ---
-            st.subheader(f"{ticker} Price Action (6 Months)")
-            
-            # Use .get() safely and check if it's a DataFrame
-            df = market_data.get("history_df")
-            
-            if isinstance(df, pd.DataFrame) and not df.empty:
-                fig = go.Figure(data=[go.Candlestick(
-                    x=df.index,
-                    open=df['Open'],
-                    high=df['High'],
-                    low=df['Low'],
-                    close=df['Close']
-                )])
-                fig.update_layout(
-                    xaxis_rangeslider_visible=False,
-                    template="plotly_dark",
-                    height=500,
-                    margin=dict(l=0, r=0, t=0, b=0)
-                )
-                st.plotly_chart(fig, use_container_width=True)
-
-            # --- 7. TABS FOR DETAILS ---
-            tab1, tab2, tab3 = st.tabs(["📝 Research Report", "📊 Fundamental Data", "🧠 Agent Logic"])
-            
-            with tab1:
-                st.markdown("### Investment Memo")
-                st.markdown(analyst_draft)
-            
-            with tab2:
-                st.subheader("Financial Metrics")
-                metrics_list = []
-                for k, v in market_data.items():
-                    if k != "history_df": # Skip the raw dataframe
-                        metrics_list.append({"Metric": k.replace("_", " ").title(), "Value": v})
-                
-                if metrics_list:
-                    st.table(pd.DataFrame(metrics_list))
-                
-                st.subheader("Recent News")
-                if news:
-                    for article in news[:5]:
-                        st.markdown(f"- **{article.get('title')}** [Read Source]({article.get('url')})")
-                    
-            with tab3:
-                st.subheader("Risk Management Critique")
-                if critique:
-                    st.warning(f"Risk Manager Feedback:\n\n{critique}")
-                else:
-                    st.success("✅ Risk Manager approved the report immediately.")
-                    
-                st.subheader("Technical Indicators")
-                st.json(technicals)
+    key = (ticker, int(max_revisions))
+    st.session_state["active"] = key
+    if not (reuse_minutes and cached_report(key)):
+        results.pop(key, None)
+        start_run(key)
 
+@st.fragment(run_every=1.0)
+def show_progress(key):
+    """Polls the background run once a second; hands over to the full report when it finishes."""
+    run = background_runs()["runs"].get(key)
+    if run is None:
+        return
+    with st.status(f"Running autonomous agents for {key[0]}...", expanded=True):
+        for node in run.completed:
+            st.write(f"✅ {NODE_LABELS.get(node, node)}")
+        st.caption(f"{time.time() - run.started_at:.0f}s elapsed")
+    if run.memo:
+        st.markdown(run.memo + ("" if run.done.is_set() else "▌"))
+    if run.done.is_set():
+        if run.error is None:
+            results[key] = {"state": run.state, "created_at": run.created_at}
+            load_result.clear()  # the cached "nothing stored yet" answer is stale for every session now
+        else:
+            st.session_state["error"] = run.error
+            st.session_state.pop("active", None)
+        st.rerun(scope="app")
+
+def show_report(key, report):
+    ticker, _ = key
+    final_state = report["state"]
+    age = int((time.time() - report["created_at"]) // 60)
+    st.caption(f"Report generated {age} min ago" if age else "Report generated just now")
+
+    # --- 4. PARSE DATA ---
+    market_data = final_state.get("market_data", {})
+    technicals = final_state.get("technicals", {})
+    news = final_state.get("news", [])
+    analyst_draft = final_state.get("analyst_draft", "No report generated.")
+    critique = final_state.get("critique")
+
+    # --- 5. DISPLAY METRICS ---
+    col1, col2, col3 = st.columns(3)
+    current_price = market_data.get("current_price", "N/A")
+    signal = technicals.get('overall_signal', {}).get('signal', 'Neutral')
+
+    col1.metric("Ticker", ticker)
+    col2.metric("Current Price", f"${current_price}")
+    col3.metric("Analyst Decision", signal)
+
+    # --- 6. PLOTLY CHART (built once per run, see price_chart) ---
+    st.subheader(f"{ticker} Price Action (6 Months)")
+
+    df = as_frame(final_state.get("price_history"))
+
+    if isinstance(df, pd.DataFrame) and not df.empty:
+        # History runs back as far as the SMA-200 warmup needs; the chart keeps to the last six months
+        df = df[df.index > df.index[-1] - pd.DateOffset(months=6)]
+        st.plotly_chart(price_chart(ticker, report["created_at"], df), use_container_width=True)
+
+    # --- 7. TABS FOR DETAILS ---
+    tab1, tab2, tab3 = st.tabs(["📝 Research Report", "📊 Fundamental Data", "🧠 Agent Logic"])
+
+    with tab1:
+        st.markdown("### Investment Memo")
+        st.markdown(analyst_draft)
+
+    with tab2:
+        st.subheader("Financial Metrics")
+        metrics_list = []
+        for k, v in market_data.items():
+            if k != "history_df": # Skip the raw dataframe
+                metrics_list.append({"Metric": k.replace("_", " ").title(), "Value": v})
+
+        if metrics_list:
+            st.table(pd.DataFrame(metrics_list))
+
+        st.subheader("Recent News")
+        if news:
+            for article in news[:5]:
+                st.markdown(f"- **{article.get('title')}** [Read Source]({article.get('url')})")
+
+    with tab3:
+        st.subheader("Risk Management Critique")
+        if critique and not critique.startswith("APPROVE"):
+            st.warning(f"Risk Manager Feedback:\n\n{critique}")
+        else:
+            st.success("✅ Risk Manager approved the report immediately.")
+
+        st.subheader("Technical Indicators")
+        st.json(technicals)
+
+# Whatever was last requested stays on screen across reruns (tab switches, widget changes)
+error = st.session_state.pop("error", None)
+if error:
+    st.error(f"❌ An unexpected error occurred: {error}")
+active = st.session_state.get("active")
+if active:
+    if active not in results and active in background_runs()["runs"]:
+        show_progress(active)
+    elif active in results:
+        try:
+            show_report(active, results[active])
         except Exception as e:
             st.error(f"❌ An unexpected error occurred: {str(e)}")
             # Helpful for debugging in your terminal
@@ -0,0 +1,173 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Submit / poll / cancel for analyses, so the HTTP request that starts a run returns as soon as it is queued.
+# Jobs live in memory: a bounded asyncio queue drained by a fixed pool of worker tasks on the API's event loop.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))  # finished jobs are kept this long
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = {DONE, FAILED, CANCELLED}
+
+
+class JobQueueFull(Exception):
+    """Raised by submit when JOB_QUEUE_SIZE jobs are already waiting (the API answers 429)."""
+
+
+class Job:
+    def __init__(self, ticker: str, max_revisions: int, priority: str = "interactive"):
+        self.id = uuid.uuid4().hex
+        self.ticker = ticker
+        self.max_revisions = max_revisions
+        self.priority = priority
+        self.status = QUEUED
+        self.running: List[str] = []  # nodes executing right now (the data nodes run in parallel)
+        self.completed: List[str] = []  # finished nodes, in order; analyst / risk_manager repeat per revision
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None  # final AgentState
+        self.timings: Optional[Dict[str, Any]] = None
+        self.run_id: Optional[str] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def node_started(self, node: str):
+        self.running.append(node)
+
+    def node_finished(self, node: str):
+        if node in self.running:
+            self.running.remove(node)
+        self.completed.append(node)
+
+    def summary(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        return {
+            "id": self.id,
+            "ticker": self.ticker,
+            "max_revisions": self.max_revisions,
+            "status": self.status,
+            "current_nodes": list(self.running),
+            "completed_nodes": list(self.completed),
+            "revision": self.completed.count("analyst"),
+            "created_at": self.created_at,
+            "queued_seconds": round((self.started_at or end) - self.created_at, 3),
+            "run_seconds": round(end - self.started_at, 3) if self.started_at else None,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Bounded queue + worker pool. `runner(job)` does the work and reports progress on the job;
+    workers are started lazily on the running loop (and restarted if the loop changes, e.g. in tests).
+    """
+
+    def __init__(self, runner: Callable[[Job], Awaitable[None]], workers: int = JOB_WORKERS,
+                 maxsize: int = JOB_QUEUE_SIZE):
+        self.runner = runner
+        self.workers = workers
+        self.maxsize = maxsize
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop = None
+        self._stats = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0, "cancelled": 0}
+
+    def _ensure_workers(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(self.maxsize)
+        self._workers = [loop.create_task(self._worker(i)) for i in range(self.workers)]
+        for job in self.jobs.values():
+            if job.status in (QUEUED, RUNNING):  # belonged to the old loop; nothing will run them now
+                self._finish(job, FAILED, "worker pool restarted")
+
+    async def _worker(self, n: int):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status != QUEUED:  # cancelled while waiting
+                    continue
+                job.status, job.started_at = RUNNING, time.time()
+                job.task = asyncio.create_task(self.runner(job))
+                await asyncio.wait({job.task})
+                if job.task.cancelled():
+                    self._finish(job, CANCELLED)
+                elif job.task.exception() is not None:
+                    self._finish(job, FAILED, str(job.task.exception()))
+                else:
+                    self._finish(job, DONE)
+            finally:
+                job.task = None
+                self._queue.task_done()
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        job.status, job.error, job.finished_at = status, error, time.time()
+        job.running = []
+        self._stats[status] += 1
+
+    def _sweep(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [j.id for j in self.jobs.values() if j.status in FINISHED and j.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+    def submit(self, job: Job) -> Job:
+        """Queues `job`; raises JobQueueFull instead of waiting when the queue is at capacity."""
+        self._ensure_workers()
+        self._sweep()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._stats["rejected"] += 1
+            raise JobQueueFull(f"{self.maxsize} jobs already queued")
+        self.jobs[job.id] = job
+        self._stats["submitted"] += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def position(self, job: Job) -> Optional[int]:
+        """1-based place among queued jobs (FIFO), None once it has left the queue."""
+        if job.status != QUEUED:
+            return None
+        queued = [j for j in self.jobs.values() if j.status == QUEUED]
+        return queued.index(job) + 1
+
+    def cancel(self, job: Job) -> bool:
+        """Cancels a queued or running job; False if it had already finished."""
+        if job.status == QUEUED:
+            self._finish(job, CANCELLED)  # the worker skips it when it comes up
+            return True
+        if job.status == RUNNING and job.task is not None:
+            job.task.cancel()
+            return True
+        return False
+
+    def remove(self, job: Job):
+        self.jobs.pop(job.id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "workers": self.workers,
+            "capacity": self.maxsize,
+            "queued": sum(j.status == QUEUED for j in self.jobs.values()),
+            "running": sum(j.status == RUNNING for j in self.jobs.values()),
+        }
+
+    async def aclose(self):
+        for task in self._workers:
+            task.cancel()
+        for job in self.jobs.values():
+            if job.task is not None:
+                job.task.cancel()
+        self._workers, self._loop = [], None
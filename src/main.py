@@ -1,65 +1,132 @@
+import argparse
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from langgraph.graph import StateGraph, END 
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+from langgraph.graph import StateGraph, START, END 
 from src.agents.state import AgentState
-from src.agents.nodes import market_data_node, technical_analysis_node, news_gatherer_node
-from src.agents.analyst import analyst_node
-from src.agents.risk_manager import risk_manager_node
+from langchain_core.runnables import RunnableLambda
+from src.agents.nodes import (
+    market_data_node, market_data_node_async, technical_analysis_node, technical_analysis_node_async,
+    news_gatherer_node, news_gatherer_node_async
+)
+from src.agents.analyst import analyst_node, analyst_node_async
+from src.agents.risk_manager import risk_manager_node, risk_manager_node_async
+from src.tools.tracing import traced_node
+from src.tools.checkpoints import get_checkpointer
 
 def should_continue(state: AgentState):
     """
     The Conditional Logic:
     - If Risk Manager rejects AND we haven't hit max revisions -> Loop back to Analyst.
     - Else -> End.
+    Approved critiques start with "APPROVE" (see risk_manager._decision).
     """
     critique = state.get("critique", "")
     revisions = state.get("revision_number", 0)
     max_revisions = state.get("max_revisions", 2)
     
-    if "APPROVE" in critique or revisions >= max_revisions:
+    if critique.startswith("APPROVE") or revisions >= max_revisions:
         return "end"
     else:
         return "revision"
 
-workflow = StateGraph(AgentState)
+def build_workflow(parallel: bool = True, nodes: Optional[Dict[str, Callable]] = None) -> StateGraph:
+    """
+    Wires the agent graph.
+    - parallel=True  -> market data and news are fetched concurrently (fan-out),
+                        technicals chain off price history, analyst joins on both.
+    - parallel=False -> the original serial chain, kept for timing comparisons.
+    `nodes` lets callers swap node implementations (e.g. simulated latency in benchmarks).
+    """
+    # I/O nodes carry a sync and an async implementation: app.invoke uses the former,
+    # app.ainvoke / astream (the API) the latter, so requests don't park worker threads on network I/O.
+    # The technicals twin awaits the CPU work in a worker process (see src/tools/compute_pool.py).
+    node_map = {
+        "data_gatherer": (market_data_node, market_data_node_async),
+        "technicals": (technical_analysis_node, technical_analysis_node_async),
+        "news": (news_gatherer_node, news_gatherer_node_async),
+        "analyst": (analyst_node, analyst_node_async),
+        "risk_manager": (risk_manager_node, risk_manager_node_async),
+    }
+    node_map.update({name: (fn, None) for name, fn in (nodes or {}).items()})
 
-workflow.add_node("data_gatherer", market_data_node)
-workflow.add_node("technicals", technical_analysis_node)
-workflow.add_node("news", news_gatherer_node)
-workflow.add_node("analyst", analyst_node)
-workflow.add_node("risk_manager", risk_manager_node)
+    workflow = StateGraph(AgentState)
+    for name, (fn, afn) in node_map.items():
+        # Every node is timed (see src/tools/tracing.py), whichever implementation runs
+        fn = traced_node(name, fn)
+        if afn is not None:
+            fn = RunnableLambda(fn, afunc=traced_node(name, afn), name=name)
+        workflow.add_node(name, fn)
 
-workflow.set_entry_point("data_gatherer")
+    if parallel:
+        # Fan-out: news does not depend on market data
+        workflow.add_edge(START, "data_gatherer")
+        workflow.add_edge(START, "news")
+        workflow.add_edge("data_gatherer", "technicals")
+        # Fan-in: analyst waits for both branches
+        workflow.add_edge(["technicals", "news"], "analyst")
+    else:
+        workflow.set_entry_point("data_gatherer")
+        workflow.add_edge("data_gatherer", "technicals")
+        workflow.add_edge("technicals", "news")
+        workflow.add_edge("news", "analyst")
 
+    workflow.add_edge("analyst", "risk_manager")
 
-workflow.add_edge("data_gatherer", "technicals")
-workflow.add_edge("technicals", "news")
-workflow.add_edge("news", "analyst")
-workflow.add_edge("analyst", "risk_manager")
+    workflow.add_conditional_edges(
+        "risk_manager",
+        should_continue,
+        {
+            "revision": "analyst", 
+            "end": END            
+        }
+    )
+    return workflow
 
-workflow.add_conditional_edges(
-    "risk_manager",
-    should_continue,
-    {
-        "revision": "analyst", 
-        "end": END            
-    }
-)
+@lru_cache(maxsize=None)
+def get_app(parallel: bool = True):
+    """Compiled graph, built on first use and reused for the life of the process."""
+    return build_workflow(parallel=parallel).compile()
+
+@lru_cache(maxsize=None)
+def get_checkpointed_app(parallel: bool = True):
+    """Same graph, checkpointed after every node (needs a thread_id in the config; see src.tools.checkpoints)."""
+    return build_workflow(parallel=parallel).compile(checkpointer=get_checkpointer())
+
+def __getattr__(name):
+    # Keeps `from src.main import app` working without compiling at import time
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-app = workflow.compile()
-app.get_graph().draw_mermaid_png()
+def draw_graph(path: str = "graph.png") -> str:
+    """Renders the workflow diagram (uses the mermaid.ink web service). Opt-in only."""
+    with open(path, "wb") as f:
+        f.write(get_app().get_graph().draw_mermaid_png())
+    return path
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the hedge fund agent for one ticker.")
+    parser.add_argument("ticker", nargs="?", default="NVDA")
+    parser.add_argument("--max-revisions", type=int, default=2)
+    parser.add_argument("--draw-graph", metavar="PATH", help="only render the workflow diagram to PATH (PNG)")
+    args = parser.parse_args()
+
+    if args.draw_graph:
+        print(f"Graph diagram written to {draw_graph(args.draw_graph)}")
+        sys.exit(0)
+
     print("--- STARTING HEDGE FUND AGENT ---")
-    ticker = "NVDA"
+    ticker = args.ticker.upper()
     
     initial_state = {
         "ticker": ticker,
         "revision_number": 0,
-        "max_revisions": 2,
+        "max_revisions": args.max_revisions,
         "market_data": {},
         "price_history": None,
         "technicals": {},
@@ -72,7 +139,7 @@ if __name__ == "__main__":
         "errors": []
     }
     
-    result = app.invoke(initial_state)
+    result = get_app().invoke(initial_state)
 
 
     
@@ -0,0 +1,216 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+if __package__ in (None, ""):  # `python src/screener.py`
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.main import get_app
+from src.tools.market_data import fetch_price_history_batch
+from src.tools.rate_limit import request_priority
+from src.tools.technicals_batch import build_panels, calculate_technicals_batch
+from src.tools.tracing import start_trace
+
+# Universe screening: one bulk price download and one vectorized technicals pass for every ticker,
+# then the LLM pipeline (news -> analyst -> risk manager) only for the names worth a memo.
+# Most of a broad universe is a Hold with no trend; those never cost an LLM call.
+SCREEN_TOP_N = int(os.getenv("SCREEN_TOP_N", "10"))
+SCREEN_CONCURRENCY = int(os.getenv("SCREEN_CONCURRENCY", "4"))  # graph runs in flight for survivors
+LLM_CALLS_PER_ANALYSIS = 2  # analyst + LLM risk review; the estimate used when no survivor has run yet
+
+
+def volatility_30d(hist: pd.DataFrame) -> Optional[float]:
+    """Same definition as market_data's volatility_30d (std of daily returns over 30 bars, in %)."""
+    if len(hist) < 31:
+        return None
+    value = hist["Close"].pct_change().rolling(window=30).std().iloc[-1] * 100
+    return round(float(value), 2) if pd.notnull(value) else None
+
+
+def rank_universe(histories: Dict[str, pd.DataFrame], technicals: Dict[str, dict]) -> List[Dict[str, Any]]:
+    """
+    One row per ticker with usable technicals, strongest first:
+    |score| (Buy and Sell setups both qualify), then ADX (trend strength), then volatility.
+    """
+    rows = []
+    for ticker, tech in technicals.items():
+        if "error" in tech:
+            continue
+        rows.append({
+            "ticker": ticker,
+            "signal": tech["overall_signal"]["signal"],
+            "score": tech["overall_signal"]["score"],
+            "adx": tech["trend"]["adx"]["value"],
+            "rsi": tech["momentum"]["rsi"]["value"],
+            "volatility_30d": volatility_30d(histories[ticker]),
+            "current_price": round(float(histories[ticker]["Close"].iloc[-1]), 2),
+        })
+
+    def strength(row):
+        adx = row["adx"] if np.isfinite(row["adx"]) else 0.0
+        return (-abs(row["score"]), -adx, -(row["volatility_30d"] or 0.0))
+
+    rows.sort(key=strength)
+    for rank, row in enumerate(rows, 1):
+        row["rank"] = rank
+    return rows
+
+
+def select_survivors(ranked: List[Dict[str, Any]], top_n: int = SCREEN_TOP_N, min_score: Optional[int] = None,
+                     min_adx: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    The top `top_n` rows, plus any row crossing the thresholds (|score| >= min_score and ADX >= min_adx;
+    a threshold left as None is not applied, and with both None only top_n selects).
+    """
+    survivors = []
+    for row in ranked:
+        reasons = []
+        if row["rank"] <= top_n:
+            reasons.append("top_n")
+        if min_score is not None or min_adx is not None:
+            if ((min_score is None or abs(row["score"]) >= min_score)
+                    and (min_adx is None or row["adx"] >= min_adx)):
+                reasons.append("threshold")
+        if reasons:
+            survivors.append({**row, "selected_by": reasons})
+    return survivors
+
+
+async def _analyze(ticker: str, history: pd.DataFrame, max_revisions: int,
+                   on_result: Optional[Callable[[dict, dict], Any]] = None) -> Dict[str, Any]:
+    initial_state = {
+        "ticker": ticker,
+        "max_revisions": max_revisions,
+        "revision_number": 0,
+        "price_history": history,  # already downloaded in bulk
+        "errors": [],
+    }
+    with start_trace() as trace:
+        result = await get_app().ainvoke(initial_state)
+    summary = trace.summary()
+    if on_result is not None:
+        await asyncio.to_thread(on_result, result, summary)
+    return {
+        "status": "ok",
+        "recommendation": result.get("recommendation"),
+        "analyst_draft": result.get("analyst_draft"),
+        "critique": result.get("critique"),
+        "market_data": result.get("market_data"),
+        "errors": result.get("errors", []),
+        "llm_calls": summary["external_calls"].get("groq", 0),
+        "seconds": summary["total_seconds"],
+    }
+
+
+async def run_screen(universe: List[str], top_n: int = SCREEN_TOP_N, min_score: Optional[int] = None,
+                     min_adx: Optional[float] = None, max_revisions: int = 2,
+                     concurrency: int = SCREEN_CONCURRENCY, analyze: bool = True,
+                     on_result: Optional[Callable[[dict, dict], Any]] = None) -> Dict[str, Any]:
+    """
+    Screens `universe` and runs the full analysis for the survivors only.
+    The report includes the ranking, the survivors' memos and how many LLM calls the screen avoided.
+    `on_result(state, timings)` is called (on a worker thread) for every finished survivor, e.g. to store it.
+    """
+    universe = list(dict.fromkeys(t.upper().strip() for t in universe if t.strip()))
+    timings = {}
+
+    start = time.perf_counter()
+    with request_priority("batch"):
+        histories = await asyncio.to_thread(fetch_price_history_batch, universe)
+    timings["fetch_seconds"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    technicals = await asyncio.to_thread(calculate_technicals_batch, *build_panels(histories)) if histories else {}
+    ranked = rank_universe(histories, technicals)
+    survivors = select_survivors(ranked, top_n, min_score, min_adx)
+    timings["technicals_seconds"] = round(time.perf_counter() - start, 3)
+
+    analyses: Dict[str, Dict[str, Any]] = {}
+    if analyze and survivors:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(ticker: str):
+            async with semaphore:
+                try:
+                    with request_priority("batch"):
+                        analyses[ticker] = await _analyze(ticker, histories[ticker], max_revisions, on_result)
+                except Exception as e:
+                    analyses[ticker] = {"status": "error", "detail": str(e), "llm_calls": 0}
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_one(row["ticker"]) for row in survivors))
+        timings["analysis_seconds"] = round(time.perf_counter() - start, 3)
+
+    calls_made = sum(a["llm_calls"] for a in analyses.values())
+    completed = [a for a in analyses.values() if a["status"] == "ok"]
+    per_analysis = calls_made / len(completed) if completed and calls_made else LLM_CALLS_PER_ANALYSIS
+    skipped = len(ranked) - len(analyses)
+    return {
+        "universe": len(universe),
+        "priced": len(histories),
+        "screened": len(ranked),
+        "unscreened": sorted(set(universe) - {row["ticker"] for row in ranked}),  # no data / too few bars
+        "survivors": survivors,
+        "ranking": ranked,
+        "analyses": analyses,
+        "llm": {
+            "analyses_run": len(analyses),
+            "analyses_skipped": skipped,
+            "calls_made": calls_made,
+            "calls_per_analysis": round(per_analysis, 2),
+            "calls_avoided_estimate": round(skipped * per_analysis),
+        },
+        "timings": timings,
+    }
+
+
+def _read_universe(args) -> List[str]:
+    tickers = list(args.tickers)
+    if args.universe_file:
+        with open(args.universe_file) as f:
+            tickers += [t.strip() for line in f for t in line.replace(",", " ").split()]
+    return tickers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Screen a universe on technicals; run the agents only for survivors.")
+    parser.add_argument("tickers", nargs="*")
+    parser.add_argument("--universe-file", help="file of tickers (whitespace / comma separated)")
+    parser.add_argument("--top-n", type=int, default=SCREEN_TOP_N)
+    parser.add_argument("--min-score", type=int, help="also analyze names with |score| >= this")
+    parser.add_argument("--min-adx", type=float, help="... and ADX >= this")
+    parser.add_argument("--max-revisions", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=SCREEN_CONCURRENCY)
+    parser.add_argument("--dry-run", action="store_true", help="rank and select only; no LLM calls")
+    parser.add_argument("--json", metavar="PATH", help="write the full report here")
+    args = parser.parse_args()
+
+    universe = _read_universe(args)
+    if not universe:
+        parser.error("no tickers given")
+
+    report = asyncio.run(run_screen(universe, args.top_n, args.min_score, args.min_adx, args.max_revisions,
+                                    args.concurrency, analyze=not args.dry_run))
+
+    print(f"\nScreened {report['screened']}/{report['universe']} tickers "
+          f"({len(report['unscreened'])} without enough data), {len(report['survivors'])} survivors\n")
+    print(f"{'rank':>4s}  {'ticker':8s} {'signal':6s} {'score':>5s} {'adx':>6s} {'vol30':>6s}  call")
+    for row in report["survivors"]:
+        analysis = report["analyses"].get(row["ticker"], {})
+        call = analysis.get("recommendation") or analysis.get("detail") or "-"
+        print(f"{row['rank']:4d}  {row['ticker']:8s} {row['signal']:6s} {row['score']:5d} {row['adx']:6.1f} "
+              f"{row['volatility_30d'] or 0:6.2f}  {call}")
+    llm = report["llm"]
+    print(f"\nLLM: {llm['calls_made']} calls for {llm['analyses_run']} analyses; "
+          f"~{llm['calls_avoided_estimate']} calls avoided by skipping {llm['analyses_skipped']} names")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
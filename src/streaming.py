@@ -0,0 +1,66 @@
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+# "updates"  -> one chunk per finished node
+# "messages" -> LLM tokens as they are generated (chat models stream automatically under this mode)
+# "values"   -> full state after each step; the last one is the final result
+STREAM_MODES = ["updates", "messages", "values"]
+# "tasks"    -> node start / finish; used for job progress, where tokens aren't needed
+PROGRESS_MODES = ["tasks", "updates", "values"]
+LLM_NODES = {"analyst", "risk_manager"}
+
+
+def _translate(mode: str, chunk: Any) -> List[Dict[str, Any]]:
+    """Maps one LangGraph stream chunk to simple event dicts: node / token / state / start."""
+    if mode == "messages":
+        message, metadata = chunk
+        node = metadata.get("langgraph_node")
+        if node in LLM_NODES and isinstance(message.content, str) and message.content:
+            # `step` changes on every analyst revision, so clients know when to reset their buffer
+            return [{"type": "token", "node": node, "step": metadata.get("langgraph_step"), "content": message.content}]
+        return []
+
+    if mode == "updates":
+        events = []
+        for node, update in (chunk or {}).items():
+            update = {k: v for k, v in (update or {}).items() if k != "price_history"}  # DataFrame goes out with the result
+            events.append({"type": "node", "node": node, "update": update})
+        return events
+
+    if mode == "values":
+        return [{"type": "state", "state": chunk}]
+
+    if mode == "tasks":
+        # Finishes are already reported through "updates"; only starts are new here
+        if "result" not in chunk and "error" not in chunk:
+            return [{"type": "start", "node": chunk["name"]}]
+        return []
+
+    return []
+
+
+def iter_events(app, initial_state: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Runs the graph and yields node-completion and token events, then a final
+    {"type": "result", "state": <final AgentState>} event.
+    """
+    final_state = None
+    for mode, chunk in app.stream(initial_state, stream_mode=STREAM_MODES):
+        for event in _translate(mode, chunk):
+            if event["type"] == "state":
+                final_state = event["state"]
+            else:
+                yield event
+    yield {"type": "result", "state": final_state}
+
+
+async def aiter_events(app, initial_state: Dict[str, Any],
+                       modes: List[str] = STREAM_MODES) -> AsyncIterator[Dict[str, Any]]:
+    """Async twin of iter_events for the FastAPI handlers (and the job workers, with PROGRESS_MODES)."""
+    final_state = None
+    async for mode, chunk in app.astream(initial_state, stream_mode=modes):
+        for event in _translate(mode, chunk):
+            if event["type"] == "state":
+                final_state = event["state"]
+            else:
+                yield event
+    yield {"type": "result", "state": final_state}
@@ -1,14 +1,8 @@
-import os
-from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 from src.agents.state import AgentState
+from src.agents.llm import get_llm
 
 
-llm = ChatGroq(
-    api_key=os.getenv("GROQ_API_KEY"),
-    model="llama-3.3-70b-versatile",
-    temperature=0.2 
-)
 
 def analyst_node(state: AgentState):
     """
@@ -62,7 +56,7 @@ def analyst_node(state: AgentState):
     human_message = f"Here is the latest data for {ticker}. Write the analysis.\n\nData Context:\n{context}"
 
     messages = [SystemMessage(content=system_prompt), HumanMessage(content=human_message)]
-    response = llm.invoke(messages)
+    response = get_llm(temperature=0.2).invoke(messages)
     
     return {
         "analyst_draft": response.content,
@@ -0,0 +1,179 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class DiskStore:
+    """
+    Small SQLite key/value store shared by the caches (survives process restarts).
+    Values are pickled; every row remembers when it was written so TTLs still apply after a restart.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Opens the file on first use (caller holds the lock), so creating a store at import touches no disk."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    " namespace TEXT NOT NULL, key TEXT NOT NULL, stored_at REAL NOT NULL, payload BLOB NOT NULL,"
+                    " PRIMARY KEY (namespace, key))"
+                )
+            self._conn = conn
+        return self._conn
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT stored_at, payload FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return row[0], pickle.loads(row[1])
+        except Exception:
+            # Corrupt / incompatible row (e.g. pandas upgrade) -> treat as a miss
+            return None
+
+    def set(self, namespace: str, key: str, value: Any, stored_at: float):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, stored_at, payload) VALUES (?, ?, ?, ?)",
+                (namespace, key, stored_at, payload)
+            )
+
+    def prune(self, namespace: str, keep: int):
+        """Keeps only the `keep` most recently written rows of a namespace."""
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key NOT IN ("
+                " SELECT key FROM cache WHERE namespace = ? ORDER BY stored_at DESC LIMIT ?)",
+                (namespace, namespace, keep)
+            )
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            row = self._connection().execute("SELECT COUNT(*) FROM cache WHERE namespace = ?", (namespace,)).fetchone()
+        return row[0]
+
+    def delete(self, namespace: str, key: Optional[str] = None):
+        with self._lock, self._connection() as conn:
+            if key is None:
+                conn.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+            else:
+                conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+
+class TTLCache:
+    """
+    In-memory LRU cache with a time-to-live, optionally backed by a DiskStore.
+    Lookups go memory -> disk -> miss; disk hits are promoted back into memory.
+    """
+
+    PRUNE_EVERY = 50  # disk writes between size checks
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 256,
+                 store: Optional[DiskStore] = None, clock: Callable[[], float] = time.time,
+                 disk_max_entries: Optional[int] = None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.store = store
+        self.disk_max_entries = disk_max_entries  # None = unbounded on disk
+        self._writes = 0
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def _fresh(self, stored_at: float) -> bool:
+        return self._clock() - stored_at < self.ttl
+
+    def _remember(self, key: str, stored_at: float, value: Any):
+        self._entries[key] = (stored_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._fresh(entry[0]):
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+
+        if self.store is not None:
+            entry = self.store.get(self.name, key)
+            if entry is not None and self._fresh(entry[0]):
+                with self._lock:
+                    self._remember(key, entry[0], entry[1])
+                    self._stats["disk_hits"] += 1
+                return entry[1]
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def peek(self, key: str) -> Optional[Tuple[float, Any]]:
+        """Returns (stored_at, value) even if expired, without touching stats. Used for incremental refreshes."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.store is not None:
+            entry = self.store.get(self.name, key)
+        return entry
+
+    def set(self, key: str, value: Any):
+        stored_at = self._clock()
+        with self._lock:
+            self._remember(key, stored_at, value)
+        if self.store is not None:
+            try:
+                self.store.set(self.name, key, value, stored_at)
+                self._writes += 1
+                if self.disk_max_entries and self._writes % self.PRUNE_EVERY == 0:
+                    self.store.prune(self.name, self.disk_max_entries)
+            except Exception as e:
+                # A broken disk cache must never fail a request
+                print(f"Cache write failed ({self.name}/{key}): {e}")
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any], should_cache: Callable[[Any], bool] = lambda v: True) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+        value = fetch()
+        if should_cache(value):
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Optional[str] = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+        if self.store is not None:
+            self.store.delete(self.name, key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        stats["ttl_seconds"] = self.ttl
+        return stats
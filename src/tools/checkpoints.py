@@ -0,0 +1,163 @@
+import asyncio
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# Graph checkpoints, so a run interrupted mid-way (crash, redeploy) resumes from its last finished node.
+# langgraph-checkpoint-sqlite is not a dependency, so this keeps InMemorySaver's lookup logic and
+# mirrors every write into SQLite, reloading it on start-up. Threads are deleted once their run completes,
+# and unfinished ones are expired once they can no longer be resumed, so the file stays bounded.
+# One lock covers each in-memory update and its SQLite mirror, so expire() never sees half of a put.
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", os.path.join(".cache", "checkpoints.sqlite"))
+
+
+class SqliteCheckpointer(InMemorySaver):
+    """InMemorySaver whose storage / writes / blobs are persisted to a SQLite file."""
+
+    def __init__(self, path: str):
+        # price_history is a PriceHandle (a registered dataclass), or a pandas DataFrame, which msgpack can't encode
+        super().__init__(serde=JsonPlusSerializer(
+            pickle_fallback=True, allowed_msgpack_modules=[("src.tools.price_store", "PriceHandle")]
+        ))
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self._running: Dict[str, int] = {}  # thread_id -> live runs; expire() leaves these alone
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints ("
+                " thread_id TEXT, ns TEXT, checkpoint_id TEXT, payload BLOB,"
+                " PRIMARY KEY (thread_id, ns, checkpoint_id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS writes ("
+                " thread_id TEXT, ns TEXT, checkpoint_id TEXT, payload BLOB,"
+                " PRIMARY KEY (thread_id, ns, checkpoint_id))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                " thread_id TEXT, ns TEXT, channel TEXT, version TEXT, payload BLOB,"
+                " PRIMARY KEY (thread_id, ns, channel, version))"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS threads (thread_id TEXT PRIMARY KEY, updated REAL)")
+        self._load()
+
+    def _load(self):
+        with self._lock:
+            for thread_id, ns, checkpoint_id, payload in self._conn.execute("SELECT * FROM checkpoints"):
+                self.storage[thread_id][ns][checkpoint_id] = pickle.loads(payload)
+            for thread_id, ns, checkpoint_id, payload in self._conn.execute("SELECT * FROM writes"):
+                self.writes[(thread_id, ns, checkpoint_id)] = pickle.loads(payload)
+            for thread_id, ns, channel, version, payload in self._conn.execute("SELECT * FROM blobs"):
+                self.blobs[(thread_id, ns, channel, version)] = pickle.loads(payload)
+
+    def get_tuple(self, config):
+        with self._lock:
+            return super().get_tuple(config)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"]["checkpoint_ns"]
+        with self._lock, self._conn:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            rows = [
+                (thread_id, ns, channel, str(version), pickle.dumps(self.blobs[(thread_id, ns, channel, version)]))
+                for channel, version in new_versions.items()
+            ]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)",
+                (thread_id, ns, checkpoint["id"], pickle.dumps(self.storage[thread_id][ns][checkpoint["id"]]))
+            )
+            self._conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)", (thread_id, time.time()))
+        return next_config
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        key = (config["configurable"]["thread_id"], config["configurable"].get("checkpoint_ns", ""),
+               config["configurable"]["checkpoint_id"])
+        with self._lock, self._conn:
+            super().put_writes(config, writes, task_id, task_path)
+            if key in self.writes:
+                self._conn.execute("INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?)",
+                                   (*key, pickle.dumps(self.writes[key])))
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self._conn:
+            super().delete_thread(thread_id)
+            for table in ("checkpoints", "writes", "blobs", "threads"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    # InMemorySaver's async methods call the sync ones inline; the SQLite writes go to a worker thread instead
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    @contextmanager
+    def running(self, thread_id: str):
+        """Marks a live run on `thread_id` for the duration of the block, so expire() skips it."""
+        with self._lock:
+            self._running[thread_id] = self._running.get(thread_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running[thread_id] -= 1
+                if not self._running[thread_id]:
+                    del self._running[thread_id]
+
+    def expire(self, max_age: float) -> int:
+        """Deletes threads with no checkpoint in the last `max_age` seconds and no live run; returns how many went."""
+        with self._lock:
+            fresh = {thread_id for (thread_id,) in self._conn.execute(
+                "SELECT thread_id FROM threads WHERE updated >= ?", (time.time() - max_age,)
+            )}
+            stale = [thread_id for thread_id in self.storage
+                     if thread_id not in fresh and thread_id not in self._running]
+            for thread_id in stale:
+                self.delete_thread(thread_id)
+        return len(stale)
+
+    def unfinished_threads(self) -> Dict[str, int]:
+        """thread_id -> number of checkpoints, for threads still on disk (i.e. runs that never completed)."""
+        with self._lock:
+            return {thread_id: sum(len(c) for c in namespaces.values())
+                    for thread_id, namespaces in self.storage.items()}
+
+
+@lru_cache(maxsize=1)
+def get_checkpointer() -> SqliteCheckpointer:
+    return SqliteCheckpointer(CHECKPOINT_PATH)
+
+
+def thread_config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+async def aresume_or_start(app, thread_id: str, initial_state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Input for app.ainvoke on `thread_id`: None (= resume) when the thread stopped with nodes still pending,
+    otherwise the fresh initial state (stale finished threads are cleared first so reducers start empty).
+    """
+    snapshot = await app.aget_state(thread_config(thread_id))
+    if snapshot.next:
+        print(f"--- RESUMING {thread_id} AT {', '.join(snapshot.next)} ---")
+        return None
+    if snapshot.values:
+        await get_checkpointer().adelete_thread(thread_id)
+    return initial_state
@@ -0,0 +1,158 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.tools.price_store import PriceHandle
+from src.tools.technicals import calculate_technicals
+
+# Process pool for calculate_technicals, so indicator math stops competing with the API's event loop for the GIL.
+# 0 (default) keeps it in-process. Workers are spawned (never forked from a threaded server) and warmed up once.
+TECHNICALS_WORKERS = int(os.getenv("TECHNICALS_WORKERS", "0"))
+
+# The only columns calculate_technicals reads; the rest of the frame never leaves the parent
+SHIPPED_COLUMNS = ("High", "Low", "Close")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_lock = threading.Lock()
+
+
+# --- shared memory transport: one (columns x bars) float64 block per task instead of a pickled DataFrame ---
+
+class SharedFrame:
+    """The shipped columns of `df`, copied into a shared memory block the parent owns until release()."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.shape = (len(SHIPPED_COLUMNS), len(df))
+        self._shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(self.shape)) * 8, 1))
+        self.name = self._shm.name
+        block = np.ndarray(self.shape, dtype=np.float64, buffer=self._shm.buf)
+        for i, column in enumerate(SHIPPED_COLUMNS):
+            block[i] = df[column].to_numpy(dtype=np.float64)
+        del block  # no exported views may outlive the segment
+
+    def release(self):
+        self._shm.close()
+        self._shm.unlink()
+
+
+def _technicals_from_shared(name: str, shape: Tuple[int, int]) -> dict:
+    """Worker side: attaches to the block and runs calculate_technicals on zero-copy column views."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        frame = pd.DataFrame({column: block[i] for i, column in enumerate(SHIPPED_COLUMNS)}, copy=False)
+        result = calculate_technicals(frame)
+        del frame, block
+        return result
+    finally:
+        shm.close()
+
+
+def _technicals_from_handle(handle: PriceHandle) -> dict:
+    """Worker side for stored histories: maps the column files itself, nothing is shipped but the handle."""
+    return calculate_technicals(handle.frame(SHIPPED_COLUMNS))
+
+
+def _warm_worker():
+    """Pool initializer: pays the pandas / `ta` imports and their first-call costs once per worker."""
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, 260))
+    calculate_technicals(pd.DataFrame({"High": close + 1, "Low": close - 1, "Close": close}))
+
+
+def _ready() -> int:
+    time.sleep(0.05)  # long enough that every worker gets one
+    return os.getpid()
+
+
+# --- pool lifecycle ---
+
+def get_technicals_pool(workers: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+    """The shared pool (created on first use), or None when technicals run in-process."""
+    global _pool, _pool_workers
+    workers = TECHNICALS_WORKERS if workers is None else workers
+    if workers < 1:
+        return None
+    with _lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_warm_worker)
+            _pool_workers = workers
+        return _pool
+
+
+def warm_up(workers: Optional[int] = None) -> int:
+    """Starts the workers now (not on the first request) and waits until they're warm; returns how many answered."""
+    pool = get_technicals_pool(workers)
+    if pool is None:
+        return 0
+    # Spawn-context pools start workers on demand, so hold each one busy until all have come up
+    futures = [pool.submit(_ready) for _ in range(_pool_workers * 2)]
+    return len({f.result() for f in futures})
+
+
+def shutdown_technicals_pool():
+    global _pool, _pool_workers
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _pool_workers = None, 0
+
+
+# --- entry points used by the technicals node ---
+
+def _submit(pool: ProcessPoolExecutor, df: pd.DataFrame) -> Tuple[Future, Optional[SharedFrame]]:
+    if isinstance(df, PriceHandle):
+        return pool.submit(_technicals_from_handle, df), None
+    shared = SharedFrame(df)
+    try:
+        return pool.submit(_technicals_from_shared, shared.name, shared.shape), shared
+    except BaseException:
+        shared.release()
+        raise
+
+
+def _in_process(df) -> bool:
+    return df is None or df.empty or not set(SHIPPED_COLUMNS) <= set(df.columns)
+
+
+def _calculate(df) -> dict:
+    return calculate_technicals(df.frame(SHIPPED_COLUMNS) if isinstance(df, PriceHandle) else df)
+
+
+def compute_technicals(df, workers: Optional[int] = None) -> dict:
+    """calculate_technicals for a DataFrame or PriceHandle, on the process pool when one is configured."""
+    pool = get_technicals_pool(workers)
+    if pool is None or _in_process(df):
+        return _calculate(df)
+    future, shared = _submit(pool, df)
+    try:
+        return future.result()
+    finally:
+        if shared is not None:
+            shared.release()
+
+
+async def acompute_technicals(df, workers: Optional[int] = None) -> dict:
+    """Async twin: awaits the pool future (or a thread, without a pool) so the event loop never runs the math."""
+    pool = get_technicals_pool(workers)
+    if pool is None or _in_process(df):
+        return await asyncio.to_thread(_calculate, df)
+    future, shared = _submit(pool, df)
+    try:
+        return await asyncio.wrap_future(future)
+    finally:
+        if shared is not None:
+            # Cancelled while the worker still holds the block: unlink once it lets go
+            future.add_done_callback(lambda _: shared.release())
@@ -0,0 +1,101 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List
+import httpx
+
+if TYPE_CHECKING:
+    import requests
+
+# --- CONNECTION POOL CONFIG ---
+# One keep-alive pool per provider, shared by every request in the process.
+# (Providers get separate clients because SDKs like Tavily set auth headers / base_url on the client they're given.)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "60"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+
+_async_clients: Dict[str, httpx.AsyncClient] = {}
+_sync_clients: Dict[str, httpx.Client] = {}
+_sync_sessions: Dict[str, "requests.Session"] = {}
+_on_close: List[Callable[[], None]] = []
+_lock = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+def get_async_client(provider: str) -> httpx.AsyncClient:
+    """
+    Pooled async client for `provider` ('groq', 'tavily', ...), created on first use.
+    Meant for the server's event loop (one loop per uvicorn worker).
+    """
+    with _lock:
+        client = _async_clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=_limits(), timeout=_timeout())
+            _async_clients[provider] = client
+        return client
+
+
+def get_sync_client(provider: str) -> httpx.Client:
+    """Pooled sync client for the threaded paths (dashboard, CLI, app.invoke)."""
+    with _lock:
+        client = _sync_clients.get(provider)
+        if client is None or client.is_closed:
+            client = httpx.Client(limits=_limits(), timeout=_timeout())
+            _sync_clients[provider] = client
+        return client
+
+
+def get_sync_session(provider: str) -> "requests.Session":
+    """
+    Pooled `requests` session for SDKs whose sync client only accepts one (TavilyClient), sized like the
+    httpx pools.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _lock:
+        session = _sync_sessions.get(provider)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_MAX_KEEPALIVE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sync_sessions[provider] = session
+        return session
+
+
+def on_close(callback: Callable[[], None]) -> Callable[[], None]:
+    """
+    Registers `callback` to run when the pools are closed. Used to drop SDK clients cached around a pooled
+    client (e.g. an lru_cache's cache_clear), so nothing keeps using a closed one.
+    """
+    _on_close.append(callback)
+    return callback
+
+
+async def aclose_clients():
+    """Closes every pooled client and clears the caches holding them; call on server shutdown."""
+    with _lock:
+        async_clients, sync_clients = list(_async_clients.values()), list(_sync_clients.values())
+        sync_clients += _sync_sessions.values()
+        _async_clients.clear()
+        _sync_clients.clear()
+        _sync_sessions.clear()
+    for callback in _on_close:
+        callback()
+    for client in async_clients:
+        await client.aclose()
+    for client in sync_clients:
+        client.close()
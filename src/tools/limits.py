@@ -0,0 +1,135 @@
+import asyncio
+import os
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Deque, Dict, Tuple, Union
+
+# Process-wide caps on how many graph runs may be inside each external stage at once.
+# Sync nodes (app.invoke) take slots with stage_slot, async nodes (app.ainvoke) with astage_slot;
+# both draw from the same per-stage StageLimit, served first come, first served.
+DEFAULT_LIMITS = {
+    "market_data": int(os.getenv("MARKET_DATA_CONCURRENCY", "8")),
+    "news": int(os.getenv("NEWS_CONCURRENCY", "4")),
+    "llm": int(os.getenv("LLM_CONCURRENCY", "2")),
+}
+
+_limits: Dict[str, int] = dict(DEFAULT_LIMITS)
+_stages: Dict[str, "StageLimit"] = {}
+_lock = threading.Lock()
+
+
+class StageLimit:
+    """
+    Counting semaphore shared by threads and event loops. Waiters of either kind queue in one FIFO, and a
+    released slot is handed straight to the oldest waiter, so nobody can barge in ahead of it.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[Union[threading.Event, Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = deque()
+
+    def _take_or_queue(self, waiter) -> bool:
+        with self._lock:
+            if self.in_use < self.limit and not self._waiters:
+                self.in_use += 1
+                return True
+            self._waiters.append(waiter)
+            return False
+
+    def acquire(self):
+        event = threading.Event()
+        if not self._take_or_queue(event):
+            event.wait()  # set by release() once the slot is ours
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (loop, future)
+        if self._take_or_queue(waiter):
+            return
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            if not queued and future.done() and not future.cancelled():
+                self.release()  # handed a slot in the same step we were cancelled
+            raise
+
+    def _wake(self, future: asyncio.Future):
+        if future.done():
+            self.release()  # cancelled after the hand-over was scheduled -> pass the slot on
+        else:
+            future.set_result(None)
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                try:
+                    loop.call_soon_threadsafe(self._wake, future)
+                    return
+                except RuntimeError:
+                    continue  # its event loop is closed
+            self.in_use -= 1
+
+
+def configure_limits(**limits: int) -> Dict[str, int]:
+    """
+    Override stage caps, e.g. configure_limits(llm=1, news=2).
+    Takes effect for slots acquired after the call.
+    """
+    with _lock:
+        for stage, value in limits.items():
+            if stage not in _limits:
+                raise ValueError(f"Unknown stage: {stage}")
+            if value < 1:
+                raise ValueError(f"Concurrency limit for {stage} must be >= 1")
+            _limits[stage] = value
+            _stages.pop(stage, None)
+        return dict(_limits)
+
+
+def get_limits() -> Dict[str, int]:
+    return dict(_limits)
+
+
+def _stage(stage: str) -> StageLimit:
+    with _lock:
+        if stage not in _stages:
+            _stages[stage] = StageLimit(_limits[stage])
+        return _stages[stage]
+
+
+@contextmanager
+def stage_slot(stage: str):
+    """Blocks until a slot for `stage` ('market_data', 'news' or 'llm') is free."""
+    limit = _stage(stage)
+    limit.acquire()
+    try:
+        yield
+    finally:
+        limit.release()
+
+
+@asynccontextmanager
+async def astage_slot(stage: str):
+    """
+    Async version of stage_slot sharing the same caps and the same queue.
+    Waiting parks the coroutine on a future, so it never ties up the event loop or a worker thread.
+    """
+    limit = _stage(stage)
+    await limit.aacquire()
+    try:
+        yield
+    finally:
+        limit.release()
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List
+from src.tools.cache import DiskStore, TTLCache
+from src.tools.limits import astage_slot, stage_slot
+from src.tools.rate_limit import arate_limited, get_limiter, rate_limited
+from src.tools.tracing import record_call, record_llm_usage
+
+# --- LLM RESPONSE CACHE CONFIG ---
+# Popular tickers produce byte-identical prompts within minutes; reuse the memo instead of paying Groq again.
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")   # memory | sqlite | off
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))       # 1h
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))        # in-memory entries (LRU)
+LLM_CACHE_DISK_SIZE = int(os.getenv("LLM_CACHE_DISK_SIZE", "5000"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_responses.sqlite"))
+EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "800"))  # reserved per call for Groq's TPM
+
+
+def build_llm_cache(backend: str = LLM_CACHE_BACKEND):
+    if backend == "off":
+        return None
+    if backend == "sqlite":
+        return TTLCache("llm", ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_SIZE,
+                        store=DiskStore(LLM_CACHE_PATH), disk_max_entries=LLM_CACHE_DISK_SIZE)
+    if backend == "memory":
+        return TTLCache("llm", ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_SIZE)
+    raise ValueError(f"Unknown LLM_CACHE_BACKEND: {backend}")
+
+
+llm_cache = build_llm_cache()
+
+
+def cache_key(llm, messages: List[Any]) -> str:
+    """sha256 over model, temperature and every message (type + content)."""
+    payload = {
+        "model": getattr(llm, "model_name", None) or getattr(llm, "model", None),
+        "temperature": getattr(llm, "temperature", None),
+        "messages": [[m.type, m.content] for m in messages],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(messages: List[Any]) -> int:
+    """Prompt size (~4 chars per token) plus the completion we expect, charged against Groq's tokens/min up front."""
+    return sum(len(str(m.content)) for m in messages) // 4 + EXPECTED_COMPLETION_TOKENS
+
+
+def _record(response, estimated: int) -> str:
+    """Counts one real Groq call (bytes + token usage), settles the TPM bucket and returns the response text."""
+    record_call("groq", len(response.content.encode("utf-8")) if isinstance(response.content, str) else 0)
+    record_llm_usage(response)
+    usage = getattr(response, "usage_metadata", None) or {}
+    get_limiter("groq").settle(estimated, usage.get("total_tokens", 0))
+    return response.content
+
+
+def _call(llm, messages: List[Any]) -> str:
+    """One Groq call: waits for the rate-limit scheduler, then for an LLM concurrency slot."""
+    estimated = estimate_tokens(messages)
+
+    def call():
+        with stage_slot("llm"):
+            return llm.invoke(messages)
+
+    return _record(rate_limited("groq", call, tokens=estimated), estimated)
+
+
+async def _acall(llm, messages: List[Any]) -> str:
+    estimated = estimate_tokens(messages)
+
+    async def call():
+        async with astage_slot("llm"):
+            return await llm.ainvoke(messages)
+
+    return _record(await arate_limited("groq", call, tokens=estimated), estimated)
+
+
+def invoke_cached(llm, messages: List[Any]) -> str:
+    """
+    llm.invoke(messages).content, served from the response cache when the exact same prompt was seen recently.
+    Only cache misses take an LLM concurrency slot (and Groq rate-limit budget).
+    """
+    if llm_cache is None:
+        return _call(llm, messages)
+
+    key = cache_key(llm, messages)
+    content = llm_cache.get(key)
+    if content is not None:
+        return content
+
+    content = _call(llm, messages)
+
+    if content:
+        llm_cache.set(key, content)
+    return content
+
+
+async def ainvoke_cached(llm, messages: List[Any]) -> str:
+    """Async twin of invoke_cached (llm.ainvoke, non-blocking wait for an LLM slot)."""
+    key = cache_key(llm, messages) if llm_cache is not None else None
+    if key is not None:
+        content = llm_cache.get(key)
+        if content is not None:
+            return content
+
+    content = await _acall(llm, messages)
+
+    if key is not None and content:
+        llm_cache.set(key, content)
+    return content
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    if llm_cache is None:
+        return {"backend": "off"}
+    return {"backend": "sqlite" if llm_cache.store is not None else "memory", **llm_cache.stats()}
@@ -1,6 +1,117 @@
+import json
+import math
+import os
+import numpy as np
 import yfinance as yf
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from src.tools.cache import DiskStore, TTLCache
+from src.tools.tracing import record_call
+from src.tools.rate_limit import rate_limited
+from src.tools.single_flight import SingleFlight
+from src.tools.technicals import required_bars
+
+# --- CACHE CONFIG ---
+# Fundamentals move daily, OHLC gains one bar a day -> separate TTLs per tier.
+INFO_TTL = float(os.getenv("MARKET_INFO_TTL", "21600"))          # 6h
+HISTORY_TTL = float(os.getenv("PRICE_HISTORY_TTL", "900"))       # 15min
+CACHE_SIZE = int(os.getenv("MARKET_CACHE_SIZE", "256"))          # entries per tier (LRU)
+CACHE_PATH = os.getenv("MARKET_CACHE_PATH", os.path.join(".cache", "market_data.sqlite"))  # "" = memory only
+INCREMENTAL_HISTORY = os.getenv("PRICE_HISTORY_INCREMENTAL", "1") == "1"  # append new bars to stored history
+
+_store = DiskStore(CACHE_PATH) if CACHE_PATH else None  # the SQLite file is opened on first lookup
+info_cache = TTLCache("info", ttl=INFO_TTL, max_entries=CACHE_SIZE, store=_store)
+history_cache = TTLCache("history", ttl=HISTORY_TTL, max_entries=CACHE_SIZE, store=_store)
+
+_refresh_stats = {"full": 0, "incremental": 0, "bars_downloaded": 0}
+
+# Concurrent fetches for the same ticker (from any analysis config) share one download
+market_data_flight = SingleFlight("market_data")
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters per tier; hits + disk_hits are yfinance requests that never happened."""
+    return {"info": info_cache.stats(), "history": history_cache.stats(), "refresh": dict(_refresh_stats),
+            "coalesced": market_data_flight.stats()}
+
+def frame_bytes(df: Optional[pd.DataFrame]) -> int:
+    """In-memory size of a downloaded frame, used as the payload size for tracing."""
+    return int(df.memory_usage(index=True).sum()) if df is not None else 0
+
+def lookback_period(bars: int) -> str:
+    """
+    Shortest yfinance period ('295d', ...) that still holds `bars` trading days:
+    five sessions per seven calendar days, plus one market holiday per 25 sessions and a weekend of slack.
+    """
+    return f"{math.ceil((bars + math.ceil(bars / 25)) * 7 / 5) + 3}d"
+
+# Enough history for the longest indicator warmup (SMA 200) and no more
+HISTORY_PERIOD = lookback_period(required_bars())
+
+def period_to_offset(period: str) -> pd.DateOffset:
+    """Converts a yfinance period string ('5d', '6mo', '2y', ...) to a DateOffset for trimming."""
+    units = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period for incremental refresh: {period}")
+
+def match_timezone(frame: pd.DataFrame, tz) -> pd.DataFrame:
+    """
+    Returns `frame` with its index in `tz`. yf.download gives tz-naive dates while Ticker.history gives
+    exchange-local timestamps, and both land under the same cache key; naive dates are read as wall time in `tz`.
+    """
+    index = frame.index
+    if frame.empty or (index.tz is None and tz is None):
+        return frame
+    if tz is None:
+        index = index.tz_localize(None)
+    elif index.tz is None:
+        index = index.tz_localize(tz)
+    else:
+        index = index.tz_convert(tz)
+    return frame.set_axis(index)
+
+def no_bars(frame: Optional[pd.DataFrame]) -> bool:
+    """yfinance's answer to a throttled or failed history request; retried by the rate limiter."""
+    return frame is None or frame.empty
+
+def merge_history(stored: pd.DataFrame, new_bars: pd.DataFrame, period: str) -> pd.DataFrame:
+    """
+    Appends freshly downloaded bars to a stored history and trims it to the lookback window.
+    Overlapping timestamps take the new values (the last stored bar may have been a partial intraday bar).
+    """
+    if new_bars is None or new_bars.empty:
+        merged = stored
+    else:
+        merged = pd.concat([stored[stored.index < new_bars.index[0]], new_bars])
+        merged = merged[~merged.index.duplicated(keep="last")]
+
+    cutoff = merged.index[-1] - period_to_offset(period)
+    return merged[merged.index > cutoff]
+
+# Non-zero on the bar a corporate action takes effect
+ACTION_COLUMNS = ("Dividends", "Stock Splits")
+
+def history_rewritten(stored: pd.DataFrame, new_bars: pd.DataFrame, rtol: float = 1e-5) -> bool:
+    """
+    True when `new_bars` show that the stored history is no longer valid. Prices are auto-adjusted, so a split or
+    dividend the stored copy has not seen rescales every earlier bar. A complete bar that is in both frames but
+    has a different Close means an adjustment has already happened.
+    """
+    if new_bars is None or new_bars.empty:
+        return False
+    for column in ACTION_COLUMNS:
+        if column not in new_bars.columns:
+            continue
+        actions = new_bars[column].fillna(0)
+        seen = stored[column].reindex(new_bars.index).fillna(0) if column in stored.columns else 0
+        if ((actions != 0) & (actions != seen)).any():
+            return True
+
+    overlap = new_bars.index.intersection(stored.index)
+    complete = overlap[overlap < stored.index[-1]]  # the last stored bar may have been a partial intraday bar
+    return not np.allclose(stored.loc[complete, "Close"].to_numpy(dtype=float),
+                           new_bars.loc[complete, "Close"].to_numpy(dtype=float), rtol=rtol)
 
 def format_market_cap(val) -> str:
     """Helper to make huge numbers readable (e.g., 2.5T, 45B)"""
@@ -22,22 +133,143 @@ def format_market_cap(val) -> str:
     else:
         return f"${val:,.0f}"
 
-def fetch_market_data(ticker: str) -> Dict[str, Any]:
+def fetch_price_history_batch(tickers: List[str], period: str = HISTORY_PERIOD) -> Dict[str, pd.DataFrame]:
     """
-    Fetch comprehensive market data for a given stock ticker.
-    Returns a dictionary with summary metrics AND the raw history dataframe.
+    Downloads price history for many tickers in ONE bulk yfinance request.
+    Returns {TICKER: DataFrame} in the same shape as Ticker.history(); tickers with no data are omitted.
     """
-    try:
+    tickers = [t.upper().strip() for t in tickers]
 
-        ticker = ticker.upper().strip()
-        stock = yf.Ticker(ticker)
+    # Only download what the cache can't serve
+    histories = {}
+    missing = []
+    for ticker in tickers:
+        cached = history_cache.get(f"{ticker}:{period}")
+        if cached is not None:
+            histories[ticker] = cached
+        else:
+            missing.append(ticker)
+
+    if not missing:
+        return histories
+
+    data = rate_limited("yfinance", lambda: yf.download(
+        missing,
+        period=period,
+        group_by="ticker",
+        actions=True,        # match Ticker.history (Dividends / Stock Splits columns)
+        auto_adjust=True,
+        threads=True,
+        progress=False
+    ), retry_if=no_bars)
+    record_call("yfinance", frame_bytes(data))
+
+    if data is None or data.empty:
+        return histories
+
+    for ticker in missing:
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            hist = data[ticker]
+        else:
+            hist = data
+
+        hist = hist.dropna(how="all")
+        if not hist.empty:
+            histories[ticker] = hist
+            history_cache.set(f"{ticker}:{period}", hist)
+
+    return histories
 
+def get_info(ticker: str) -> Dict[str, Any]:
+    """Cached `Ticker.info`. Failed / empty lookups are not cached so they retry next time."""
+    def fetch():
         try:
-            info = stock.info
+            info = rate_limited("yfinance", lambda: yf.Ticker(ticker).info) or {}
+            record_call("yfinance", len(json.dumps(info, default=str)))
+            return info
         except:
-            info = {}
+            return {}
 
-        hist = stock.history(period="6mo")
+    return info_cache.get_or_fetch(ticker, fetch, should_cache=bool)
+
+def _download_full_history(ticker: str, period: str) -> pd.DataFrame:
+    hist = rate_limited("yfinance", lambda: yf.Ticker(ticker).history(period=period), retry_if=no_bars)
+    record_call("yfinance", frame_bytes(hist))
+    _refresh_stats["full"] += 1
+    _refresh_stats["bars_downloaded"] += len(hist)
+    return hist
+
+def _refresh_history(ticker: str, stored: pd.DataFrame, period: str) -> pd.DataFrame:
+    """
+    Fetches only the bars since the last stored one (inclusive, to replace a partial bar), plus the complete
+    bar before it to check against. A split, dividend or changed Close means a full download instead.
+    """
+    first_bar = stored.index[-2] if len(stored) > 1 else stored.index[-1]
+    new_bars = rate_limited("yfinance", lambda: yf.Ticker(ticker).history(start=first_bar.strftime("%Y-%m-%d")),
+                            retry_if=no_bars)
+    record_call("yfinance", frame_bytes(new_bars))
+    new_bars = match_timezone(new_bars, stored.index.tz)
+    _refresh_stats["incremental"] += 1
+    _refresh_stats["bars_downloaded"] += len(new_bars)
+    if history_rewritten(stored, new_bars):
+        print(f"Corporate action or adjusted prices for {ticker}, refetching full history")
+        return _download_full_history(ticker, period)
+    return merge_history(stored, new_bars, period)
+
+def get_price_history(ticker: str, period: str = HISTORY_PERIOD) -> pd.DataFrame:
+    """
+    Cached `Ticker.history`. Empty frames are not cached.
+    When the cached copy has expired, only the missing bars are downloaded and appended (incremental mode).
+    """
+    key = f"{ticker}:{period}"
+    hist = history_cache.get(key)
+    if hist is not None:
+        return hist
+
+    hist = None
+    stale = history_cache.peek(key) if INCREMENTAL_HISTORY else None
+    if stale is not None and not stale[1].empty:
+        stored = stale[1]
+        # Too old to be worth patching -> full download
+        if stored.index[-1] >= pd.Timestamp.now(tz=stored.index.tz) - period_to_offset(period):
+            try:
+                hist = _refresh_history(ticker, stored, period)
+            except Exception as e:
+                print(f"Incremental refresh failed for {ticker}, refetching: {e}")
+
+    if hist is None:
+        hist = _download_full_history(ticker, period)
+
+    if hist is not None and not hist.empty:
+        history_cache.set(key, hist)
+    return hist
+
+def fetch_market_data(ticker: str, history: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    """
+    Fetch comprehensive market data for a given stock ticker.
+    Returns a dictionary with summary metrics AND the raw history dataframe.
+    Pass `history` (e.g. from fetch_price_history_batch) to skip the per-ticker history download.
+    Concurrent calls for the same ticker are coalesced into one fetch.
+    """
+    ticker = ticker.upper().strip()
+    if history is not None and not history.empty:
+        return _fetch_market_data(ticker, history)
+
+    result, _ = market_data_flight.do(ticker, lambda: _fetch_market_data(ticker))
+    return dict(result)  # callers pop keys off their copy (the DataFrame itself is shared, read-only)
+
+def _fetch_market_data(ticker: str, history: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    try:
+
+        info = get_info(ticker)
+
+        if history is not None and not history.empty:
+            hist = history
+            history_cache.set(f"{ticker}:{HISTORY_PERIOD}", hist)
+        else:
+            hist = get_price_history(ticker)
         
         if hist.empty:
             return {"error": f"No price data available for ticker: {ticker}"}
@@ -1,56 +1,125 @@
+import json
 import os
+from functools import lru_cache
 from typing import List, Dict
-from tavily import TavilyClient # type: ignore
 from dotenv import load_dotenv
+from src.tools.http_pool import on_close
+from src.tools.tracing import record_call
+from src.tools.rate_limit import arate_limited, rate_limited
+from src.tools.single_flight import AsyncSingleFlight, SingleFlight
+
+# Concurrent searches for the same query share one Tavily request
+news_flight = SingleFlight("news")
+anews_flight = AsyncSingleFlight("news")
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Tavily
-tavily_api_key = os.getenv("TAVILY_API_KEY")
-if not tavily_api_key:
-    raise ValueError("Missing TAVILY_API_KEY in .env file")
+@lru_cache(maxsize=1)
+def get_tavily_client():
+    """
+    Tavily client on the shared keep-alive pool, created on first search.
+    A missing key surfaces as a search error, not an import error.
+    """
+    from tavily import TavilyClient # type: ignore
+    from src.tools.http_pool import get_sync_session
+
+    tavily_api_key = os.getenv("TAVILY_API_KEY")
+    if not tavily_api_key:
+        raise ValueError("Missing TAVILY_API_KEY in .env file")
+
+    return TavilyClient(api_key=tavily_api_key, session=get_sync_session("tavily"))
+
+on_close(get_tavily_client.cache_clear)
+
+@lru_cache(maxsize=1)
+def get_async_tavily_client():
+    """Async Tavily client on the shared keep-alive pool (see src/tools/http_pool.py)."""
+    from tavily import AsyncTavilyClient # type: ignore
+    from src.tools.http_pool import get_async_client
 
-tavily = TavilyClient(api_key=tavily_api_key)
+    tavily_api_key = os.getenv("TAVILY_API_KEY")
+    if not tavily_api_key:
+        raise ValueError("Missing TAVILY_API_KEY in .env file")
+
+    return AsyncTavilyClient(api_key=tavily_api_key, client=get_async_client("tavily"))
+
+on_close(get_async_tavily_client.cache_clear)
+
+def news_coalescing_stats() -> Dict[str, Dict[str, int]]:
+    return {"sync": news_flight.stats(), "async": anews_flight.stats()}
+
+def parse_news_results(response: dict) -> List[Dict[str, str]]:
+    """Dedupes and trims raw Tavily results."""
+    news_items = []
+    seen_urls = set()
+
+    for result in response.get('results', []):
+        url = result['url']
+        
+        # Deduplicate articles
+        if url in seen_urls:
+            continue
+        seen_urls.add(url)
+        
+        # Clean up the content (limit length to avoid token overflow)
+        content = result.get('content', '')[:1000] 
+        
+        news_items.append({
+            "title": result['title'],
+            "url": url,
+            "content": content,
+            "score": result.get('score', 0), # Relevance score
+            "published_date": result.get('published_date') # used for recency ranking when Tavily provides it
+        })
+        
+    return news_items
 
 def get_market_news(query: str, max_results: int = 5) -> List[Dict[str, str]]:
     """
     Searches for the latest market news.
     Returns a list of dictionaries with 'title', 'url', and 'content'.
+    Concurrent identical searches are coalesced into one request.
     """
+    news, _ = news_flight.do((query, max_results), lambda: _search_news(query, max_results))
+    return list(news)
+
+def _search_news(query: str, max_results: int) -> List[Dict[str, str]]:
     try:
         print(f"--- FETCHING NEWS FOR: {query} ---")
         
         # We use "finance" as the topic to get better market-relevant results
-        response = tavily.search(
+        response = rate_limited("tavily", lambda: get_tavily_client().search(
             query=query, 
             topic="finance", 
             max_results=max_results, 
             include_answer=False  # We want raw articles, not a summary
-        )
+        ))
+        record_call("tavily", len(json.dumps(response, default=str)))
         
-        news_items = []
-        seen_urls = set()
-
-        for result in response.get('results', []):
-            url = result['url']
-            
-            # Deduplicate articles
-            if url in seen_urls:
-                continue
-            seen_urls.add(url)
-            
-            # Clean up the content (limit length to avoid token overflow)
-            content = result.get('content', '')[:1000] 
-            
-            news_items.append({
-                "title": result['title'],
-                "url": url,
-                "content": content,
-                "score": result.get('score', 0) # Relevance score
-            })
-            
-        return news_items
+        return parse_news_results(response)
         
     except Exception as e:
-        return [{"error": f"News search failed: {str(e)}"}]
\ No newline at end of file
+        return [{"error": f"News search failed: {str(e)}"}]
+
+async def aget_market_news(query: str, max_results: int = 5) -> List[Dict[str, str]]:
+    """Async version of get_market_news (no worker thread held while waiting on Tavily)."""
+    news, _ = await anews_flight.do((query, max_results), lambda: _asearch_news(query, max_results))
+    return list(news)
+
+async def _asearch_news(query: str, max_results: int) -> List[Dict[str, str]]:
+    try:
+        print(f"--- FETCHING NEWS FOR: {query} ---")
+
+        response = await arate_limited("tavily", lambda: get_async_tavily_client().search(
+            query=query,
+            topic="finance",
+            max_results=max_results,
+            include_answer=False
+        ))
+        record_call("tavily", len(json.dumps(response, default=str)))
+
+        return parse_news_results(response)
+
+    except Exception as e:
+        return [{"error": f"News search failed: {str(e)}"}]
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+import weakref
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Memory-mapped columnar price store: one .npy file per field per ticker, so the graph state and its checkpoints
+# carry a PriceHandle (a few strings and ints) instead of an OHLCV DataFrame, and readers map only the columns
+# they touch. The process still holds frames elsewhere: market_data's history_cache keeps the downloaded
+# DataFrames, and materialize() turns handles back into frames for anything stored or returned.
+PRICE_STORE_PATH = os.getenv("PRICE_STORE_PATH", os.path.join(".cache", "prices"))  # "" = DataFrames in the state
+PRICE_STORE_DTYPE = os.getenv("PRICE_STORE_DTYPE", "float64")  # float32 halves the files (~7 significant digits)
+# Superseded versions are deleted only after this long, so handles held by jobs, dashboard sessions and
+# checkpointed threads (all retained for an hour or less) keep resolving; the newest version is always kept.
+PRICE_STORE_RETENTION_SECONDS = float(os.getenv("PRICE_STORE_RETENTION_SECONDS", "86400"))
+
+
+@dataclass(frozen=True)
+class PriceHandle:
+    """One immutable version of a ticker's history on disk. Cheap to pickle, checkpoint and ship to a worker."""
+    root: str
+    ticker: str
+    version: str
+    rows: int
+    columns: Tuple[str, ...]
+    tz: Optional[str] = None
+
+    def __post_init__(self):
+        object.__setattr__(self, "columns", tuple(self.columns))  # comes back as a list from msgpack checkpoints
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.root, self.ticker, self.version)
+
+    @property
+    def empty(self) -> bool:
+        return self.rows == 0
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only array over the memory map of one field (a plain ndarray view, so it pickles as data)."""
+        return np.asarray(np.load(os.path.join(self.path, f"c{self.columns.index(name)}.npy"), mmap_mode="r"))
+
+    def index(self) -> pd.Index:
+        values = np.asarray(np.load(os.path.join(self.path, "index.npy"), mmap_mode="r"))
+        if values.dtype.kind != "M":
+            return pd.Index(values)
+        index = pd.DatetimeIndex(values, name="Date")
+        return index.tz_localize("UTC").tz_convert(self.tz) if self.tz else index
+
+    def frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """DataFrame over the mapped columns (no copy); `columns` limits what is mapped at all."""
+        names = list(self.columns if columns is None else columns)
+        return pd.DataFrame({name: self.column(name) for name in names}, index=self.index(), copy=False)
+
+
+class PriceStore:
+    """
+    Directory of immutable versions: <root>/<TICKER>/<fingerprint>/{index.npy, c0.npy, ..., meta.json}.
+    Writing the same history twice is a no-op. Versions not written or re-used for `retention` seconds are
+    deleted, except each ticker's newest.
+    """
+
+    def __init__(self, root: str, dtype: str = PRICE_STORE_DTYPE, retention: float = PRICE_STORE_RETENTION_SECONDS):
+        self.root = root
+        self.dtype = np.dtype(dtype)
+        self.retention = retention
+        self._last: Dict[str, Tuple[weakref.ref, PriceHandle]] = {}  # ticker -> (frame last put, its handle)
+        os.makedirs(root, exist_ok=True)
+
+    def _arrays(self, df: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, np.ndarray], Optional[str]]:
+        index, tz = df.index, None
+        if isinstance(index, pd.DatetimeIndex):
+            tz = str(index.tz) if index.tz is not None else None
+            index_values = (index.tz_convert("UTC").tz_localize(None) if tz else index).to_numpy()
+        else:
+            index_values = np.asarray(index)
+            if index_values.dtype == object:
+                raise ValueError("Price store needs a datetime or numeric index")
+        columns = {}
+        for name in df.columns:
+            values = df[name].to_numpy()
+            if values.dtype.kind == "f":
+                values = values.astype(self.dtype, copy=False)
+            elif values.dtype.kind not in "iub":
+                continue  # non-numeric columns aren't price data
+            columns[str(name)] = np.ascontiguousarray(values)
+        return index_values, columns, tz
+
+    def put(self, ticker: str, df: pd.DataFrame) -> PriceHandle:
+        """
+        Writes `df` (if this exact history isn't stored yet) and returns the handle to it.
+        Putting the same frame object again (a history cache hit hands out the one it holds) skips the hashing
+        and the directory scan; cached frames are never modified in place, so its version can't have changed.
+        """
+        ticker = ticker.upper()
+        last = self._last.get(ticker)
+        if last is not None and last[0]() is df and os.path.isdir(last[1].path):
+            os.utime(last[1].path)
+            return last[1]
+
+        index_values, columns, tz = self._arrays(df)
+        digest = hashlib.blake2b(index_values.tobytes(), digest_size=8)
+        for name, values in columns.items():
+            digest.update(name.encode())
+            digest.update(values.tobytes())
+        handle = PriceHandle(self.root, ticker, digest.hexdigest(), len(df), tuple(columns), tz)
+
+        if not os.path.isdir(handle.path):
+            staging = os.path.join(self.root, ticker, f".{handle.version}.{uuid.uuid4().hex}")
+            os.makedirs(staging)
+            try:
+                np.save(os.path.join(staging, "index.npy"), index_values)
+                for i, values in enumerate(columns.values()):
+                    np.save(os.path.join(staging, f"c{i}.npy"), values)
+                with open(os.path.join(staging, "meta.json"), "w") as f:
+                    json.dump({"rows": handle.rows, "columns": list(handle.columns), "tz": tz}, f)
+                os.rename(staging, handle.path)  # readers never see a partial version
+            except OSError:
+                shutil.rmtree(staging, ignore_errors=True)
+                if not os.path.isdir(handle.path):  # lost the race to an identical writer -> fine
+                    raise
+        os.utime(handle.path)  # newest = most recently written or re-used
+        self._prune(ticker)
+        self._last[ticker] = (weakref.ref(df), handle)
+        return handle
+
+    def get(self, ticker: str) -> Optional[PriceHandle]:
+        """Handle to the newest stored version, or None."""
+        versions = self._versions(ticker.upper())
+        if not versions:
+            return None
+        with open(os.path.join(versions[0], "meta.json")) as f:
+            meta = json.load(f)
+        return PriceHandle(self.root, ticker.upper(), os.path.basename(versions[0]), meta["rows"],
+                           tuple(meta["columns"]), meta["tz"])
+
+    def _versions(self, ticker: str) -> list:
+        directory = os.path.join(self.root, ticker)
+        if not os.path.isdir(directory):
+            return []
+        paths = [os.path.join(directory, name) for name in os.listdir(directory) if not name.startswith(".")]
+        return sorted(paths, key=os.path.getmtime, reverse=True)
+
+    def _prune(self, ticker: str):
+        cutoff = time.time() - self.retention
+        for path in self._versions(ticker)[1:]:
+            if os.path.getmtime(path) < cutoff:
+                # Open memory maps stay valid after the unlink; only new opens of this version fail
+                shutil.rmtree(path, ignore_errors=True)
+
+
+@lru_cache(maxsize=None)
+def get_price_store() -> Optional[PriceStore]:
+    """Process-wide store at PRICE_STORE_PATH, or None when the state should carry DataFrames."""
+    return PriceStore(PRICE_STORE_PATH) if PRICE_STORE_PATH else None
+
+
+def as_frame(price_history: Any) -> Optional[pd.DataFrame]:
+    """
+    price_history from a graph state (DataFrame, PriceHandle or None) as a DataFrame.
+    The frame maps the version's files now, so it stays readable after the version is pruned.
+    """
+    if isinstance(price_history, PriceHandle):
+        return price_history.frame()
+    return price_history
+
+
+def materialize(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of `state` with a PriceHandle swapped for its DataFrame, for any state kept beyond its run."""
+    if isinstance(state.get("price_history"), PriceHandle):
+        return {**state, "price_history": as_frame(state["price_history"])}
+    return state
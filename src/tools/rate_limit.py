@@ -0,0 +1,259 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Central scheduler for provider quotas (yfinance, Tavily, Groq).
+# Each provider gets token buckets for requests/min (and tokens/min for Groq). Callers queue by priority:
+# interactive requests (dashboard, /analyze) always go before batch work, which only gets what's left.
+# A 429 blocks the whole provider for a jittered backoff instead of letting every caller hammer it. yfinance usually
+# answers a throttled history request with an empty frame rather than an error, so its history calls pass
+# `retry_if` to get the same treatment.
+
+RATE_LIMITS = {
+    "yfinance": {"rpm": float(os.getenv("YFINANCE_RPM", "120"))},
+    "tavily": {"rpm": float(os.getenv("TAVILY_RPM", "100"))},
+    "groq": {"rpm": float(os.getenv("GROQ_RPM", "30")), "tpm": float(os.getenv("GROQ_TPM", "12000"))},
+}
+MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("RATE_LIMIT_BACKOFF_BASE", "1.0"))   # seconds, doubled per attempt
+BACKOFF_CAP = float(os.getenv("RATE_LIMIT_BACKOFF_CAP", "30"))
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+_priority: ContextVar[str] = ContextVar("request_priority", default="interactive")
+
+
+@contextmanager
+def request_priority(level: str):
+    """Runs the block (and every graph node it starts) at `level`: 'interactive' or 'batch'."""
+    if level not in PRIORITIES:
+        raise ValueError(f"Unknown priority: {level}")
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a provider keeps answering 429 after MAX_RETRIES backoffs."""
+
+
+class TokenBucket:
+    """Refills at `per_minute` / 60 per second up to a full minute's worth. Can go negative (debt)."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.level = per_minute
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 = now). Requests bigger than the bucket wait for a full one."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def adjust(self, amount: float):
+        """Gives back (positive) or charges (negative) tokens after the real usage is known."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class ProviderLimiter:
+    """Request (and token) buckets for one provider plus the priority queue of callers waiting on them."""
+
+    POLL = 0.05  # how often queued (non-head) async callers re-check
+
+    def __init__(self, name: str, rpm: float, tpm: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.clock = clock
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock) if tpm else None
+        self.blocked_until = 0.0
+        self._queue = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = {"granted": 0, "waited_seconds": 0.0, "throttled": 0}
+
+    def _enqueue(self, priority: str):
+        with self._cond:
+            ticket = (PRIORITIES[priority], next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            return ticket
+
+    def _leave(self, ticket, waited: float):
+        with self._cond:
+            self._stats["waited_seconds"] += waited
+            if ticket in self._queue:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+            self._cond.notify_all()
+
+    def _try(self, ticket, tokens: float) -> float:
+        """Grants the slot if `ticket` is first in line and the buckets allow it; else returns seconds to wait."""
+        with self._cond:
+            if self._queue[0] != ticket:
+                return self.POLL
+            wait = max(self.blocked_until - self.clock(), self.requests.wait_time(1))
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.wait_time(tokens))
+            if wait > 0:
+                return wait
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            if self.tokens is not None and tokens:
+                self.tokens.take(tokens)
+            self._stats["granted"] += 1
+            self._cond.notify_all()
+            return 0.0
+
+    def acquire(self, priority: str = "interactive", tokens: float = 0):
+        """Blocks until this caller may send one request costing `tokens` (LLM tokens, Groq only)."""
+        ticket = self._enqueue(priority)
+        started = time.perf_counter()
+        try:
+            while True:
+                wait = self._try(ticket, tokens)
+                if wait == 0:
+                    return
+                with self._cond:
+                    self._cond.wait(timeout=min(wait, 1.0))
+        finally:
+            self._leave(ticket, time.perf_counter() - started)
+
+    async def aacquire(self, priority: str = "interactive", tokens: float = 0):
+        """Async acquire; sleeps on the event loop instead of blocking a thread."""
+        ticket = self._enqueue(priority)
+        started = time.perf_counter()
+        try:
+            while True:
+                wait = self._try(ticket, tokens)
+                if wait == 0:
+                    return
+                await asyncio.sleep(min(wait, 1.0))
+        finally:
+            self._leave(ticket, time.perf_counter() - started)
+
+    def throttled(self, delay: float):
+        """The provider said 429: nobody calls it again for `delay` seconds."""
+        with self._cond:
+            self.blocked_until = max(self.blocked_until, self.clock() + delay)
+            self._stats["throttled"] += 1
+
+    def settle(self, estimated: float, actual: float):
+        """Corrects the token bucket once the real token usage of a call is known."""
+        if self.tokens is not None and actual:
+            with self._cond:
+                self.tokens.adjust(estimated - actual)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = {
+                **self._stats,
+                "waited_seconds": round(self._stats["waited_seconds"], 3),
+                "queued": len(self._queue),
+                "requests_available": round(self.requests.level, 2),
+                "rpm": self.requests.capacity,
+            }
+            if self.tokens is not None:
+                stats.update({"tokens_available": round(self.tokens.level), "tpm": self.tokens.capacity})
+            return stats
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    with _lock:
+        if provider not in _limiters:
+            config = RATE_LIMITS[provider]
+            _limiters[provider] = ProviderLimiter(provider, config["rpm"], config.get("tpm"))
+        return _limiters[provider]
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    return {provider: get_limiter(provider).stats() for provider in RATE_LIMITS}
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """429s from httpx / the Groq SDK / Tavily, and yfinance's YFRateLimitError."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return "ratelimit" in text or "rate limit" in text or "too many requests" in text
+
+
+def backoff_delay(attempt: int, error: Optional[Exception] = None) -> float:
+    """Full-jitter exponential backoff; a Retry-After header, when present, is the floor."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        delay = max(delay, float(headers.get("retry-after", 0)))
+    except (TypeError, ValueError):
+        pass
+    return delay
+
+
+def rate_limited(provider: str, call: Callable[[], Any], tokens: float = 0,
+                 retry_if: Optional[Callable[[Any], bool]] = None) -> Any:
+    """
+    Runs `call()` once the scheduler grants `provider` a slot, retrying 429s with jittered backoff.
+    Results that `retry_if` flags are backed off and retried the same way, for providers that answer a throttled
+    request with an empty result instead of an error (yfinance); the last one is returned once retries run out.
+    Priority comes from request_priority().
+    """
+    limiter = get_limiter(provider)
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire(_priority.get(), tokens)
+        try:
+            result = call()
+        except Exception as e:
+            if not is_rate_limited(e):
+                raise
+            if attempt == MAX_RETRIES:
+                raise RateLimitExceeded(f"{provider} still rate limited after {MAX_RETRIES} retries: {e}") from e
+            limiter.throttled(backoff_delay(attempt, e))
+            continue
+        if retry_if is None or attempt == MAX_RETRIES or not retry_if(result):
+            return result
+        limiter.throttled(backoff_delay(attempt))
+
+
+async def arate_limited(provider: str, call: Callable[[], Awaitable[Any]], tokens: float = 0,
+                        retry_if: Optional[Callable[[Any], bool]] = None) -> Any:
+    """Async twin of rate_limited; `call` returns a fresh awaitable per attempt."""
+    limiter = get_limiter(provider)
+    for attempt in range(MAX_RETRIES + 1):
+        await limiter.aacquire(_priority.get(), tokens)
+        try:
+            result = await call()
+        except Exception as e:
+            if not is_rate_limited(e):
+                raise
+            if attempt == MAX_RETRIES:
+                raise RateLimitExceeded(f"{provider} still rate limited after {MAX_RETRIES} retries: {e}") from e
+            limiter.throttled(backoff_delay(attempt, e))
+            continue
+        if retry_if is None or attempt == MAX_RETRIES or not retry_if(result):
+            return result
+        limiter.throttled(backoff_delay(attempt))
@@ -0,0 +1,512 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# Record / replay for the three providers (yfinance, Tavily, Groq), so the pipeline can be run and
+# benchmarked offline with realistic payloads and latencies.
+#
+#   with record_providers("fixtures/"):  ... live run ...        -> writes market.json / tavily.json / llm.json
+#   with replay_providers(FixtureStore.load("fixtures/"), latency_scale=0.2):  ... offline run ...
+#
+# Replay swaps the same module-level seams the tests monkeypatch (market_data.yf, the Tavily client getters,
+# get_llm in the agents). Recorded latencies are slept (scaled), so concurrency effects stay visible.
+REPLAY_FIXTURES_PATH = os.getenv("REPLAY_FIXTURES_PATH", os.path.join("benchmarks", "fixtures"))
+
+
+def message_key(messages: List[Any]) -> str:
+    """Model-independent key for a prompt (recorded with Groq, replayed under another model name)."""
+    payload = json.dumps([(getattr(m, "type", ""), getattr(m, "content", str(m))) for m in messages])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def llm_role(messages: List[Any]) -> str:
+    """Which agent a prompt comes from, for replaying a prompt that wasn't recorded verbatim."""
+    system = getattr(messages[0], "content", "") if messages else ""
+    if "Risk Manager at a hedge fund" in system:
+        return "risk_manager"
+    if "revising your own investment memo" in system:
+        return "revision"
+    return "analyst"
+
+
+def _frame_to_json(df: pd.DataFrame) -> Dict[str, Any]:
+    index = df.index
+    tz = str(index.tz) if isinstance(index, pd.DatetimeIndex) and index.tz is not None else None
+    return {
+        "index": [ts.isoformat() for ts in index],
+        "tz": tz,
+        "columns": {str(c): df[c].tolist() for c in df.columns},
+    }
+
+
+def _frame_from_json(data: Dict[str, Any]) -> pd.DataFrame:
+    index = pd.to_datetime(data["index"], utc=data["tz"] is not None)
+    if data["tz"] is not None:
+        index = index.tz_convert(data["tz"])
+    return pd.DataFrame(data["columns"], index=pd.DatetimeIndex(index, name="Date"))
+
+
+class FixtureStore:
+    """
+    Recorded provider responses:
+      market[TICKER] = {"info": dict, "history": DataFrame, "latency": {"info": s, "history": s}}
+      news[query]    = {"response": Tavily response dict, "latency": s}
+      llm[key]       = {"role": ..., "content": str, "usage": {...}, "latency": s}
+    """
+
+    def __init__(self):
+        self.market: Dict[str, Dict[str, Any]] = {}
+        self.news: Dict[str, Dict[str, Any]] = {}
+        self.llm: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "fallbacks": 0, "misses": 0}
+
+    # --- persistence (plain JSON, so fixture changes show up in diffs) ---
+    @classmethod
+    def load(cls, path: str) -> "FixtureStore":
+        store = cls()
+        with open(os.path.join(path, "market.json")) as f:
+            for ticker, entry in json.load(f).items():
+                store.market[ticker] = {**entry, "history": _frame_from_json(entry["history"])}
+        with open(os.path.join(path, "tavily.json")) as f:
+            store.news = json.load(f)
+        with open(os.path.join(path, "llm.json")) as f:
+            store.llm = json.load(f)
+        return store
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        market = {t: {**e, "history": _frame_to_json(e["history"])} for t, e in self.market.items()}
+        for name, data in (("market.json", market), ("tavily.json", self.news), ("llm.json", self.llm)):
+            with open(os.path.join(path, name), "w") as f:
+                json.dump(data, f, indent=1, default=str)
+
+    # --- recording ---
+    def add_info(self, ticker: str, info: Dict[str, Any], latency: float):
+        with self._lock:
+            entry = self.market.setdefault(ticker, {"info": {}, "history": pd.DataFrame(), "latency": {}})
+            entry["info"], entry["latency"]["info"] = info, latency
+
+    def add_history(self, ticker: str, hist: pd.DataFrame, latency: float):
+        with self._lock:
+            entry = self.market.setdefault(ticker, {"info": {}, "history": pd.DataFrame(), "latency": {}})
+            if len(hist) >= len(entry["history"]):  # keep the longest lookback seen
+                entry["history"] = hist
+            entry["latency"]["history"] = latency
+
+    def add_news(self, query: str, response: Dict[str, Any], latency: float):
+        with self._lock:
+            self.news[query] = {"response": response, "latency": latency}
+
+    def add_llm(self, messages: List[Any], message: Any, latency: float):
+        usage = dict(getattr(message, "usage_metadata", None) or {})
+        with self._lock:
+            self.llm[message_key(messages)] = {
+                "role": llm_role(messages), "content": message.content, "usage": usage, "latency": latency
+            }
+
+    # --- replay ---
+    def _count(self, outcome: str):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def market_entry(self, ticker: str) -> Optional[Dict[str, Any]]:
+        entry = self.market.get(ticker.upper())
+        self._count("hits" if entry else "misses")
+        return entry
+
+    def news_entry(self, query: str) -> Dict[str, Any]:
+        entry = self.news.get(query)
+        if entry is not None:
+            self._count("hits")
+            return entry
+        # Same ticker, different wording -> closest recorded search
+        ticker = query.split()[0].upper() if query.split() else ""
+        for recorded, entry in self.news.items():
+            if recorded.split()[0].upper() == ticker:
+                self._count("fallbacks")
+                return entry
+        self._count("misses")
+        return {"response": {"results": []}, "latency": 0.0}
+
+    def llm_entry(self, messages: List[Any]) -> Dict[str, Any]:
+        key = message_key(messages)
+        entry = self.llm.get(key)
+        if entry is not None:
+            self._count("hits")
+            return entry
+        # Prompt changed since recording (new data / prompt edits): reuse a response from the same agent,
+        # picked deterministically so replays are repeatable
+        role = llm_role(messages)
+        candidates = [e for _, e in sorted(self.llm.items()) if e["role"] == role]
+        if not candidates:
+            self._count("misses")
+            raise KeyError(f"No recorded {role} LLM response")
+        self._count("fallbacks")
+        return candidates[int(key, 16) % len(candidates)]
+
+
+# --- replay stand-ins ---
+
+class _ReplayTicker:
+    def __init__(self, replay: "ReplayYFinance", ticker: str):
+        self._replay = replay
+        self._ticker = ticker.upper()
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        entry = self._replay.fixtures.market_entry(self._ticker)
+        if entry is None:
+            return {}
+        self._replay.sleep(entry["latency"].get("info", 0.0))
+        return dict(entry["info"])
+
+    def history(self, period: Optional[str] = None, start: Optional[str] = None, **kwargs) -> pd.DataFrame:
+        entry = self._replay.fixtures.market_entry(self._ticker)
+        if entry is None:
+            return pd.DataFrame()
+        self._replay.sleep(entry["latency"].get("history", 0.0))
+        return self._replay.window(entry["history"], period, start)
+
+
+class ReplayYFinance:
+    """Stands in for the `yfinance` module: Ticker(...).info / .history(...) and download(...)."""
+
+    def __init__(self, fixtures: FixtureStore, latency_scale: float = 1.0):
+        self.fixtures = fixtures
+        self.latency_scale = latency_scale
+
+    def sleep(self, seconds: float):
+        if seconds and self.latency_scale:
+            time.sleep(seconds * self.latency_scale)
+
+    @staticmethod
+    def window(hist: pd.DataFrame, period: Optional[str], start: Optional[str]) -> pd.DataFrame:
+        from src.tools.market_data import period_to_offset
+
+        if hist.empty:
+            return hist.copy()
+        if start is not None:
+            return hist[hist.index >= pd.Timestamp(start, tz=hist.index.tz)].copy()
+        if period is not None and period != "max":
+            return hist[hist.index > hist.index[-1] - period_to_offset(period)].copy()
+        return hist.copy()
+
+    def Ticker(self, ticker: str) -> _ReplayTicker:
+        return _ReplayTicker(self, ticker)
+
+    def download(self, tickers, period: str = "6mo", **kwargs) -> pd.DataFrame:
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        frames, latency = {}, 0.0
+        for ticker in tickers:
+            entry = self.fixtures.market_entry(ticker)
+            if entry is not None:
+                frames[ticker.upper()] = self.window(entry["history"], period, None)
+                latency = max(latency, entry["latency"].get("history", 0.0))
+        self.sleep(latency)  # one bulk request
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame()
+
+
+class ReplayTavily:
+    def __init__(self, fixtures: FixtureStore, latency_scale: float = 1.0):
+        self.fixtures = fixtures
+        self.latency_scale = latency_scale
+
+    def search(self, query: str, **kwargs) -> Dict[str, Any]:
+        entry = self.fixtures.news_entry(query)
+        time.sleep(entry["latency"] * self.latency_scale)
+        return entry["response"]
+
+
+class AsyncReplayTavily(ReplayTavily):
+    async def search(self, query: str, **kwargs) -> Dict[str, Any]:
+        entry = self.fixtures.news_entry(query)
+        await asyncio.sleep(entry["latency"] * self.latency_scale)
+        return entry["response"]
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model answering from recorded responses, after sleeping the recorded (scaled) latency."""
+
+    fixtures: Any = None
+    model_name: str = "replay"
+    temperature: float = 0.0
+    latency_scale: float = 1.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _result(self, entry: Dict[str, Any]) -> ChatResult:
+        usage = entry.get("usage") or None
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=entry["content"], usage_metadata=usage))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        entry = self.fixtures.llm_entry(messages)
+        time.sleep(entry["latency"] * self.latency_scale)
+        return self._result(entry)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        entry = self.fixtures.llm_entry(messages)
+        await asyncio.sleep(entry["latency"] * self.latency_scale)
+        return self._result(entry)
+
+
+# --- recording wrappers (delegate to the live clients, keep what came back) ---
+
+class _RecordingTicker:
+    def __init__(self, ticker, symbol: str, fixtures: FixtureStore):
+        self._ticker, self._symbol, self._fixtures = ticker, symbol.upper(), fixtures
+
+    @property
+    def info(self):
+        start = time.perf_counter()
+        info = self._ticker.info
+        self._fixtures.add_info(self._symbol, info, time.perf_counter() - start)
+        return info
+
+    def history(self, *args, **kwargs):
+        start = time.perf_counter()
+        hist = self._ticker.history(*args, **kwargs)
+        self._fixtures.add_history(self._symbol, hist, time.perf_counter() - start)
+        return hist
+
+
+class RecordingYFinance:
+    def __init__(self, yf, fixtures: FixtureStore):
+        self._yf, self._fixtures = yf, fixtures
+
+    def Ticker(self, ticker: str):
+        return _RecordingTicker(self._yf.Ticker(ticker), ticker, self._fixtures)
+
+    def download(self, tickers, *args, **kwargs):
+        start = time.perf_counter()
+        data = self._yf.download(tickers, *args, **kwargs)
+        latency = time.perf_counter() - start
+        if data is not None and isinstance(data.columns, pd.MultiIndex):
+            for ticker in data.columns.get_level_values(0).unique():
+                self._fixtures.add_history(ticker, data[ticker].dropna(how="all"), latency)
+        return data
+
+
+class _RecordingTavily:
+    def __init__(self, client, fixtures: FixtureStore):
+        self._client, self._fixtures = client, fixtures
+
+    def search(self, query: str, **kwargs):
+        start = time.perf_counter()
+        response = self._client.search(query=query, **kwargs)
+        self._fixtures.add_news(query, response, time.perf_counter() - start)
+        return response
+
+
+class _AsyncRecordingTavily(_RecordingTavily):
+    async def search(self, query: str, **kwargs):
+        start = time.perf_counter()
+        response = await self._client.search(query=query, **kwargs)
+        self._fixtures.add_news(query, response, time.perf_counter() - start)
+        return response
+
+
+class _RecordingLLM:
+    """Wraps the live chat model; model_name / temperature are passed through for the response cache key."""
+
+    def __init__(self, llm, fixtures: FixtureStore):
+        self._llm, self._fixtures = llm, fixtures
+        self.model_name = getattr(llm, "model_name", None)
+        self.temperature = getattr(llm, "temperature", None)
+
+    def invoke(self, messages, *args, **kwargs):
+        start = time.perf_counter()
+        message = self._llm.invoke(messages, *args, **kwargs)
+        self._fixtures.add_llm(messages, message, time.perf_counter() - start)
+        return message
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        start = time.perf_counter()
+        message = await self._llm.ainvoke(messages, *args, **kwargs)
+        self._fixtures.add_llm(messages, message, time.perf_counter() - start)
+        return message
+
+
+# --- seam patching ---
+
+@contextmanager
+def _patched(replacements: List[Tuple[Any, str, Any]]) -> Iterator[None]:
+    originals = [(obj, name, getattr(obj, name)) for obj, name, _ in replacements]
+    try:
+        for obj, name, value in replacements:
+            setattr(obj, name, value)
+        yield
+    finally:
+        for obj, name, value in reversed(originals):
+            setattr(obj, name, value)
+
+
+def _provider_modules():
+    from src.agents import analyst, risk_manager
+    from src.tools import llm_cache, market_data, news, rate_limit
+    return analyst, risk_manager, llm_cache, market_data, news, rate_limit
+
+
+def _cold_caches(market_data, llm_cache) -> List[Tuple[Any, str, Any]]:
+    """Memory-only caches that never hold anything, so every run reaches the (replayed) providers."""
+    from src.tools.cache import TTLCache
+    return [
+        (market_data, "info_cache", TTLCache("info", ttl=0, max_entries=0)),
+        (market_data, "history_cache", TTLCache("history", ttl=0, max_entries=0)),
+        (llm_cache, "llm_cache", None),
+    ]
+
+
+@contextmanager
+def replay_providers(fixtures: FixtureStore, latency_scale: float = 1.0, cold_caches: bool = True,
+                     rate_limits: bool = False) -> Iterator[FixtureStore]:
+    """
+    Serves yfinance / Tavily / Groq from `fixtures` for the duration of the block.
+    cold_caches: bypass the market data and LLM response caches (default; benchmarks measure the pipeline).
+    rate_limits: keep the configured provider quotas (off by default; replayed calls cost nothing).
+    """
+    analyst, risk_manager, llm_cache, market_data, news, rate_limit = _provider_modules()
+    models: Dict[float, ReplayChatModel] = {}
+
+    def get_llm(temperature: float, model: str = "replay"):
+        if temperature not in models:
+            models[temperature] = ReplayChatModel(fixtures=fixtures, temperature=temperature,
+                                                  latency_scale=latency_scale)
+        return models[temperature]
+
+    replacements = [
+        (market_data, "yf", ReplayYFinance(fixtures, latency_scale)),
+        (news, "get_tavily_client", lambda: ReplayTavily(fixtures, latency_scale)),
+        (news, "get_async_tavily_client", lambda: AsyncReplayTavily(fixtures, latency_scale)),
+        (analyst, "get_llm", get_llm),
+        (risk_manager, "get_llm", get_llm),
+    ]
+    if cold_caches:
+        replacements += _cold_caches(market_data, llm_cache)
+    if not rate_limits:
+        unlimited = {p: rate_limit.ProviderLimiter(p, rpm=1e9, tpm=1e12 if "tpm" in c else None)
+                     for p, c in rate_limit.RATE_LIMITS.items()}
+        replacements.append((rate_limit, "_limiters", unlimited))
+    with _patched(replacements):
+        yield fixtures
+
+
+@contextmanager
+def record_providers(path: str = REPLAY_FIXTURES_PATH) -> Iterator[FixtureStore]:
+    """Runs against the live providers, capturing every response (and its latency) into fixtures at `path`."""
+    analyst, risk_manager, llm_cache, market_data, news, rate_limit = _provider_modules()
+    fixtures = FixtureStore.load(path) if os.path.exists(os.path.join(path, "llm.json")) else FixtureStore()
+    get_tavily, get_async_tavily, get_llm = news.get_tavily_client, news.get_async_tavily_client, analyst.get_llm
+    replacements = [
+        (market_data, "yf", RecordingYFinance(market_data.yf, fixtures)),
+        (news, "get_tavily_client", lambda: _RecordingTavily(get_tavily(), fixtures)),
+        (news, "get_async_tavily_client", lambda: _AsyncRecordingTavily(get_async_tavily(), fixtures)),
+        (analyst, "get_llm", lambda temperature, **kw: _RecordingLLM(get_llm(temperature, **kw), fixtures)),
+        (risk_manager, "get_llm", lambda temperature, **kw: _RecordingLLM(get_llm(temperature, **kw), fixtures)),
+        *_cold_caches(market_data, llm_cache),  # a cache hit would leave nothing to record
+    ]
+    with _patched(replacements):
+        yield fixtures
+    fixtures.save(path)
+
+
+# --- synthetic fixtures (when nothing has been recorded yet) ---
+
+ANALYST_TEMPLATE = """### Executive Summary
+The Call: {call}
+Confidence Score: {confidence}%
+{ticker} trades near the top of its six-month range; the target price assumes the current margin profile holds.
+
+### Fundamental Deep Dive
+Valuation is rich on trailing P/E but forward earnings growth narrows the gap. Margins are stable and debt is modest.
+
+### Technical Analysis
+Price is above its 50-day average with RSI in neutral territory and MACD momentum flattening.
+
+### Sentiment & News
+Coverage is constructive: analysts highlight demand strength [1] while noting supply constraints [2].
+
+### Risks
+A slowdown in end-market demand or multiple compression would hit the shares hardest.
+"""
+
+REVISION_TEMPLATE = """### Technical Analysis
+RSI sits mid-range and MACD momentum is flattening, which supports a measured position size rather than a chase.
+"""
+
+
+def synthetic_fixtures(tickers: List[str], bars: int = 300, seed: int = 0,
+                       latencies: Optional[Dict[str, float]] = None) -> FixtureStore:
+    """
+    Deterministic stand-in fixtures: random-walk OHLCV, a plausible info dict, five news articles per
+    ticker and analyst / risk responses (one rejection in three, so revision loops are exercised).
+    Latencies (seconds) default to typical live values.
+    """
+    latencies = {"info": 0.35, "history": 0.45, "news": 0.9, "analyst": 2.5, "revision": 1.2,
+                 "risk_manager": 0.8, **(latencies or {})}
+    rng = np.random.default_rng(seed)
+    fixtures = FixtureStore()
+    index = pd.bdate_range(end="2024-06-28", periods=bars, tz="America/New_York", name="Date")
+    for i, ticker in enumerate(t.upper() for t in tickers):
+        close = 50 * (1 + i % 7) * np.exp(np.cumsum(rng.normal(0.0005, 0.02, bars)))
+        fixtures.market[ticker] = {
+            "info": {
+                "marketCap": float(rng.uniform(5e9, 2e12)), "trailingPE": float(rng.uniform(8, 60)),
+                "forwardPE": float(rng.uniform(8, 45)), "revenueGrowth": float(rng.uniform(-0.1, 0.5)),
+                "profitMargins": float(rng.uniform(0.02, 0.45)), "debtToEquity": float(rng.uniform(5, 180)),
+                "freeCashflow": float(rng.uniform(1e8, 8e10)), "returnOnEquity": float(rng.uniform(0.02, 0.6)),
+            },
+            "history": pd.DataFrame({
+                "Open": close * (1 + rng.normal(0, 0.004, bars)),
+                "High": close * (1 + rng.uniform(0, 0.02, bars)),
+                "Low": close * (1 - rng.uniform(0, 0.02, bars)),
+                "Close": close,
+                "Volume": rng.integers(1_000_000, 60_000_000, bars).astype(float),
+                "Dividends": np.zeros(bars),
+                "Stock Splits": np.zeros(bars),
+            }, index=index),
+            "latency": {"info": latencies["info"], "history": latencies["history"]},
+        }
+        fixtures.news[f"{ticker} stock news analysis market trends"] = {
+            "response": {"results": [
+                {"title": f"{ticker} headline {n}: demand, margins and guidance", "url": f"https://news.example/{ticker}/{n}",
+                 "content": f"Article {n} on {ticker}. " + "Analysts discussed demand, supply and pricing. " * 6,
+                 "score": round(0.95 - n * 0.1, 2), "published_date": f"2024-06-{27 - n:02d}"}
+                for n in range(5)
+            ]},
+            "latency": latencies["news"],
+        }
+
+    usage = {"input_tokens": 600, "output_tokens": 350, "total_tokens": 950}
+    for n, (call, confidence) in enumerate([("HOLD", 70), ("BUY", 75), ("SELL", 65)]):
+        fixtures.llm[f"synthetic-analyst-{n}"] = {
+            "role": "analyst", "content": ANALYST_TEMPLATE.format(call=call, confidence=confidence, ticker="The stock"),
+            "usage": usage, "latency": latencies["analyst"],
+        }
+    fixtures.llm["synthetic-revision-0"] = {
+        "role": "revision", "content": REVISION_TEMPLATE,
+        "usage": {"input_tokens": 300, "output_tokens": 80, "total_tokens": 380}, "latency": latencies["revision"],
+    }
+    review_usage = {"input_tokens": 500, "output_tokens": 25, "total_tokens": 525}
+    for n, reply in enumerate([
+        "DECISION: APPROVE\nFEEDBACK: The thesis is consistent with the data provided.",
+        "DECISION: APPROVE\nFEEDBACK: Sources are cited and the call matches the signals.",
+        "DECISION: REJECT\nFEEDBACK: The technical analysis ignores the flattening MACD momentum.",
+    ]):
+        fixtures.llm[f"synthetic-risk-{n}"] = {
+            "role": "risk_manager", "content": reply, "usage": review_usage, "latency": latencies["risk_manager"],
+        }
+    return fixtures
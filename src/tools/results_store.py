@@ -0,0 +1,102 @@
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from src.tools.price_store import materialize
+
+# Finished analyses, persisted per ticker and run, so views of a recent report are a read instead of a graph run.
+RESULTS_STORE_PATH = os.getenv("RESULTS_STORE_PATH", os.path.join(".cache", "results.sqlite"))
+RESULTS_KEEP_PER_TICKER = int(os.getenv("RESULTS_KEEP_PER_TICKER", "50"))
+
+
+class ResultsStore:
+    """
+    SQLite table of final AgentStates (pickled, price history included) plus optional run timings.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                " run_id TEXT PRIMARY KEY, ticker TEXT NOT NULL, max_revisions INTEGER,"
+                " created_at REAL NOT NULL, state BLOB NOT NULL, timings TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS analyses_ticker ON analyses (ticker, created_at DESC)"
+            )
+
+    def save(self, state: Dict[str, Any], timings: Optional[Dict[str, Any]] = None,
+             run_id: Optional[str] = None, created_at: Optional[float] = None) -> str:
+        """Stores a final state; returns its run_id. Older runs beyond RESULTS_KEEP_PER_TICKER are dropped."""
+        run_id = run_id or uuid.uuid4().hex
+        ticker = str(state["ticker"]).upper()
+        # The price history itself is stored (not a PriceHandle): a report must outlive pruned store versions
+        payload = pickle.dumps(dict(materialize(state)), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (run_id, ticker, max_revisions, created_at, state, timings)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, ticker, state.get("max_revisions"), created_at or time.time(), payload,
+                 json.dumps(timings, default=str) if timings is not None else None)
+            )
+            self._conn.execute(
+                "DELETE FROM analyses WHERE ticker = ? AND run_id NOT IN ("
+                " SELECT run_id FROM analyses WHERE ticker = ? ORDER BY created_at DESC LIMIT ?)",
+                (ticker, ticker, RESULTS_KEEP_PER_TICKER)
+            )
+        return run_id
+
+    def _row(self, row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        run_id, ticker, max_revisions, created_at, state, timings = row
+        try:
+            state = pickle.loads(state)
+        except Exception:
+            return None  # written by an incompatible version
+        return {
+            "run_id": run_id,
+            "ticker": ticker,
+            "max_revisions": max_revisions,
+            "created_at": created_at,
+            "state": state,
+            "timings": json.loads(timings) if timings else None,
+        }
+
+    def latest(self, ticker: str, max_age: Optional[float] = None,
+               max_revisions: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Newest stored run for `ticker`, or None if there is none younger than `max_age` seconds."""
+        query = "SELECT * FROM analyses WHERE ticker = ?"
+        params: List[Any] = [ticker.upper()]
+        if max_age is not None:
+            query += " AND created_at >= ?"
+            params.append(time.time() - max_age)
+        if max_revisions is not None:
+            query += " AND max_revisions = ?"
+            params.append(max_revisions)
+        with self._lock:
+            row = self._conn.execute(query + " ORDER BY created_at DESC LIMIT 1", params).fetchone()
+        return self._row(row)
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM analyses WHERE run_id = ?", (run_id,)).fetchone()
+        return self._row(row)
+
+
+@lru_cache(maxsize=1)
+def get_results_store() -> ResultsStore:
+    """Process-wide store, opened on first use."""
+    return ResultsStore(RESULTS_STORE_PATH)
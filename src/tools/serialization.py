@@ -0,0 +1,128 @@
+import io
+import json
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # plain json + jsonable_encoder fallback
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Arrow / Parquet responses unavailable; clients get JSON
+    pa = pq = None
+
+# price_history on the wire. "columnar" is one array per column plus an index array:
+#   {"index": ["2024-01-02", ...], "columns": {"Open": [...], "Close": [...], ...}}
+# instead of a dict per row repeating every key and a datetime per cell.
+# Arrow IPC / Parquet carry the price table natively, with the rest of the payload as JSON in the schema metadata.
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+
+def _index_labels(index: pd.Index) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        values = index.tz_localize(None).values if index.tz is not None else index.values
+        daily = bool(len(index)) and (index.normalize() == index).all()
+        return np.datetime_as_string(values, unit="D" if daily else "s")
+    return index.astype(str).to_numpy()
+
+
+def price_history_columns(df: Optional[pd.DataFrame], float32: bool = False) -> Dict[str, Any]:
+    """Columnar form of a price frame. Arrays stay numpy; `dumps` serializes them without a Python loop."""
+    if df is None or df.empty:
+        return {"index": [], "columns": {}}
+    columns = {}
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if float32 and values.dtype.kind == "f":
+            values = values.astype(np.float32)  # ~7 significant digits: plenty for prices, half the bytes
+        columns[str(name)] = values
+    return {"index": _index_labels(df.index), "columns": columns}
+
+
+def price_history_records(df: Optional[pd.DataFrame]) -> list:
+    """The original row-per-dict form, kept for clients that still ask for it."""
+    return df.reset_index().to_dict(orient="records") if df is not None else []
+
+
+def _default(obj):
+    if isinstance(obj, pd.DataFrame):
+        return price_history_columns(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _finite(obj):
+    """NaN / inf -> None throughout an encoded payload, as orjson writes them."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def dumps(payload: Any) -> bytes:
+    """Fast JSON: orjson with native numpy support (NaN -> null); falls back to the stdlib encoder."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC)
+    encoded = jsonable_encoder(payload, custom_encoder={np.ndarray: np.ndarray.tolist})
+    return json.dumps(_finite(encoded), allow_nan=False, default=str).encode()
+
+
+class FastJSONResponse(Response):
+    """JSONResponse that skips jsonable_encoder and renders with `dumps`."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _price_table(df: Optional[pd.DataFrame], float32: bool, metadata: Dict[str, Any]):
+    frame = df.reset_index() if df is not None else pd.DataFrame()
+    if float32:
+        frame = frame.astype({c: np.float32 for c in frame.columns if frame[c].dtype.kind == "f"})
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    return table.replace_schema_metadata({**(table.schema.metadata or {}), b"result": dumps(metadata)})
+
+
+def encode_arrow(df: Optional[pd.DataFrame], metadata: Dict[str, Any], float32: bool = False) -> bytes:
+    """Arrow IPC stream of the price table; the rest of the result sits in the `result` schema metadata key."""
+    table = _price_table(df, float32, metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_parquet(df: Optional[pd.DataFrame], metadata: Dict[str, Any], float32: bool = False) -> bytes:
+    """Parquet file (zstd) of the price table, with the same `result` metadata as encode_arrow."""
+    buffer = io.BytesIO()
+    pq.write_table(_price_table(df, float32, metadata), buffer, compression="zstd")
+    return buffer.getvalue()
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """'arrow', 'parquet' or 'json' from an Accept header (binary formats only if pyarrow is installed)."""
+    accept = accept or ""
+    if pa is not None:
+        if ARROW_MEDIA_TYPE in accept:
+            return "arrow"
+        if PARQUET_MEDIA_TYPE in accept:
+            return "parquet"
+    return "json"
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+# Single-flight deduplication: while a call for `key` is running, identical calls wait for it
+# and get its result (or its exception) instead of starting their own.
+# Nothing is kept after the call finishes; reuse across time is the caches' job.
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Thread version, for the sync tool functions (also reached from asyncio.to_thread)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"leaders": 0, "followers": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Returns (result, shared); `shared` is True when the result came from another caller's run."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self._stats["followers"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["leaders"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    Event-loop version. The work runs in its own task and every caller awaits it shielded,
+    so one client disconnecting doesn't cancel the run the others are waiting on.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {"leaders": 0, "followers": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        task = self._tasks.get(key)
+        if task is not None and (task.done() or task.get_loop() is not asyncio.get_running_loop()):
+            task = None  # finished, or left over from another event loop
+        shared = task is not None
+        if shared:
+            self._stats["followers"] += 1
+        else:
+            self._stats["leaders"] += 1
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._tasks.pop(key, None) if self._tasks.get(key) is done else None)
+        return await asyncio.shield(task), shared
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "in_flight": len(self._tasks)}
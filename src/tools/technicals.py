@@ -3,94 +3,138 @@ from ta.momentum import RSIIndicator, StochasticOscillator
 from ta.trend import MACD, ADXIndicator, SMAIndicator
 from ta.volatility import BollingerBands
 
+RSI_WINDOW = 14
+STOCH_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+ADX_WINDOW = 14
+SMA_FAST, SMA_SLOW = 50, 200
+BB_WINDOW, BB_DEV = 20, 2
+
+MIN_ADX_BARS = 2 * ADX_WINDOW  # `ta` needs this many bars to seed ADX
+
+# Bars each indicator needs before its latest value is defined (the data layer fetches enough for all of them)
+INDICATOR_WARMUP = {
+    "rsi": RSI_WINDOW,
+    "stoch": STOCH_WINDOW,
+    "macd": MACD_SLOW + MACD_SIGNAL - 1,  # signal line is an EMA of the MACD line
+    "adx": MIN_ADX_BARS,
+    "bollinger": BB_WINDOW,
+    "sma_50": SMA_FAST,
+    "sma_200": SMA_SLOW,
+}
+# Without these the golden / death cross is reported as unavailable; everything else is required
+TREND_INDICATORS = ("sma_50", "sma_200")
+
+MIN_BARS = max(bars for name, bars in INDICATOR_WARMUP.items() if name not in TREND_INDICATORS)
+
+
+def required_bars() -> int:
+    """History length that makes every registered indicator valid on the latest bar."""
+    return max(INDICATOR_WARMUP.values())
+
+def summarize_technicals(current_price, rsi, stoch_k, macd_line, macd_signal_line,
+                         adx_val, sma_50, sma_200, bb_upper, bb_lower) -> dict:
+    """
+    Turns the latest indicator values into the nested signal dict + score.
+    Shared by the per-ticker path and the batch engine so both produce identical output.
+    """
+    rsi_signal = "Overbought" if rsi > 70 else "Oversold" if rsi < 30 else "Neutral"
+    stoch_signal = "Overbought" if stoch_k > 80 else "Oversold" if stoch_k < 20 else "Neutral"
+    macd_trend = "Bullish" if macd_line > macd_signal_line else "Bearish"
+    trend_strength = "Strong" if adx_val > 25 else "Weak"
+    if pd.notna(sma_50) and pd.notna(sma_200):
+        sma_signal = "Bullish" if sma_50 > sma_200 else "Bearish"
+    else:
+        sma_signal = "Insufficient data"  # shorter history than the SMA warmup: no cross either way
+    bb_signal = "Above Upper" if current_price > bb_upper else "Below Lower" if current_price < bb_lower else "Inside Bands"
+
+    # --- 4. SCORING ALGORITHM ---
+    score = 0
+    reasoning = []
+
+    # Bullish factors
+    if rsi < 30: score += 1; reasoning.append("RSI is Oversold (Buy signal)")
+    if macd_trend == "Bullish": score += 1; reasoning.append("MACD is Bullish")
+    if sma_signal == "Bullish": score += 1; reasoning.append("Price above SMA support")
+    if current_price < bb_lower: score += 1; reasoning.append("Price below Bollinger Band (Oversold)")
+
+    # Bearish factors
+    if rsi > 70: score -= 1; reasoning.append("RSI is Overbought (Sell signal)")
+    if macd_trend == "Bearish": score -= 1; reasoning.append("MACD is Bearish")
+    if current_price > bb_upper: score -= 1; reasoning.append("Price above Bollinger Band (Overbought)")
+
+    # Normalize score to signal
+    final_signal = "Hold"
+    if score >= 2: final_signal = "Buy"
+    elif score <= -2: final_signal = "Sell"
+
+    return {
+        "success": True,
+        "momentum": {
+            "rsi": {"value": round(rsi, 2), "signal": rsi_signal},
+            "stoch": {"k": round(stoch_k, 2), "signal": stoch_signal}
+        },
+        "trend": {
+            "macd": {"value": round(macd_line, 4), "signal": round(macd_signal_line, 4), "trend": macd_trend},
+            "adx": {"value": round(adx_val, 2), "strength": trend_strength},
+            "sma": {"sma_50": round(sma_50, 2), "sma_200": round(sma_200, 2), "signal": sma_signal}
+        },
+        "volatility": {
+            "bb_upper": round(bb_upper, 2),
+            "bb_lower": round(bb_lower, 2),
+            "signal": bb_signal
+        },
+        "overall_signal": {
+            "signal": final_signal,
+            "score": score,
+            "confidence": f"{abs(score)/4*100:.0f}%", # Simple confidence metric
+            "reasoning": reasoning
+        }
+    }
+
+
 def calculate_technicals(df: pd.DataFrame) -> dict:
     """
     Advanced technical analysis with nested structure and signal scoring.
     """
     try:
-        if df.empty or len(df) < 20:
+        if df.empty or len(df) < MIN_BARS:
             return {"error": "Not enough data for technical analysis"}
 
-        # Use a copy to avoid SettingWithCopy warnings
-        df = df.copy()
+        # Read-only: nothing is assigned into df, so memory-mapped frames are used as they are (no copy)
         current_price = df['Close'].iloc[-1]
 
         # --- 1. MOMENTUM INDICATORS ---
         # RSI
-        rsi = RSIIndicator(close=df['Close'], window=14).rsi().iloc[-1]
-        rsi_signal = "Overbought" if rsi > 70 else "Oversold" if rsi < 30 else "Neutral"
+        rsi = RSIIndicator(close=df['Close'], window=RSI_WINDOW).rsi().iloc[-1]
         
         # Stochastic
-        stoch = StochasticOscillator(high=df['High'], low=df['Low'], close=df['Close'], window=14, smooth_window=3)
+        stoch = StochasticOscillator(high=df['High'], low=df['Low'], close=df['Close'], window=STOCH_WINDOW, smooth_window=3)
         stoch_k = stoch.stoch().iloc[-1]
-        stoch_signal = "Overbought" if stoch_k > 80 else "Oversold" if stoch_k < 20 else "Neutral"
 
         # --- 2. TREND INDICATORS ---
         # MACD
-        macd = MACD(close=df['Close'])
+        macd = MACD(close=df['Close'], window_slow=MACD_SLOW, window_fast=MACD_FAST, window_sign=MACD_SIGNAL)
         macd_line = macd.macd().iloc[-1]
         macd_signal_line = macd.macd_signal().iloc[-1]
-        macd_trend = "Bullish" if macd_line > macd_signal_line else "Bearish"
         
         # ADX (Trend Strength)
-        adx = ADXIndicator(high=df['High'], low=df['Low'], close=df['Close'], window=14)
+        adx = ADXIndicator(high=df['High'], low=df['Low'], close=df['Close'], window=ADX_WINDOW)
         adx_val = adx.adx().iloc[-1]
-        trend_strength = "Strong" if adx_val > 25 else "Weak"
 
         # SMA Crossover (Golden/Death Cross check)
-        sma_50 = SMAIndicator(close=df['Close'], window=50).sma_indicator().iloc[-1]
-        sma_200 = SMAIndicator(close=df['Close'], window=200).sma_indicator().iloc[-1]
-        sma_signal = "Bullish" if sma_50 > sma_200 else "Bearish"
+        sma_50 = SMAIndicator(close=df['Close'], window=SMA_FAST).sma_indicator().iloc[-1]
+        sma_200 = SMAIndicator(close=df['Close'], window=SMA_SLOW).sma_indicator().iloc[-1]
 
         # --- 3. VOLATILITY ---
-        bb = BollingerBands(close=df['Close'], window=20, window_dev=2)
+        bb = BollingerBands(close=df['Close'], window=BB_WINDOW, window_dev=BB_DEV)
         bb_upper = bb.bollinger_hband().iloc[-1]
         bb_lower = bb.bollinger_lband().iloc[-1]
-        bb_signal = "Above Upper" if current_price > bb_upper else "Below Lower" if current_price < bb_lower else "Inside Bands"
 
-        # --- 4. SCORING ALGORITHM ---
-        score = 0
-        reasoning = []
-        
-        # Bullish factors
-        if rsi < 30: score += 1; reasoning.append("RSI is Oversold (Buy signal)")
-        if macd_trend == "Bullish": score += 1; reasoning.append("MACD is Bullish")
-        if sma_signal == "Bullish": score += 1; reasoning.append("Price above SMA support")
-        if current_price < bb_lower: score += 1; reasoning.append("Price below Bollinger Band (Oversold)")
-        
-        # Bearish factors
-        if rsi > 70: score -= 1; reasoning.append("RSI is Overbought (Sell signal)")
-        if macd_trend == "Bearish": score -= 1; reasoning.append("MACD is Bearish")
-        if current_price > bb_upper: score -= 1; reasoning.append("Price above Bollinger Band (Overbought)")
-
-        # Normalize score to signal
-        final_signal = "Hold"
-        if score >= 2: final_signal = "Buy"
-        elif score <= -2: final_signal = "Sell"
-
-        return {
-            "success": True,
-            "momentum": {
-                "rsi": {"value": round(rsi, 2), "signal": rsi_signal},
-                "stoch": {"k": round(stoch_k, 2), "signal": stoch_signal}
-            },
-            "trend": {
-                "macd": {"value": round(macd_line, 4), "signal": round(macd_signal_line, 4), "trend": macd_trend},
-                "adx": {"value": round(adx_val, 2), "strength": trend_strength},
-                "sma": {"sma_50": round(sma_50, 2), "sma_200": round(sma_200, 2), "signal": sma_signal}
-            },
-            "volatility": {
-                "bb_upper": round(bb_upper, 2),
-                "bb_lower": round(bb_lower, 2),
-                "signal": bb_signal
-            },
-            "overall_signal": {
-                "signal": final_signal,
-                "score": score,
-                "confidence": f"{abs(score)/4*100:.0f}%", # Simple confidence metric
-                "reasoning": reasoning
-            }
-        }
+        return summarize_technicals(
+            current_price, rsi, stoch_k, macd_line, macd_signal_line,
+            adx_val, sma_50, sma_200, bb_upper, bb_lower
+        )
 
     except Exception as e:
         return {"error": str(e)}
\ No newline at end of file
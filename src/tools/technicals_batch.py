@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple
+# Same windows and guard as calculate_technicals
+from src.tools.technicals import (
+    RSI_WINDOW, STOCH_WINDOW, MACD_FAST, MACD_SLOW, MACD_SIGNAL, ADX_WINDOW,
+    SMA_FAST, SMA_SLOW, BB_WINDOW, BB_DEV, MIN_BARS, summarize_technicals
+)
+
+
+def build_panels(histories: Dict[str, pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Stacks per-ticker OHLC histories into (dates x tickers) close/high/low panels."""
+    close = pd.concat({t: h["Close"] for t, h in histories.items()}, axis=1)
+    high = pd.concat({t: h["High"] for t, h in histories.items()}, axis=1)
+    low = pd.concat({t: h["Low"] for t, h in histories.items()}, axis=1)
+    return close, high, low
+
+
+def _bottom_align(close: np.ndarray, high: np.ndarray, low: np.ndarray):
+    """
+    Drops each column's missing rows and pushes its valid bars to the bottom of the array,
+    so every column looks like its own per-ticker history (NaN padding on top).
+    """
+    valid = ~(np.isnan(close) | np.isnan(high) | np.isnan(low))
+    order = np.argsort(valid, axis=0, kind="stable")  # False rows first, True rows keep their order
+    aligned = []
+    for arr in (close, high, low):
+        arr = np.where(valid, arr, np.nan)
+        aligned.append(np.take_along_axis(arr, order, axis=0))
+    return aligned[0], aligned[1], aligned[2], valid.sum(axis=0)
+
+
+def _tail_window(arr: np.ndarray, counts: np.ndarray, window: int, func) -> np.ndarray:
+    """Reduces the last `window` bars per column; NaN where a column has fewer bars (rolling min_periods)."""
+    if arr.shape[0] < window:
+        return np.full(arr.shape[1], np.nan)
+    out = func(arr[-window:], axis=0)
+    return np.where(counts >= window, out, np.nan)
+
+
+def _compute_indicators(close: np.ndarray, high: np.ndarray, low: np.ndarray, counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Final-bar values of every indicator for all columns at once.
+    Recursive indicators (EMA / Wilder smoothing) step through time once, vectorized across tickers.
+    Mirrors the `ta` library's definitions so results match calculate_technicals.
+    """
+    T, N = close.shape
+    first = T - counts  # first valid row per column
+
+    a_rsi = 1.0 / RSI_WINDOW
+    a_fast = 2.0 / (MACD_FAST + 1)
+    a_slow = 2.0 / (MACD_SLOW + 1)
+    a_sig = 2.0 / (MACD_SIGNAL + 1)
+    w = ADX_WINDOW
+
+    avg_up = np.zeros(N); avg_dn = np.zeros(N)
+    ema_fast = np.zeros(N); ema_slow = np.zeros(N); macd_signal = np.zeros(N)
+    tr_sum = np.zeros(N); pdm_sum = np.zeros(N); ndm_sum = np.zeros(N)
+    adx = np.zeros(N)
+
+    prev_close = np.full(N, np.nan); prev_high = np.full(N, np.nan); prev_low = np.full(N, np.nan)
+    macd_line = np.full(N, np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for t in range(T):
+            c, h, l = close[t], high[t], low[t]
+            r = t - first  # bar number within each column's own history (negative = padding)
+
+            # --- RSI (Wilder EMA of gains / losses, seeded with 0 on the first bar) ---
+            diff = c - prev_close
+            up = np.where(diff > 0, diff, 0.0)
+            dn = np.where(diff < 0, -diff, 0.0)
+            avg_up = np.where(r == 0, up, (1 - a_rsi) * avg_up + a_rsi * up)
+            avg_dn = np.where(r == 0, dn, (1 - a_rsi) * avg_dn + a_rsi * dn)
+
+            # --- MACD (EMAs seeded with the first close, signal seeded with the first MACD value) ---
+            ema_fast = np.where(r == 0, c, (1 - a_fast) * ema_fast + a_fast * c)
+            ema_slow = np.where(r == 0, c, (1 - a_slow) * ema_slow + a_slow * c)
+            macd_line = np.where(r >= MACD_SLOW - 1, ema_fast - ema_slow, np.nan)
+            macd_signal = np.where(r == MACD_SLOW - 1, macd_line, (1 - a_sig) * macd_signal + a_sig * macd_line)
+
+            # --- ADX (Wilder sums seeded with the first `w` bars after the first one) ---
+            tr = np.maximum(h, prev_close) - np.minimum(l, prev_close)
+            move_up = h - prev_high
+            move_dn = prev_low - l
+            pdm = np.where((move_up > move_dn) & (move_up > 0), move_up, 0.0)
+            ndm = np.where((move_dn > move_up) & (move_dn > 0), move_dn, 0.0)
+
+            seeding = (r >= 1) & (r <= w)
+            tr_sum = np.where(r < 1, 0.0, np.where(seeding, tr_sum + tr, tr_sum - tr_sum / w + tr))
+            pdm_sum = np.where(r < 1, 0.0, np.where(seeding, pdm_sum + pdm, pdm_sum - pdm_sum / w + pdm))
+            ndm_sum = np.where(r < 1, 0.0, np.where(seeding, ndm_sum + ndm, ndm_sum - ndm_sum / w + ndm))
+
+            di_pos = np.where(tr_sum != 0, 100 * pdm_sum / tr_sum, 0.0)
+            di_neg = np.where(tr_sum != 0, 100 * ndm_sum / tr_sum, 0.0)
+            dx = np.where(di_pos + di_neg != 0, 100 * np.abs(di_pos - di_neg) / (di_pos + di_neg), 0.0)
+
+            adx = np.where(
+                r < w, 0.0,
+                np.where(r < 2 * w - 1, adx + dx,
+                         np.where(r == 2 * w - 1, (adx + dx) / w, (adx * (w - 1) + dx) / w))
+            )
+
+            prev_close, prev_high, prev_low = c, h, l
+
+    rsi = np.where(avg_dn == 0, 100.0, 100 - 100 / (1 + avg_up / avg_dn))
+
+    lowest = _tail_window(low, counts, STOCH_WINDOW, np.min)
+    highest = _tail_window(high, counts, STOCH_WINDOW, np.max)
+    current = close[-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        stoch_k = 100 * (current - lowest) / (highest - lowest)
+
+    bb_mid = _tail_window(close, counts, BB_WINDOW, np.mean)
+    bb_std = _tail_window(close, counts, BB_WINDOW, np.std)  # ddof=0 like `ta`
+
+    return {
+        "current_price": current,
+        "rsi": np.where(counts >= RSI_WINDOW, rsi, np.nan),
+        "stoch_k": stoch_k,
+        "macd_line": macd_line,
+        "macd_signal_line": np.where(counts >= MACD_SLOW + MACD_SIGNAL - 1, macd_signal, np.nan),
+        "adx_val": adx,
+        "sma_50": _tail_window(close, counts, SMA_FAST, np.mean),
+        "sma_200": _tail_window(close, counts, SMA_SLOW, np.mean),
+        "bb_upper": bb_mid + BB_DEV * bb_std,
+        "bb_lower": bb_mid - BB_DEV * bb_std,
+    }
+
+
+def calculate_technicals_batch(close: pd.DataFrame, high: pd.DataFrame, low: pd.DataFrame) -> Dict[str, dict]:
+    """
+    Batch version of calculate_technicals for a whole universe.
+    Takes (dates x tickers) close/high/low panels and returns {ticker: technicals dict},
+    where each dict has exactly the structure calculate_technicals produces.
+    """
+    high = high.reindex(index=close.index, columns=close.columns)
+    low = low.reindex(index=close.index, columns=close.columns)
+
+    c, h, l, counts = _bottom_align(
+        close.to_numpy(dtype=float), high.to_numpy(dtype=float), low.to_numpy(dtype=float)
+    )
+    values = _compute_indicators(c, h, l, counts)
+
+    results = {}
+    for j, ticker in enumerate(close.columns):
+        if counts[j] < MIN_BARS:  # covers the ADX seed (2 x ADX_WINDOW) and the MACD signal warmup
+            results[ticker] = {"error": "Not enough data for technical analysis"}
+            continue
+        results[ticker] = summarize_technicals(**{name: arr[j] for name, arr in values.items()})
+
+    return results
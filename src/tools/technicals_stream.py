@@ -0,0 +1,355 @@
+import math
+from collections import deque
+from typing import Any, Dict, Optional
+import pandas as pd
+from src.tools.technicals import (
+    RSI_WINDOW, STOCH_WINDOW, MACD_FAST, MACD_SLOW, MACD_SIGNAL, ADX_WINDOW,
+    SMA_FAST, SMA_SLOW, BB_WINDOW, BB_DEV, MIN_BARS, summarize_technicals
+)
+
+NAN = float("nan")
+
+# Streaming counterparts of the `ta` indicators used by calculate_technicals.
+# Every update() is O(1) (amortized for the rolling min/max), and every object can be
+# snapshotted to a plain dict (JSON/pickle friendly) and restored later.
+
+
+class EMA:
+    """Exponential moving average seeded with the first value (pandas ewm(adjust=False))."""
+
+    def __init__(self, alpha: float, min_periods: int = 1):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        self.value = x if self.count == 0 else (1 - self.alpha) * self.value + self.alpha * x
+        self.count += 1
+        return self.current
+
+    @property
+    def current(self) -> float:
+        return self.value if self.count >= self.min_periods else NAN
+
+    def state(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+    def load(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        return self
+
+
+class WilderRSI:
+    def __init__(self, window: int = RSI_WINDOW):
+        self.window = window
+        self.avg_up = EMA(1.0 / window, min_periods=window)
+        self.avg_dn = EMA(1.0 / window, min_periods=window)
+        self.prev_close = NAN
+
+    def update(self, close: float) -> float:
+        diff = close - self.prev_close  # NaN on the first bar -> counts as no move, like `ta`
+        self.avg_up.update(diff if diff > 0 else 0.0)
+        self.avg_dn.update(-diff if diff < 0 else 0.0)
+        self.prev_close = close
+        return self.current
+
+    @property
+    def current(self) -> float:
+        up, dn = self.avg_up.current, self.avg_dn.current
+        if math.isnan(dn):
+            return NAN
+        return 100.0 if dn == 0 else 100 - 100 / (1 + up / dn)
+
+    def state(self) -> Dict[str, Any]:
+        return {"window": self.window, "avg_up": self.avg_up.state(), "avg_dn": self.avg_dn.state(), "prev_close": self.prev_close}
+
+    def load(self, state: Dict[str, Any]):
+        self.window = state["window"]
+        self.avg_up.load(state["avg_up"])
+        self.avg_dn.load(state["avg_dn"])
+        self.prev_close = state["prev_close"]
+        return self
+
+
+class StreamingMACD:
+    def __init__(self, fast: int = MACD_FAST, slow: int = MACD_SLOW, signal: int = MACD_SIGNAL):
+        self.fast = EMA(2.0 / (fast + 1), min_periods=fast)
+        self.slow = EMA(2.0 / (slow + 1), min_periods=slow)
+        self.signal = EMA(2.0 / (signal + 1), min_periods=signal)
+        self.line = NAN
+
+    def update(self, close: float):
+        fast, slow = self.fast.update(close), self.slow.update(close)
+        self.line = fast - slow
+        if not math.isnan(self.line):
+            self.signal.update(self.line)  # signal EMA starts at the first valid MACD value
+        return self.line, self.signal.current
+
+    def state(self) -> Dict[str, Any]:
+        return {"fast": self.fast.state(), "slow": self.slow.state(), "signal": self.signal.state(), "line": self.line}
+
+    def load(self, state: Dict[str, Any]):
+        self.fast.load(state["fast"])
+        self.slow.load(state["slow"])
+        self.signal.load(state["signal"])
+        self.line = state["line"]
+        return self
+
+
+class RollingExtreme:
+    """Rolling min or max over a fixed window using a monotonic deque (amortized O(1))."""
+
+    def __init__(self, window: int, mode: str = "max"):
+        self.window = window
+        self.mode = mode
+        self.count = 0
+        self.items = deque()  # (bar index, value), values monotonic
+
+    def update(self, x: float) -> float:
+        beats = (lambda a, b: a >= b) if self.mode == "max" else (lambda a, b: a <= b)
+        while self.items and beats(x, self.items[-1][1]):
+            self.items.pop()
+        self.items.append((self.count, x))
+        self.count += 1
+        while self.items[0][0] <= self.count - 1 - self.window:
+            self.items.popleft()
+        return self.current
+
+    @property
+    def current(self) -> float:
+        return self.items[0][1] if self.count >= self.window else NAN
+
+    def state(self) -> Dict[str, Any]:
+        return {"window": self.window, "mode": self.mode, "count": self.count, "items": [list(i) for i in self.items]}
+
+    def load(self, state: Dict[str, Any]):
+        self.window, self.mode, self.count = state["window"], state["mode"], state["count"]
+        self.items = deque(tuple(i) for i in state["items"])
+        return self
+
+
+class StreamingStochastic:
+    def __init__(self, window: int = STOCH_WINDOW):
+        self.highest = RollingExtreme(window, "max")
+        self.lowest = RollingExtreme(window, "min")
+        self.k = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        hh, ll = self.highest.update(high), self.lowest.update(low)
+        rng = hh - ll
+        self.k = NAN if math.isnan(rng) else (100 * (close - ll) / rng if rng != 0 else NAN)
+        return self.k
+
+    def state(self) -> Dict[str, Any]:
+        return {"highest": self.highest.state(), "lowest": self.lowest.state(), "k": self.k}
+
+    def load(self, state: Dict[str, Any]):
+        self.highest.load(state["highest"])
+        self.lowest.load(state["lowest"])
+        self.k = state["k"]
+        return self
+
+
+class RollingStats:
+    """
+    Rolling mean / population std over a fixed window. Welford-style add/remove tracks the squared deviations
+    from the mean rather than a raw sum of squares, and the window is re-summed exactly every `window` updates
+    so rounding error cannot build up over a long stream.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.mean_ = 0.0
+        self.m2 = 0.0  # sum of squared deviations from mean_
+        self.since_resync = 0
+
+    def _resync(self):
+        count = len(self.values)
+        self.mean_ = math.fsum(self.values) / count if count else 0.0
+        self.m2 = math.fsum((v - self.mean_) ** 2 for v in self.values)
+        self.since_resync = 0
+
+    def update(self, x: float):
+        self.values.append(x)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            mean = self.mean_ + (x - old) / self.window
+            self.m2 += (x - old) * (x - mean + old - self.mean_)
+            self.mean_ = mean
+        else:
+            delta = x - self.mean_
+            self.mean_ += delta / len(self.values)
+            self.m2 += delta * (x - self.mean_)
+        self.since_resync += 1
+        if self.since_resync >= self.window:
+            self._resync()
+
+    @property
+    def mean(self) -> float:
+        return self.mean_ if len(self.values) == self.window else NAN
+
+    @property
+    def std(self) -> float:
+        if len(self.values) != self.window:
+            return NAN
+        return math.sqrt(max(self.m2 / self.window, 0.0))
+
+    def state(self) -> Dict[str, Any]:
+        return {"window": self.window, "values": list(self.values), "mean": self.mean_, "m2": self.m2,
+                "since_resync": self.since_resync}
+
+    def load(self, state: Dict[str, Any]):
+        self.window = state["window"]
+        self.values = deque(state["values"])
+        self.mean_, self.m2, self.since_resync = state["mean"], state["m2"], state["since_resync"]
+        return self
+
+
+class StreamingADX:
+    """
+    Wilder ADX as computed by `ta`: smoothed sums seeded with the first `window` bars after the
+    first one, ADX seeded with the mean of the first `window` DX values.
+    """
+
+    def __init__(self, window: int = ADX_WINDOW):
+        self.window = window
+        self.bars = 0
+        self.prev = None  # (high, low, close)
+        self.tr_sum = self.pdm_sum = self.ndm_sum = 0.0
+        self.adx = 0.0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        w = self.window
+        if self.prev is not None:
+            prev_high, prev_low, prev_close = self.prev
+            tr = max(high, prev_close) - min(low, prev_close)
+            move_up, move_dn = high - prev_high, prev_low - low
+            pdm = move_up if (move_up > move_dn and move_up > 0) else 0.0
+            ndm = move_dn if (move_dn > move_up and move_dn > 0) else 0.0
+
+            if self.bars <= w:
+                self.tr_sum += tr; self.pdm_sum += pdm; self.ndm_sum += ndm
+            else:
+                self.tr_sum += tr - self.tr_sum / w
+                self.pdm_sum += pdm - self.pdm_sum / w
+                self.ndm_sum += ndm - self.ndm_sum / w
+
+            if self.bars >= w:
+                di_pos = 100 * self.pdm_sum / self.tr_sum if self.tr_sum != 0 else 0.0
+                di_neg = 100 * self.ndm_sum / self.tr_sum if self.tr_sum != 0 else 0.0
+                dx = 100 * abs(di_pos - di_neg) / (di_pos + di_neg) if di_pos + di_neg != 0 else 0.0
+                if self.bars < 2 * w - 1:
+                    self.adx += dx
+                elif self.bars == 2 * w - 1:
+                    self.adx = (self.adx + dx) / w
+                else:
+                    self.adx = (self.adx * (w - 1) + dx) / w
+
+        self.prev = (high, low, close)
+        self.bars += 1
+        return self.current
+
+    @property
+    def current(self) -> float:
+        return self.adx if self.bars >= 2 * self.window else NAN
+
+    def state(self) -> Dict[str, Any]:
+        state = dict(self.__dict__)
+        state["prev"] = list(self.prev) if self.prev is not None else None
+        return state
+
+    def load(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self.prev = tuple(state["prev"]) if state["prev"] is not None else None
+        return self
+
+
+class StreamingTechnicals:
+    """
+    Per-ticker indicator state that updates in constant time per new bar.
+    result() returns the same dict calculate_technicals would return for the full history.
+
+        stream = StreamingTechnicals.from_history(df)
+        stream.update(high, low, close)         # new bar
+        snapshot = stream.snapshot()            # persist
+        stream = StreamingTechnicals.restore(snapshot)
+    """
+
+    def __init__(self):
+        self.bars = 0
+        self.last_close = NAN
+        self.last_timestamp: Optional[str] = None
+        self.rsi = WilderRSI()
+        self.stoch = StreamingStochastic()
+        self.macd = StreamingMACD()
+        self.adx = StreamingADX()
+        self.sma_fast = RollingStats(SMA_FAST)
+        self.sma_slow = RollingStats(SMA_SLOW)
+        self.bb = RollingStats(BB_WINDOW)
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> "StreamingTechnicals":
+        """Warm-up: replays an OHLC history bar by bar."""
+        stream = cls()
+        for timestamp, row in zip(df.index, df[["High", "Low", "Close"]].itertuples(index=False)):
+            stream.update(row[0], row[1], row[2], timestamp=timestamp)
+        return stream
+
+    def update(self, high: float, low: float, close: float, timestamp=None) -> "StreamingTechnicals":
+        high, low, close = float(high), float(low), float(close)
+        self.rsi.update(close)
+        self.stoch.update(high, low, close)
+        self.macd.update(close)
+        self.adx.update(high, low, close)
+        self.sma_fast.update(close)
+        self.sma_slow.update(close)
+        self.bb.update(close)
+        self.bars += 1
+        self.last_close = close
+        if timestamp is not None:
+            self.last_timestamp = pd.Timestamp(timestamp).isoformat()
+        return self
+
+    def result(self) -> dict:
+        if self.bars < MIN_BARS:  # covers the ADX seed and the MACD signal warmup
+            return {"error": "Not enough data for technical analysis"}
+
+        bb_mid, bb_std = self.bb.mean, self.bb.std
+        return summarize_technicals(
+            current_price=self.last_close,
+            rsi=self.rsi.current,
+            stoch_k=self.stoch.k,
+            macd_line=self.macd.line,
+            macd_signal_line=self.macd.signal.current,
+            adx_val=self.adx.current,
+            sma_50=self.sma_fast.mean,
+            sma_200=self.sma_slow.mean,
+            bb_upper=bb_mid + BB_DEV * bb_std,
+            bb_lower=bb_mid - BB_DEV * bb_std,
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "bars": self.bars,
+            "last_close": self.last_close,
+            "last_timestamp": self.last_timestamp,
+            "rsi": self.rsi.state(),
+            "stoch": self.stoch.state(),
+            "macd": self.macd.state(),
+            "adx": self.adx.state(),
+            "sma_fast": self.sma_fast.state(),
+            "sma_slow": self.sma_slow.state(),
+            "bb": self.bb.state(),
+        }
+
+    @classmethod
+    def restore(cls, snapshot: Dict[str, Any]) -> "StreamingTechnicals":
+        stream = cls()
+        stream.bars = snapshot["bars"]
+        stream.last_close = snapshot["last_close"]
+        stream.last_timestamp = snapshot["last_timestamp"]
+        for name in ("rsi", "stoch", "macd", "adx", "sma_fast", "sma_slow", "bb"):
+            getattr(stream, name).load(snapshot[name])
+        return stream
@@ -0,0 +1,226 @@
+import asyncio
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Two views of the same measurements:
+# - process-wide Prometheus metrics (GET /metrics)
+# - a per-run RunTrace (timing breakdown returned with /analyze)
+# The current run and node travel in context vars, which LangGraph copies into node threads/tasks,
+# so tools can record calls without any extra arguments.
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _fmt_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, value: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames, self.buckets = name, help, labelnames, buckets
+        self._series: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._series.setdefault(labels, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = list(zip(self.buckets, series["counts"])) + [("+Inf", series["count"])]
+                for bound, count in cumulative:
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, labels, le)} {count}")
+                suffix = _fmt_labels(self.labelnames, labels)
+                lines.append(f"{self.name}_sum{suffix} {series['sum']}")
+                lines.append(f"{self.name}_count{suffix} {series['count']}")
+        return lines
+
+
+NODE_DURATION = Histogram("agent_node_duration_seconds", "Wall time per graph node run.", ("node",))
+NODE_RUNS = Counter("agent_node_runs_total", "Graph node runs by outcome.", ("node", "status"))
+EXTERNAL_CALLS = Counter("agent_external_calls_total", "Calls to external providers.", ("provider", "node"))
+PAYLOAD_BYTES = Counter("agent_external_payload_bytes_total", "Bytes received from external providers.", ("provider", "node"))
+LLM_TOKENS = Counter("agent_llm_tokens_total", "LLM tokens by node and kind (prompt/completion).", ("node", "kind"))
+REVISION_LOOPS = Counter("agent_revision_loops_total", "Analyst re-runs triggered by a risk manager rejection.")
+RUN_DURATION = Histogram("agent_run_duration_seconds", "Wall time of a full graph run.")
+
+METRICS = [NODE_DURATION, NODE_RUNS, EXTERNAL_CALLS, PAYLOAD_BYTES, LLM_TOKENS, REVISION_LOOPS, RUN_DURATION]
+
+
+def render_prometheus() -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class RunTrace:
+    """Everything measured during one graph run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.nodes: List[Dict[str, Any]] = []
+        self.calls: Dict[str, int] = {}
+        self.payload_bytes: Dict[str, int] = {}
+        self.tokens = {"prompt": 0, "completion": 0}
+        self._lock = threading.Lock()
+
+    def add_node(self, node: str, seconds: float, status: str):
+        with self._lock:
+            self.nodes.append({"node": node, "seconds": round(seconds, 4), "status": status})
+
+    def add_call(self, provider: str, payload_bytes: int):
+        with self._lock:
+            self.calls[provider] = self.calls.get(provider, 0) + 1
+            self.payload_bytes[provider] = self.payload_bytes.get(provider, 0) + payload_bytes
+
+    def add_tokens(self, prompt: int, completion: int):
+        with self._lock:
+            self.tokens["prompt"] += prompt
+            self.tokens["completion"] += completion
+
+    def summary(self) -> Dict[str, Any]:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        by_node: Dict[str, float] = {}
+        for entry in self.nodes:
+            by_node[entry["node"]] = round(by_node.get(entry["node"], 0.0) + entry["seconds"], 4)
+        analyst_runs = sum(1 for entry in self.nodes if entry["node"] == "analyst")
+        return {
+            "total_seconds": round(end - self.started, 4),
+            "by_node": by_node,
+            "nodes": list(self.nodes),
+            "external_calls": dict(self.calls),
+            "payload_bytes": dict(self.payload_bytes),
+            "llm_tokens": dict(self.tokens),
+            "revisions": max(analyst_runs - 1, 0),
+        }
+
+
+_current_trace: ContextVar[Optional[RunTrace]] = ContextVar("current_trace", default=None)
+_current_node: ContextVar[str] = ContextVar("current_node", default="none")
+
+
+@contextmanager
+def start_trace():
+    """Collects a RunTrace for the graph run executed inside the block."""
+    trace = RunTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.finished = time.perf_counter()
+        RUN_DURATION.observe(trace.finished - trace.started)
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            pass  # streaming generator finalized from another context (client went away)
+
+
+def record_call(provider: str, payload_bytes: int = 0):
+    """Called by tools for every real (uncached) request to yfinance / Tavily / Groq."""
+    node = _current_node.get()
+    EXTERNAL_CALLS.inc(provider, node)
+    PAYLOAD_BYTES.inc(provider, node, value=payload_bytes)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_call(provider, payload_bytes)
+
+
+def record_llm_usage(message: Any):
+    """Reads token usage off an AIMessage (usage_metadata) if the provider reported it."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    prompt, completion = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    node = _current_node.get()
+    LLM_TOKENS.inc(node, "prompt", value=prompt)
+    LLM_TOKENS.inc(node, "completion", value=completion)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_tokens(prompt, completion)
+
+
+def _finish(name: str, started: float, status: str):
+    seconds = time.perf_counter() - started
+    NODE_DURATION.observe(seconds, name)
+    NODE_RUNS.inc(name, status)
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    if name == "analyst" and any(entry["node"] == "analyst" for entry in trace.nodes):
+        REVISION_LOOPS.inc()
+    trace.add_node(name, seconds, status)
+
+
+def _status(update: Any) -> str:
+    return "error" if isinstance(update, dict) and update.get("errors") else "ok"
+
+
+def traced_node(name: str, fn: Callable) -> Callable:
+    """Wraps a node function (sync or async) with timing and outcome recording."""
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(state):
+            token = _current_node.set(name)
+            started = time.perf_counter()
+            try:
+                update = await fn(state)
+            except Exception:
+                _finish(name, started, "exception")
+                raise
+            finally:
+                _current_node.reset(token)
+            _finish(name, started, _status(update))
+            return update
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(state):
+        token = _current_node.set(name)
+        started = time.perf_counter()
+        try:
+            update = fn(state)
+        except Exception:
+            _finish(name, started, "exception")
+            raise
+        finally:
+            _current_node.reset(token)
+        _finish(name, started, _status(update))
+        return update
+    return wrapper
@@ -0,0 +1,110 @@
+"""Fakes and synthetic data shared by the test modules."""
+import asyncio
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from langchain_core.messages import AIMessage
+from src.agents import analyst, nodes, risk_manager
+from src.tools import llm_cache
+
+ARTICLE = {"title": "t", "url": "u", "content": "c", "score": 0.9}
+
+
+def random_walk(bars: int = 300, seed: int = 0, tz: Optional[str] = None) -> pd.DataFrame:
+    """Daily OHLCV history (plus an all-zero Dividends column) ending 2024-06-28."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, bars)))
+    return pd.DataFrame({
+        "Open": close,
+        "High": close * (1 + rng.uniform(0, 0.02, bars)),
+        "Low": close * (1 - rng.uniform(0, 0.02, bars)),
+        "Close": close,
+        "Volume": rng.integers(1_000, 10_000, bars),
+        "Dividends": np.zeros(bars),
+    }, index=pd.bdate_range(end="2024-06-28", periods=bars, tz=tz, name="Date"))
+
+
+def assert_same(expected, got, path=""):
+    """Deep equality for technicals results: floats to 1e-6, NaN equal to NaN."""
+    if isinstance(expected, dict):
+        assert expected.keys() == got.keys(), path
+        for key in expected:
+            assert_same(expected[key], got[key], f"{path}.{key}")
+    elif isinstance(expected, float) and np.isnan(expected):
+        assert np.isnan(got), path
+    elif isinstance(expected, float):
+        assert abs(expected - got) <= 1e-6, path
+    else:
+        assert expected == got, path
+
+
+class FakeClock:
+    """Injectable clock; tests move `now` by hand."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeLLM:
+    """
+    Chat model stand-in. Gives `replies` in turn (the last one repeats); "{n}" in a reply becomes the call number.
+    Records every prompt and counts sync and async calls.
+    """
+
+    def __init__(self, *replies: str, model_name: str = "fake", temperature: float = 0.0,
+                 usage: Optional[dict] = None):
+        self.replies = list(replies) or ["DECISION: APPROVE"]
+        self.model_name = model_name
+        self.temperature = temperature
+        self.usage = usage
+        self.prompts = []
+        self.sync_calls = 0
+        self.async_calls = 0
+
+    @property
+    def calls(self) -> int:
+        return self.sync_calls + self.async_calls
+
+    def _reply(self, messages) -> AIMessage:
+        self.prompts.append("".join(m.content for m in messages))
+        reply = self.replies[min(len(self.prompts), len(self.replies)) - 1]
+        return AIMessage(content=reply.replace("{n}", str(len(self.prompts))), usage_metadata=self.usage)
+
+    def invoke(self, messages):
+        self.sync_calls += 1
+        return self._reply(messages)
+
+    async def ainvoke(self, messages):
+        self.async_calls += 1
+        await asyncio.sleep(0)
+        return self._reply(messages)
+
+
+def fake_market_data(ticker, history=None):
+    close = 100 + np.arange(60, dtype=float)
+    hist = pd.DataFrame({"High": close + 1, "Low": close - 1, "Close": close},
+                        index=pd.bdate_range("2024-01-01", periods=60))
+    return {"ticker": ticker, "current_price": close[-1], "history_df": hist}
+
+
+def initial_state():
+    return {"ticker": "NVDA", "revision_number": 0, "max_revisions": 1, "errors": []}
+
+
+def patch_providers(monkeypatch, llm, market_data=fake_market_data, news=None, anews=None):
+    """Points the graph's market data, news and LLM calls at fakes, with the LLM cache off."""
+    news = news or (lambda query: [ARTICLE])
+
+    async def default_anews(query):
+        return news(query)
+
+    monkeypatch.setattr(nodes, "fetch_market_data", market_data)
+    monkeypatch.setattr(nodes, "get_market_news", news)
+    monkeypatch.setattr(nodes, "aget_market_news", anews or default_anews)
+    monkeypatch.setattr(analyst, "get_llm", lambda temperature: llm)
+    monkeypatch.setattr(risk_manager, "get_llm", lambda temperature: llm)
+    monkeypatch.setattr(llm_cache, "llm_cache", None)
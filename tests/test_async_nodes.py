@@ -0,0 +1,121 @@
+import sys
+import os
+import asyncio
+import threading
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from src.agents.llm import get_llm
+from src.main import build_workflow
+from src.tools import http_pool, limits, news
+from tests.helpers import ARTICLE, FakeLLM, initial_state, patch_providers
+
+
+@pytest.fixture
+def fake_providers(monkeypatch):
+    llm = FakeLLM()
+    news_calls = {"sync": 0, "async": 0}
+
+    def get_news(query):
+        news_calls["sync"] += 1
+        return [ARTICLE]
+
+    async def aget_news(query):
+        news_calls["async"] += 1
+        return [ARTICLE]
+
+    patch_providers(monkeypatch, llm, news=get_news, anews=aget_news)
+    return llm, news_calls
+
+
+def test_ainvoke_uses_async_node_implementations(fake_providers):
+    llm, news_calls = fake_providers
+    app = build_workflow().compile()
+
+    result = asyncio.run(app.ainvoke(initial_state()))
+
+    assert result["analyst_draft"] == "DECISION: APPROVE"
+    assert result["technicals"]["success"] is True
+    assert llm.async_calls == 2 and llm.sync_calls == 0
+    assert news_calls == {"sync": 0, "async": 1}
+
+
+def test_invoke_still_uses_sync_implementations(fake_providers):
+    llm, news_calls = fake_providers
+    app = build_workflow().compile()
+
+    app.invoke(initial_state())
+
+    assert llm.sync_calls == 2 and llm.async_calls == 0
+    assert news_calls == {"sync": 1, "async": 0}
+
+
+def test_astage_slot_caps_concurrency(monkeypatch):
+    monkeypatch.setattr(limits, "_limits", dict(limits._limits))
+    monkeypatch.setattr(limits, "_stages", {})
+    limits.configure_limits(llm=2)
+    active = {"now": 0, "peak": 0}
+
+    async def call():
+        async with limits.astage_slot("llm"):
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.02)
+            active["now"] -= 1
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(8)))
+
+    asyncio.run(main())
+    assert active["peak"] == 2
+
+
+def test_stage_slots_are_served_in_arrival_order():
+    stage = limits.StageLimit(1)
+    order = []
+
+    def sync_caller():
+        stage.acquire()
+        order.append("thread")
+        stage.release()
+
+    async def async_caller(name):
+        await stage.aacquire()
+        order.append(name)
+        stage.release()
+
+    async def main():
+        await stage.aacquire()  # hold the only slot
+        thread = threading.Thread(target=sync_caller)
+        thread.start()
+        while not stage._waiters:
+            await asyncio.sleep(0.001)
+        tasks = [asyncio.create_task(async_caller(name)) for name in ("a", "b")]
+        cancelled = asyncio.create_task(stage.aacquire())
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        stage.release()
+        await asyncio.gather(*tasks)
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(main())
+    assert order == ["thread", "a", "b"]
+    assert stage.in_use == 0 and not stage._waiters
+
+
+def test_closing_pools_drops_cached_clients(monkeypatch):
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.setenv("TAVILY_API_KEY", "test")
+
+    async def main():
+        llm, tavily, sync_tavily = get_llm(0.0), news.get_async_tavily_client(), news.get_tavily_client()
+        assert sync_tavily.session is http_pool.get_sync_session("tavily")
+        await http_pool.aclose_clients()
+        fresh = (llm is not get_llm(0.0) and tavily is not news.get_async_tavily_client()
+                 and sync_tavily.session is not news.get_tavily_client().session)
+        await http_pool.aclose_clients()  # leave nothing bound to this test's event loop
+        return fresh
+
+    assert asyncio.run(main())
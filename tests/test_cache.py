@@ -0,0 +1,59 @@
+import sys
+import os
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.cache import DiskStore, TTLCache
+from tests.helpers import FakeClock
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock(1000.0)
+    cache = TTLCache("t", ttl=10, clock=clock)
+    cache.set("k", 1)
+
+    assert cache.get("k") == 1
+    clock.now += 11
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache("t", ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")       # touch a -> b is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_store_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    clock = FakeClock(1000.0)
+    TTLCache("info", ttl=60, store=DiskStore(path), clock=clock).set("AAPL", {"pe": 30})
+
+    # New process: empty memory, same file
+    reloaded = TTLCache("info", ttl=60, store=DiskStore(path), clock=clock)
+    assert reloaded.get("AAPL") == {"pe": 30}
+    assert reloaded.stats()["disk_hits"] == 1
+
+    # TTL still measured from the original write
+    clock.now += 61
+    assert TTLCache("info", ttl=60, store=DiskStore(path), clock=clock).get("AAPL") is None
+
+
+def test_get_or_fetch_skips_caching_rejected_values():
+    cache = TTLCache("t", ttl=60)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {}
+
+    cache.get_or_fetch("k", fetch, should_cache=bool)
+    cache.get_or_fetch("k", fetch, should_cache=bool)
+    assert len(calls) == 2
@@ -0,0 +1,49 @@
+import sys
+import os
+import asyncio
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from src.tools import compute_pool
+from src.tools.technicals import calculate_technicals
+from tests.helpers import random_walk
+
+
+@pytest.fixture
+def pool():
+    assert compute_pool.warm_up(workers=2) >= 1
+    yield 2
+    compute_pool.shutdown_technicals_pool()
+
+
+def shm_segments():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def test_pool_matches_in_process(pool):
+    before = shm_segments()
+    frames = [random_walk(260, seed) for seed in range(4)]
+
+    assert [compute_pool.compute_technicals(df, workers=pool) for df in frames] == [calculate_technicals(df) for df in frames]
+    assert shm_segments() <= before  # every block unlinked
+
+
+def test_async_twin_runs_concurrently(pool):
+    frames = [random_walk(300, seed) for seed in range(6)]
+
+    async def run_all():
+        return await asyncio.gather(*(compute_pool.acompute_technicals(df, workers=pool) for df in frames))
+
+    assert asyncio.run(run_all()) == [calculate_technicals(df) for df in frames]
+
+
+def test_short_history_error_comes_back_from_worker(pool):
+    assert compute_pool.compute_technicals(random_walk(10, 0), workers=pool) == {"error": "Not enough data for technical analysis"}
+
+
+def test_no_pool_by_default():
+    assert compute_pool.get_technicals_pool(workers=0) is None
+    df = random_walk(260, 1)
+    assert compute_pool.compute_technicals(df, workers=0) == calculate_technicals(df)
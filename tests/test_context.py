@@ -0,0 +1,66 @@
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.context import (
+    build_context, count_tokens, dedupe_articles, numeric_table, rank_articles, truncate_to_tokens
+)
+
+NOW = datetime(2024, 6, 10, tzinfo=timezone.utc)
+
+
+def article(title, score, days_old=None, content=None):
+    published = (NOW - timedelta(days=days_old)).isoformat() if days_old is not None else None
+    return {"title": title, "url": f"https://news/{title}", "score": score,
+            "published_date": published, "content": content or f"{title} " + "details " * 200}
+
+
+def make_state(news):
+    return {
+        "ticker": "NVDA",
+        "market_data": {"current_price": 120.5, "market_cap": "$2.95T", "pe_ratio": 65.1, "forward_pe": "N/A"},
+        "technicals": {"momentum": {"rsi": {"value": 71.2, "signal": "Overbought"}},
+                       "trend": {"macd": {"trend": "Bullish"}},
+                       "overall_signal": {"signal": "Hold", "confidence": "25%"}},
+        "news": news,
+    }
+
+
+def test_truncate_respects_token_cap():
+    text = "word " * 500
+    cut = truncate_to_tokens(text, 50)
+    assert count_tokens(cut) <= 50 and cut.endswith("…")
+    assert truncate_to_tokens("short", 50) == "short"
+
+
+def test_rank_by_score_and_recency():
+    ranked = rank_articles([article("old", 0.9, days_old=30), article("fresh", 0.8, days_old=0),
+                            article("weak", 0.2, days_old=0), {"error": "x"}], now=NOW)
+    assert [a["title"] for a in ranked] == ["fresh", "old", "weak"]
+
+
+def test_dedupe_drops_syndicated_copies():
+    wire = "Nvidia shares rose after the chipmaker reported record data center revenue and raised guidance"
+    kept = dedupe_articles([article("a", 0.9, content=wire), article("b", 0.8, content=wire + " on Wednesday"),
+                            article("c", 0.7, content="Regulators opened a probe into export licences")])
+    assert [a["title"] for a in kept] == ["a", "c"]
+
+
+def test_numeric_table_skips_missing_values():
+    table = numeric_table(make_state([]))
+    assert "P/E|65.1" in table and "RSI|71.2 Overbought" in table and "Tech Signal|Hold (25%)" in table
+    assert "Fwd P/E" not in table
+
+
+def test_context_fits_budget():
+    news = [article(f"story{i}", 0.9 - i * 0.1, days_old=i) for i in range(8)]
+    context, tokens = build_context(make_state(news), budget=400)
+    assert tokens <= 400
+    assert tokens == count_tokens(context)
+    assert "[1] story0" in context  # best article first
+
+    no_news, small = build_context(make_state(news), include_news=False)
+    assert "NEWS" not in no_news and small < tokens
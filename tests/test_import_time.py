@@ -0,0 +1,49 @@
+import sys
+import os
+import json
+import subprocess
+import tempfile
+
+# Import-time benchmark: `import src.api` must not compile the graph, build LLM/Tavily clients,
+# need credentials, touch the network or open cache files, and must stay under a time budget (cold autoscaled workers).
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "3.0"))
+
+CACHE_PATHS = {"MARKET_CACHE_PATH": "market_data.sqlite", "LLM_CACHE_PATH": "llm_responses.sqlite"}
+
+PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+import src.api
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [m for m in ("langchain_groq", "tavily") if m in sys.modules],
+    "graph_compiled": src.main.get_app.cache_info().currsize,
+    "cache_files": os.listdir(os.environ["PROBE_CACHE_DIR"]),
+}))
+"""
+
+
+def run_probe() -> dict:
+    env = {k: v for k, v in os.environ.items() if k not in ("GROQ_API_KEY", "TAVILY_API_KEY")}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env["PROBE_CACHE_DIR"] = cache_dir
+        env.update({name: os.path.join(cache_dir, "cache", file) for name, file in CACHE_PATHS.items()})
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+        )
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_api_is_cheap():
+    # Best of three to keep one slow disk read from failing the gate
+    probes = [run_probe() for _ in range(3)]
+    best = min(p["seconds"] for p in probes)
+
+    print(f"import src.api: {best:.3f}s (budget {IMPORT_BUDGET_SECONDS}s)")
+    assert best < IMPORT_BUDGET_SECONDS
+    assert probes[0]["loaded"] == []          # no Groq / Tavily SDK at import
+    assert probes[0]["graph_compiled"] == 0   # graph is built on first request
+    assert probes[0]["cache_files"] == []     # SQLite caches are opened on first use
@@ -0,0 +1,92 @@
+import sys
+import os
+import asyncio
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+import pytest
+from src import api
+from src.jobs import CANCELLED, DONE, Job, JobQueue, JobQueueFull
+from src.main import build_workflow
+from src.tools.results_store import ResultsStore
+
+
+def test_queue_rejects_when_full_and_cancels():
+    release = asyncio.Event()
+
+    async def runner(job):
+        job.node_started("analyst")
+        await release.wait()
+
+    async def main():
+        queue = JobQueue(runner, workers=1, maxsize=1)
+        running = queue.submit(Job("NVDA", 1))
+        await asyncio.sleep(0.01)  # the worker picks it up
+        waiting = queue.submit(Job("AAPL", 1))
+        with pytest.raises(JobQueueFull):
+            queue.submit(Job("MSFT", 1))
+        assert queue.position(waiting) == 1 and running.summary()["current_nodes"] == ["analyst"]
+
+        assert queue.cancel(waiting) and waiting.status == CANCELLED  # skipped when the worker gets to it
+        assert queue.cancel(running)
+        await asyncio.sleep(0.01)
+        assert running.status == CANCELLED and not queue.cancel(running)
+        assert queue.stats()["cancelled"] == 2 and queue.stats()["rejected"] == 1
+        await queue.aclose()
+
+    asyncio.run(main())
+
+
+def test_job_api_reports_progress_and_result(tmp_path, monkeypatch):
+    gate = asyncio.Event()
+
+    async def analyst(state):
+        await gate.wait()
+        return {"analyst_draft": "memo", "revision_number": state["revision_number"] + 1}
+
+    fakes = {
+        "data_gatherer": lambda state: {"market_data": {"current_price": 1.0}, "price_history": None},
+        "technicals": lambda state: {"technicals": {"rsi": 50.0}},
+        "news": lambda state: {"news": []},
+        "analyst": analyst,
+        "risk_manager": lambda state: {"critique": "APPROVE: ok"},
+    }
+    app = build_workflow(nodes=fakes).compile()
+    monkeypatch.setattr(api, "get_app", lambda: app)
+    monkeypatch.setattr(api, "get_results_store", lambda: ResultsStore(str(tmp_path / "results.sqlite")))
+    monkeypatch.setattr(api, "job_queue", JobQueue(api._run_job, workers=1, maxsize=1))
+
+    async def main():
+        transport = httpx.ASGITransport(app=api.api)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            submitted = await client.post("/jobs", json={"ticker": "nvda", "max_revisions": 1})
+            assert submitted.status_code == 202
+            job_id = submitted.json()["id"]
+            await asyncio.sleep(0.01)  # a worker takes it, freeing the single queue slot
+
+            queued = await client.post("/jobs", json={"ticker": "aapl"})
+            assert queued.json()["queue_position"] == 1
+            full = await client.post("/jobs", json={"ticker": "msft"})
+            assert full.status_code == 429 and "retry-after" in full.headers
+
+            for _ in range(100):  # wait until the analyst node is running
+                status = (await client.get(f"/jobs/{job_id}")).json()
+                if status["current_nodes"] == ["analyst"]:
+                    break
+                await asyncio.sleep(0.01)
+            assert status["status"] == "running" and "technicals" in status["completed_nodes"]
+            assert (await client.delete(f"/jobs/{queued.json()['id']}")).json()["status"] == "cancelled"
+
+            gate.set()
+            for _ in range(100):
+                status = (await client.get(f"/jobs/{job_id}")).json()
+                if status["status"] == DONE:
+                    break
+                await asyncio.sleep(0.01)
+            return status
+
+    status = asyncio.run(main())
+    assert status["result"]["analyst_draft"] == "memo" and status["revision"] == 1
+    assert status["result"]["run_id"]
@@ -0,0 +1,62 @@
+import sys
+import os
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from src.tools import llm_cache
+from src.tools.cache import DiskStore, TTLCache
+from tests.helpers import FakeLLM
+
+
+def memo_llm(model_name="llama-3.3-70b-versatile", temperature=0.2):
+    return FakeLLM("memo #{n}", model_name=model_name, temperature=temperature)
+
+
+def messages(human="data for NVDA"):
+    return [SystemMessage(content="You are a PM."), HumanMessage(content=human)]
+
+
+def test_identical_prompts_hit_the_cache(monkeypatch):
+    monkeypatch.setattr(llm_cache, "llm_cache", TTLCache("llm", ttl=60))
+    llm = memo_llm()
+
+    first = llm_cache.invoke_cached(llm, messages())
+    second = llm_cache.invoke_cached(llm, messages())
+
+    assert first == second == "memo #1"
+    assert llm.calls == 1
+    assert llm_cache.llm_cache_stats()["hit_rate"] == 0.5
+
+
+def test_key_covers_model_temperature_and_content():
+    base = llm_cache.cache_key(memo_llm(), messages())
+
+    assert base == llm_cache.cache_key(memo_llm(), messages())
+    assert base != llm_cache.cache_key(memo_llm(temperature=0.0), messages())
+    assert base != llm_cache.cache_key(memo_llm(model_name="other"), messages())
+    assert base != llm_cache.cache_key(memo_llm(), messages(human="data for AMD"))
+
+
+def test_sqlite_backend_is_shared_across_instances(monkeypatch, tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    monkeypatch.setattr(llm_cache, "llm_cache", TTLCache("llm", ttl=60, store=DiskStore(path)))
+    llm_cache.invoke_cached(memo_llm(), messages())
+
+    # Another worker process with a cold memory tier
+    monkeypatch.setattr(llm_cache, "llm_cache", TTLCache("llm", ttl=60, store=DiskStore(path)))
+    llm = memo_llm()
+    assert llm_cache.invoke_cached(llm, messages()) == "memo #1"
+    assert llm.calls == 0
+
+
+def test_disk_store_is_size_bounded(tmp_path):
+    store = DiskStore(str(tmp_path / "llm.sqlite"))
+    cache = TTLCache("llm", ttl=60, max_entries=10, store=store, disk_max_entries=20)
+
+    for i in range(TTLCache.PRUNE_EVERY * 2):
+        cache.set(f"k{i}", i)
+
+    assert store.count("llm") == 20
+    assert cache.stats()["size"] == 10
@@ -0,0 +1,224 @@
+import sys
+import os
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.tools import market_data, rate_limit
+from src.tools.cache import TTLCache
+
+
+def make_history(rows: int = 40, start: float = 100.0) -> pd.DataFrame:
+    index = pd.date_range("2024-01-01", periods=rows, freq="B")
+    close = start + np.arange(rows, dtype=float)
+    return pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1, "Close": close,
+        "Volume": 1000, "Dividends": 0.0, "Stock Splits": 0.0
+    }, index=index)
+
+
+@pytest.fixture(autouse=True)
+def memory_only_cache(monkeypatch):
+    # Keep tests away from the on-disk cache
+    monkeypatch.setattr(market_data, "info_cache", TTLCache("info", ttl=60))
+    monkeypatch.setattr(market_data, "history_cache", TTLCache("history", ttl=60))
+
+
+def test_batch_download_splits_per_ticker(monkeypatch):
+    calls = []
+
+    def fake_download(tickers, **kwargs):
+        calls.append(list(tickers))
+        frames = {"AAPL": make_history(), "MSFT": make_history(start=300.0)}
+        return pd.concat(frames, axis=1)
+
+    monkeypatch.setattr(market_data.yf, "download", fake_download)
+
+    histories = market_data.fetch_price_history_batch(["aapl", "MSFT ", "NOPE"])
+
+    assert len(calls) == 1  # one bulk request for the whole batch
+    assert set(histories) == {"AAPL", "MSFT"}
+    assert histories["MSFT"]["Close"].iloc[0] == 300.0
+    assert list(histories["AAPL"].columns) == ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+
+
+def test_fetch_market_data_uses_prefetched_history(monkeypatch):
+    class FakeTicker:
+        def __init__(self, ticker):
+            self.info = {"marketCap": 2.5e12}
+
+        def history(self, **kwargs):
+            raise AssertionError("history should not be downloaded again")
+
+    monkeypatch.setattr(market_data.yf, "Ticker", FakeTicker)
+
+    result = market_data.fetch_market_data("aapl", history=make_history())
+
+    assert "error" not in result
+    assert result["current_price"] == 139.0
+    assert result["market_cap"] == "$2.50T"
+
+
+def test_batch_download_skips_cached_tickers(monkeypatch):
+    requested = []
+
+    def fake_download(tickers, **kwargs):
+        requested.extend(tickers)
+        return pd.concat({"MSFT": make_history(start=300.0)}, axis=1)
+
+    monkeypatch.setattr(market_data.yf, "download", fake_download)
+    market_data.history_cache.set(f"AAPL:{market_data.HISTORY_PERIOD}", make_history())
+
+    histories = market_data.fetch_price_history_batch(["AAPL", "MSFT"])
+
+    assert requested == ["MSFT"]
+    assert set(histories) == {"AAPL", "MSFT"}
+    assert market_data.history_cache.get(f"MSFT:{market_data.HISTORY_PERIOD}") is not None
+
+
+def test_info_is_cached_between_calls(monkeypatch):
+    created = []
+
+    class FakeTicker:
+        def __init__(self, ticker):
+            created.append(ticker)
+            self.info = {"trailingPE": 31.456}
+
+        def history(self, **kwargs):
+            return make_history()
+
+    monkeypatch.setattr(market_data.yf, "Ticker", FakeTicker)
+
+    first = market_data.fetch_market_data("NVDA")
+    second = market_data.fetch_market_data("NVDA")
+
+    assert first["pe_ratio"] == second["pe_ratio"] == 31.46
+    assert len(created) == 2  # one for info, one for history; second call is fully cached
+    stats = market_data.cache_stats()
+    assert stats["info"]["hits"] == 1 and stats["history"]["hits"] == 1
+
+
+def test_empty_history_is_retried_as_throttled(monkeypatch):
+    monkeypatch.setattr(rate_limit, "BACKOFF_BASE", 0.001)
+    frames = iter([pd.DataFrame(), make_history()])  # yfinance's answer to a 429, then the data
+
+    class FakeTicker:
+        def __init__(self, ticker):
+            pass
+
+        def history(self, **kwargs):
+            return next(frames)
+
+    monkeypatch.setattr(market_data.yf, "Ticker", FakeTicker)
+
+    assert len(market_data.get_price_history("AAPL")) == 40
+
+
+def test_merge_history_replaces_partial_bar_and_trims():
+    stored = make_history(rows=130)
+    new_bars = make_history(rows=3, start=500.0)
+    new_bars.index = stored.index[-1:].append(pd.bdate_range(stored.index[-1] + pd.offsets.BDay(), periods=2))
+
+    merged = market_data.merge_history(stored, new_bars, "6mo")
+
+    assert merged.index.is_unique and merged.index.is_monotonic_increasing
+    assert merged["Close"].iloc[-1] == 502.0
+    assert merged.loc[stored.index[-1], "Close"] == 500.0  # partial bar overwritten
+    assert merged.index[0] > merged.index[-1] - pd.DateOffset(months=6)
+
+
+def expired_history(monkeypatch):
+    """A 60-bar AAPL history ending yesterday, stored and then expired."""
+    now = [pd.Timestamp.now().timestamp()]
+    monkeypatch.setattr(market_data, "history_cache", TTLCache("history", ttl=60, clock=lambda: now[0]))
+
+    stored = make_history(rows=60)
+    stored.index = pd.bdate_range(end=pd.Timestamp.now().normalize() - pd.offsets.BDay(), periods=60)
+    market_data.history_cache.set(f"AAPL:{market_data.HISTORY_PERIOD}", stored)
+    now[0] += 120  # expire it
+    return stored
+
+
+def fake_ticker(monkeypatch, stored, requests, tz=None, **changes):
+    """
+    yfinance stand-in: the last complete stored bar, a new partial bar, then one new bar; `changes` patch the new rows.
+    With `tz`, bars come back exchange-local like Ticker.history.
+    """
+    class FakeTicker:
+        def __init__(self, ticker):
+            pass
+
+        def history(self, **kwargs):
+            requests.append(kwargs)
+            if "period" in kwargs:
+                return make_history(rows=len(stored), start=50.0)
+            bars = pd.concat([stored.iloc[-2:-1], make_history(rows=2, start=999.0)])
+            bars.index = stored.index[-2:].append(pd.DatetimeIndex([stored.index[-1] + pd.offsets.BDay()]))
+            for column, values in changes.items():
+                bars[column] = values
+            return bars.tz_localize(tz) if tz else bars
+
+    monkeypatch.setattr(market_data.yf, "Ticker", FakeTicker)
+
+
+def test_expired_history_is_refreshed_incrementally(monkeypatch):
+    stored = expired_history(monkeypatch)
+    requests = []
+    fake_ticker(monkeypatch, stored, requests)
+
+    hist = market_data.get_price_history("AAPL")
+
+    assert requests == [{"start": stored.index[-2].strftime("%Y-%m-%d")}]
+    assert len(hist) == 61
+    assert hist["Close"].iloc[-1] == 1000.0
+    assert market_data.history_cache.get(f"AAPL:{market_data.HISTORY_PERIOD}") is not None
+
+
+def test_naive_stored_history_merges_tz_aware_bars(monkeypatch):
+    stored = expired_history(monkeypatch)  # tz-naive, as yf.download returns it
+    requests = []
+    fake_ticker(monkeypatch, stored, requests, tz="America/New_York")
+
+    hist = market_data.get_price_history("AAPL")
+
+    assert [list(r) for r in requests] == [["start"]]  # merged, not refetched after a tz comparison error
+    assert hist.index.tz is None and hist.index.is_unique
+    assert len(hist) == 61 and hist["Close"].iloc[-1] == 1000.0
+
+
+@pytest.mark.parametrize("column", ["Stock Splits", "Dividends"])
+def test_corporate_action_forces_full_download(monkeypatch, column):
+    stored = expired_history(monkeypatch)
+    requests = []
+    fake_ticker(monkeypatch, stored, requests, **{column: [0.0, 0.0, 4.0]})
+
+    hist = market_data.get_price_history("AAPL")
+
+    assert requests[1:] == [{"period": market_data.HISTORY_PERIOD}]
+    assert hist["Close"].iloc[0] == 50.0  # the re-adjusted download, not the stored bars
+
+
+def test_changed_close_on_overlapping_bar_forces_full_download(monkeypatch):
+    stored = expired_history(monkeypatch)
+    requests = []
+    fake_ticker(monkeypatch, stored, requests, Close=[stored["Close"].iloc[-2] / 2, 999.0, 1000.0])
+
+    market_data.get_price_history("AAPL")
+
+    assert [list(r) for r in requests] == [["start"], ["period"]]
+    assert not market_data.history_rewritten(stored, stored.iloc[-2:].assign(Close=[stored["Close"].iloc[-2], 1.0]))
+
+
+def test_lookback_period_covers_indicator_warmup():
+    from src.tools.technicals import required_bars
+
+    assert market_data.HISTORY_PERIOD == market_data.lookback_period(required_bars())
+    for bars in (34, 200, 500):
+        period = market_data.lookback_period(bars)
+        end = pd.Timestamp("2024-06-28")
+        sessions = len(pd.bdate_range(end - market_data.period_to_offset(period), end)) - 1
+        holidays = -(-bars // 25)
+        assert bars <= sessions - holidays < bars + 10  # enough, without fetching far more than needed
@@ -0,0 +1,73 @@
+import sys
+import os
+import pickle
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from src.agents import nodes
+from src.tools import price_store
+from src.tools.checkpoints import SqliteCheckpointer
+from src.tools.price_store import PriceStore, as_frame, materialize
+from src.tools.technicals import calculate_technicals
+from tests.helpers import random_walk
+
+NEW_YORK = "America/New_York"
+
+
+def test_round_trip_is_memory_mapped(tmp_path):
+    df = random_walk(tz=NEW_YORK)
+    handle = PriceStore(str(tmp_path)).put("nvda", df)
+
+    frame = handle.frame()
+    pd.testing.assert_frame_equal(frame, df, check_freq=False)
+    assert not frame["Close"].to_numpy().flags.writeable  # a view on the read-only map, not a copy
+    assert list(handle.frame(["Close"]).columns) == ["Close"]
+    assert calculate_technicals(frame) == calculate_technicals(df)
+
+
+def test_versions_are_deduplicated_and_pruned_by_age(tmp_path):
+    store = PriceStore(str(tmp_path))
+    first = store.put("NVDA", random_walk(seed=0, tz=NEW_YORK))
+    assert store.put("NVDA", random_walk(seed=0, tz=NEW_YORK)) == first  # same bars -> same version, nothing written
+
+    handles = [store.put("NVDA", random_walk(seed=seed, tz=NEW_YORK)) for seed in (1, 2, 3, 4)]
+    assert store.get("NVDA") == handles[-1]
+    # Still within retention
+    pd.testing.assert_frame_equal(as_frame(first), random_walk(seed=0, tz=NEW_YORK), check_freq=False)
+
+    held = as_frame(handles[0])  # mapped before the prune
+    PriceStore(str(tmp_path), retention=0).put("NVDA", random_walk(seed=5, tz=NEW_YORK))
+    assert os.listdir(tmp_path / "NVDA") == [store.get("NVDA").version]  # newest only
+    pd.testing.assert_frame_equal(held, random_walk(seed=1, tz=NEW_YORK), check_freq=False)
+
+
+def test_handle_survives_checkpoints_and_results_are_materialized(tmp_path):
+    df = random_walk(tz=NEW_YORK)
+    handle = PriceStore(str(tmp_path / "prices")).put("NVDA", df)
+
+    serde = SqliteCheckpointer(str(tmp_path / "checkpoints.sqlite")).serde
+    assert serde.loads_typed(serde.dumps_typed(handle)) == handle
+    assert len(pickle.dumps(handle)) < 500
+
+    stored = pickle.loads(pickle.dumps(materialize({"ticker": "NVDA", "price_history": handle})))
+    pd.testing.assert_frame_equal(stored["price_history"], df, check_freq=False)
+    assert as_frame(None) is None and as_frame(df) is df
+
+
+def test_market_data_node_puts_a_handle_in_the_state(tmp_path, monkeypatch):
+    store = PriceStore(str(tmp_path))
+    monkeypatch.setattr(nodes, "get_price_store", lambda: store)
+    df = random_walk(tz=NEW_YORK)
+
+    update = nodes._market_data_update({"ticker": "NVDA", "current_price": 1.0, "history_df": df})
+    assert isinstance(update["price_history"], price_store.PriceHandle)
+
+    # The next run gets the same cached frame: no re-hash, same handle
+    monkeypatch.setattr(store, "_arrays", lambda df: pytest.fail("re-hashed an unchanged frame"))
+    again = nodes._market_data_update({"ticker": "NVDA", "current_price": 1.0, "history_df": df})
+    assert again["price_history"] == update["price_history"]
+    assert nodes.technical_analysis_node({"ticker": "NVDA", "price_history": update["price_history"]}) == \
+        {"technicals": calculate_technicals(df)}
@@ -0,0 +1,124 @@
+import sys
+import os
+import asyncio
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from src.tools import rate_limit
+from src.tools.rate_limit import ProviderLimiter, RateLimitExceeded, TokenBucket, request_priority
+from tests.helpers import FakeClock
+
+
+class TooManyRequests(Exception):
+    status_code = 429
+
+
+def test_bucket_refills_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock)  # 1 per second, burst of 60
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now = 2.5
+    assert bucket.wait_time(2) == 0.0
+
+
+def test_token_budget_and_settle():
+    clock = FakeClock()
+    limiter = ProviderLimiter("groq", rpm=100, tpm=6000, clock=clock)
+    limiter.acquire(tokens=5000)
+    assert limiter._try(limiter._enqueue("interactive"), 5000) == pytest.approx(40.0)  # 4000 missing at 100/s
+    limiter._queue.clear()
+
+    limiter.settle(estimated=5000, actual=1200)  # refund the unused 3800 tokens
+    assert limiter.tokens.wait_time(4800) == 0.0
+
+
+def test_interactive_requests_preempt_batch():
+    limiter = ProviderLimiter("tavily", rpm=600)  # one slot every 0.1s once drained
+    limiter.requests.level = 0
+    order = []
+
+    async def caller(name, priority):
+        await limiter.aacquire(priority)
+        order.append(name)
+
+    async def main():
+        batch = [asyncio.create_task(caller(f"batch{i}", "batch")) for i in range(2)]
+        await asyncio.sleep(0.01)  # batch callers are queued first
+        interactive = asyncio.create_task(caller("interactive", "interactive"))
+        await asyncio.gather(*batch, interactive)
+
+    asyncio.run(main())
+    assert order[0] == "interactive"
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    fresh = ProviderLimiter("yfinance", rpm=6000)
+    monkeypatch.setattr(rate_limit, "_limiters", {"yfinance": fresh})
+    monkeypatch.setattr(rate_limit, "BACKOFF_BASE", 0.001)
+    return fresh
+
+
+def test_retries_429_with_backoff(limiter):
+    calls = {"n": 0}
+
+    def flaky():
+        calls["n"] += 1
+        if calls["n"] < 3:
+            raise TooManyRequests("slow down")
+        return "ok"
+
+    assert rate_limit.rate_limited("yfinance", flaky) == "ok"
+    assert calls["n"] == 3 and limiter.stats()["throttled"] == 2
+
+
+def test_gives_up_after_max_retries(limiter, monkeypatch):
+    monkeypatch.setattr(rate_limit, "MAX_RETRIES", 2)
+
+    def always_throttled():
+        raise TooManyRequests("slow down")
+
+    with pytest.raises(RateLimitExceeded):
+        rate_limit.rate_limited("yfinance", always_throttled)
+
+
+def test_flagged_results_are_retried_like_429(limiter, monkeypatch):
+    monkeypatch.setattr(rate_limit, "MAX_RETRIES", 2)
+    answers = iter([[], [], [1], [2]])
+
+    assert rate_limit.rate_limited("yfinance", lambda: next(answers), retry_if=lambda r: not r) == [1]
+    assert limiter.stats()["throttled"] == 2
+
+    always_empty = []
+    assert rate_limit.rate_limited("yfinance", lambda: always_empty, retry_if=lambda r: not r) is always_empty
+    assert limiter.stats()["throttled"] == 4  # gives up and returns the empty result, no RateLimitExceeded
+
+
+def test_other_errors_are_not_retried(limiter):
+    calls = {"n": 0}
+
+    def broken():
+        calls["n"] += 1
+        raise ValueError("bad ticker")
+
+    with pytest.raises(ValueError):
+        rate_limit.rate_limited("yfinance", broken)
+    assert calls["n"] == 1
+
+
+def test_async_path_uses_priority_context(limiter):
+    seen = []
+
+    async def call():
+        seen.append(rate_limit._priority.get())
+        return 1
+
+    async def main():
+        with request_priority("batch"):
+            return await rate_limit.arate_limited("yfinance", call)
+
+    assert asyncio.run(main()) == 1
+    assert seen == ["batch"] and limiter.stats()["queued"] == 0
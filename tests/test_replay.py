@@ -0,0 +1,49 @@
+import sys
+import os
+import asyncio
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from langchain_core.messages import HumanMessage, SystemMessage
+from src.agents import analyst
+from src.main import build_workflow
+from src.tools import market_data
+from src.tools.replay import FixtureStore, ReplayChatModel, replay_providers, synthetic_fixtures
+
+
+def test_fixtures_round_trip(tmp_path):
+    fixtures = synthetic_fixtures(["NVDA"], bars=40)
+    fixtures.save(str(tmp_path))
+    loaded = FixtureStore.load(str(tmp_path))
+
+    pd.testing.assert_frame_equal(loaded.market["NVDA"]["history"], fixtures.market["NVDA"]["history"],
+                                  check_freq=False)
+    assert loaded.news.keys() == fixtures.news.keys() and loaded.llm == fixtures.llm
+
+
+def test_graph_runs_offline_and_restores_providers():
+    real_yf, real_get_llm = market_data.yf, analyst.get_llm
+    fixtures = synthetic_fixtures(["NVDA", "AAPL"])
+    app = build_workflow().compile()
+
+    with replay_providers(fixtures, latency_scale=0):
+        result = app.invoke({"ticker": "NVDA", "revision_number": 0, "max_revisions": 2, "errors": []})
+        again = asyncio.run(app.ainvoke({"ticker": "NVDA", "revision_number": 0, "max_revisions": 2, "errors": []}))
+
+    assert result["market_data"]["current_price"] == round(fixtures.market["NVDA"]["history"]["Close"].iloc[-1], 2)
+    assert len(result["news"]) == 5 and "The Call:" in result["analyst_draft"]
+    assert again["analyst_draft"] == result["analyst_draft"]  # replay is deterministic
+    assert fixtures.stats["misses"] == 0
+    assert market_data.yf is real_yf and analyst.get_llm is real_get_llm
+
+
+def test_unrecorded_prompt_falls_back_to_same_agent():
+    fixtures = synthetic_fixtures(["NVDA"])
+    llm = ReplayChatModel(fixtures=fixtures, latency_scale=0)
+    review = [SystemMessage(content="You are a Risk Manager at a hedge fund."), HumanMessage(content="draft")]
+
+    reply = llm.invoke(review).content
+    assert reply.startswith("DECISION:") and llm.invoke(review).content == reply
+    assert fixtures.stats["fallbacks"] == 2
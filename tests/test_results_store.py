@@ -0,0 +1,168 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+import pandas as pd
+import pytest
+from src.main import build_workflow
+from src.tools import checkpoints
+from src.tools.checkpoints import SqliteCheckpointer, aresume_or_start, thread_config
+from src.tools.results_store import ResultsStore
+
+
+def final_state(ticker="NVDA"):
+    return {
+        "ticker": ticker, "max_revisions": 2, "revision_number": 1, "errors": [],
+        "market_data": {"current_price": 101.0}, "technicals": {"rsi": 55.0}, "news": [],
+        "analyst_draft": "memo", "critique": "APPROVE: ok",
+        "price_history": pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.bdate_range("2024-01-01", periods=2)),
+    }
+
+
+def test_latest_respects_freshness(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    old = store.save(final_state(), created_at=time.time() - 3600)
+    new = store.save(final_state(), timings={"total_seconds": 1.5})
+
+    latest = store.latest("nvda", max_age=60)
+    assert latest["run_id"] == new and latest["timings"] == {"total_seconds": 1.5}
+    assert latest["state"]["price_history"]["Close"].tolist() == [1.0, 2.0]
+    assert store.latest("NVDA", max_age=60, max_revisions=3) is None
+    assert store.get(old)["created_at"] < latest["created_at"]
+    assert store.latest("AAPL") is None
+
+
+def test_interrupted_run_resumes_from_last_node(tmp_path, monkeypatch):
+    calls = {"data_gatherer": 0, "analyst": 0}
+    fail = {"analyst": True}
+
+    def data_gatherer(state):
+        calls["data_gatherer"] += 1
+        return {"market_data": {"current_price": 1.0},
+                "price_history": pd.DataFrame({"Close": [1.0]}, index=pd.bdate_range("2024-01-01", periods=1))}
+
+    def analyst(state):
+        calls["analyst"] += 1
+        if fail["analyst"]:
+            raise RuntimeError("process died")
+        return {"analyst_draft": "memo", "revision_number": state["revision_number"] + 1}
+
+    fakes = {
+        "data_gatherer": data_gatherer,
+        "technicals": lambda state: {"technicals": {"rsi": 50.0}},
+        "news": lambda state: {"news": []},
+        "analyst": analyst,
+        "risk_manager": lambda state: {"critique": "APPROVE: ok"},
+    }
+    path = str(tmp_path / "checkpoints.sqlite")
+    initial = {"ticker": "NVDA", "revision_number": 0, "max_revisions": 1, "errors": []}
+
+    app = build_workflow(nodes=fakes).compile(checkpointer=SqliteCheckpointer(path))
+    with pytest.raises(RuntimeError):
+        asyncio.run(app.ainvoke(initial, thread_config("NVDA:1")))
+
+    # "Restart": a new checkpointer reads the thread back from disk
+    restarted = SqliteCheckpointer(path)
+    monkeypatch.setattr(checkpoints, "get_checkpointer", lambda: restarted)
+    app = build_workflow(nodes=fakes).compile(checkpointer=restarted)
+    fail["analyst"] = False
+
+    async def resume():
+        start = await aresume_or_start(app, "NVDA:1", initial)
+        assert start is None
+        return await app.ainvoke(start, thread_config("NVDA:1"))
+
+    result = asyncio.run(resume())
+    assert result["analyst_draft"] == "memo"
+    assert calls == {"data_gatherer": 1, "analyst": 2}
+
+    # A finished thread is cleared instead of being resumed
+    assert asyncio.run(aresume_or_start(app, "NVDA:1", initial)) is initial
+    assert "NVDA:1" not in SqliteCheckpointer(path).unfinished_threads()
+
+
+def test_unfinished_threads_expire(tmp_path, monkeypatch):
+    path = str(tmp_path / "checkpoints.sqlite")
+    def died(state):
+        raise RuntimeError("process died")
+
+    fakes = {"data_gatherer": died, "news": lambda state: {"news": []}}
+    app = build_workflow(nodes=fakes).compile(checkpointer=SqliteCheckpointer(path))
+    for thread_id in ("NVDA:1", "AAPL:2"):
+        with pytest.raises(RuntimeError):
+            app.invoke({"ticker": thread_id[:4], "revision_number": 0, "max_revisions": 1, "errors": []},
+                       thread_config(thread_id))
+
+    checkpointer = SqliteCheckpointer(path)
+    assert checkpointer.expire(max_age=900) == 0
+    assert set(checkpointer.unfinished_threads()) == {"NVDA:1", "AAPL:2"}
+
+    later = time.time() + 901
+    monkeypatch.setattr(checkpoints.time, "time", lambda: later)
+    assert checkpointer.expire(max_age=900) == 2
+    assert checkpointer.unfinished_threads() == {} and SqliteCheckpointer(path).unfinished_threads() == {}
+
+
+def test_finishing_run_does_not_expire_one_in_progress(tmp_path, monkeypatch):
+    from src import api
+
+    reached, release = threading.Event(), threading.Event()
+
+    def analyst(state):
+        if state["ticker"] == "AAPL":
+            reached.set()
+            assert release.wait(timeout=5)
+        return {"analyst_draft": f"memo {state['ticker']}", "revision_number": state["revision_number"] + 1}
+
+    fakes = {
+        "data_gatherer": lambda state: {"market_data": {"current_price": 1.0}},
+        "technicals": lambda state: {"technicals": {"rsi": 50.0}},
+        "news": lambda state: {"news": []},
+        "analyst": analyst,
+        "risk_manager": lambda state: {"critique": "APPROVE: ok"},
+    }
+    checkpointer = SqliteCheckpointer(str(tmp_path / "checkpoints.sqlite"))
+    app = build_workflow(nodes=fakes).compile(checkpointer=checkpointer)
+    monkeypatch.setattr(api, "get_checkpointed_app", lambda: app)
+    monkeypatch.setattr(api, "get_checkpointer", lambda: checkpointer)
+    monkeypatch.setattr(checkpoints, "get_checkpointer", lambda: checkpointer)
+    monkeypatch.setattr(api, "get_results_store", lambda: ResultsStore(str(tmp_path / "results.sqlite")))
+    monkeypatch.setattr(api, "ANALYSIS_FRESHNESS_SECONDS", 0)  # every idle thread counts as expired
+
+    async def main():
+        slow = asyncio.create_task(api._run_analysis("AAPL", 1, "AAPL:1:0"))
+        await asyncio.to_thread(reached.wait, 5)
+        fast, _, _ = await api._run_analysis("NVDA", 1, "NVDA:1:0")
+        in_progress = set(checkpointer.unfinished_threads())
+        release.set()
+        slow_result, _, _ = await slow
+        return fast, slow_result, in_progress
+
+    fast, slow, in_progress = asyncio.run(main())
+    assert in_progress == {"AAPL:1:0"}  # the finished run's expire() left the live one alone
+    assert fast["analyst_draft"] == "memo NVDA" and slow["analyst_draft"] == "memo AAPL"
+    assert checkpointer.unfinished_threads() == {}
+
+
+def test_latest_endpoint_reads_the_store(tmp_path, monkeypatch):
+    from src import api
+
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    monkeypatch.setattr(api, "get_results_store", lambda: store)
+
+    async def get(url):
+        transport = httpx.ASGITransport(app=api.api)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(url)
+
+    assert asyncio.run(get("/analysis/nvda/latest")).status_code == 404
+    run_id = store.save(final_state())
+    body = asyncio.run(get("/analysis/nvda/latest?max_age=60")).json()
+    assert body["run_id"] == run_id and body["analyst_draft"] == "memo"
+    assert body["age_seconds"] < 60 and body["price_history"]["index"] == ["2024-01-01", "2024-01-02"]
@@ -0,0 +1,111 @@
+import sys
+import os
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from src.agents import analyst
+from src.agents.analyst import affected_sections, merge_sections, split_sections
+from src.tools import llm_cache
+from tests.helpers import FakeLLM
+
+DRAFT = """Memo for NVDA
+### Executive Summary
+The Call: BUY
+Confidence Score: 80%
+### Fundamental Deep Dive
+P/E of 60 is rich but growth is 90%.
+### Technical Analysis
+RSI at 75 shows strong momentum.
+### Sentiment & News
+Headlines are upbeat [Source 1].
+### Risks
+Valuation compression.
+"""
+
+
+def test_split_round_trips_the_draft():
+    sections = split_sections(DRAFT)
+    assert [name for name, _ in sections] == ["", "Executive Summary", "Fundamental Deep Dive",
+                                             "Technical Analysis", "Sentiment & News", "Risks"]
+    assert "".join(text for _, text in sections) == DRAFT
+
+
+def test_merge_replaces_only_revised_sections():
+    revised = "### Technical Analysis\nRSI at 75 is overbought; wait for a pullback.\n" \
+              "### Executive Summary\nThe Call: HOLD\nConfidence Score: 65%\n"
+    merged = merge_sections(DRAFT, revised)
+
+    assert "The Call: HOLD" in merged and "The Call: BUY" not in merged
+    assert "wait for a pullback" in merged
+    assert "P/E of 60 is rich" in merged and "Valuation compression." in merged
+    assert [name for name, _ in split_sections(merged)] == [name for name, _ in split_sections(DRAFT)]
+
+
+def test_prose_lines_are_not_headings():
+    draft = DRAFT.replace("The Call: BUY\n", "The Call: BUY\nTechnical analysis confirms the uptrend.\n")
+    assert [name for name, _ in split_sections(draft)] == [name for name, _ in split_sections(DRAFT)]
+    assert "".join(text for _, text in split_sections(draft)) == draft
+
+
+@pytest.mark.parametrize("critique,expected", [
+    ("BUY call while RSI is 75 (> 70, overbought).", ["Executive Summary", "Technical Analysis"]),
+    ("The memo does not cite its news sources.", ["Sentiment & News"]),
+    ("Something is off.", ["Executive Summary"]),
+])
+def test_affected_sections(critique, expected):
+    assert affected_sections(critique) == expected
+
+
+def make_state(**overrides):
+    state = {
+        "ticker": "NVDA",
+        "market_data": {"current_price": 120.0},
+        "technicals": {"momentum": {"rsi": {"value": 75.0}}, "overall_signal": {"signal": "Hold"}},
+        "news": [{"title": f"Long headline {i}", "url": f"u{i}", "content": f"story{i} " * 80, "score": 0.5}
+                 for i in range(5)],
+        "analyst_draft": "",
+        "critique": "",
+        "revision_number": 0,
+    }
+    state.update(overrides)
+    return state
+
+
+def test_revision_patches_draft_with_shorter_prompt(monkeypatch):
+    llm = FakeLLM("### Executive Summary\nThe Call: HOLD\nConfidence Score: 65%\n"
+                       "### Technical Analysis\nOverbought; wait.\n")
+    monkeypatch.setattr(analyst, "get_llm", lambda temperature: llm)
+    monkeypatch.setattr(llm_cache, "llm_cache", None)
+
+    analyst.analyst_node(make_state())
+    update = analyst.analyst_node(make_state(analyst_draft=DRAFT, revision_number=1,
+                                             critique="BUY call while RSI is 75 (> 70, overbought)."))
+
+    full_prompt, revision_prompt = llm.prompts
+    assert len(revision_prompt) < len(full_prompt) / 2
+    assert "overbought" in revision_prompt and "Long headline" not in revision_prompt
+    assert "The Call: HOLD" in update["analyst_draft"]
+    assert "Headlines are upbeat" in update["analyst_draft"]
+
+
+def test_unstructured_draft_falls_back_to_full_rewrite(monkeypatch):
+    llm = FakeLLM("fresh memo")
+    monkeypatch.setattr(analyst, "get_llm", lambda temperature: llm)
+    monkeypatch.setattr(llm_cache, "llm_cache", None)
+
+    update = analyst.analyst_node(make_state(analyst_draft="free text memo", critique="Too aggressive."))
+    assert update["analyst_draft"] == "fresh memo"
+
+
+def test_revision_without_headings_falls_back_to_full_rewrite(monkeypatch):
+    llm = FakeLLM("Here is the revision:\nThe Call: HOLD\n", "### Executive Summary\nThe Call: HOLD\n")
+    monkeypatch.setattr(analyst, "get_llm", lambda temperature: llm)
+    monkeypatch.setattr(llm_cache, "llm_cache", None)
+
+    update = analyst.analyst_node(make_state(analyst_draft=DRAFT, revision_number=1,
+                                             critique="BUY call while RSI is 75 (> 70, overbought)."))
+    assert len(llm.prompts) == 2
+    assert "Long headline" in llm.prompts[1] and "overbought" in llm.prompts[1]  # full prompt, with the critique
+    assert update["analyst_draft"] == "### Executive Summary\nThe Call: HOLD\n"
@@ -0,0 +1,79 @@
+import sys
+import os
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from src.agents import risk_manager
+from src.agents.risk_rules import evaluate_rules, extract_call, extract_confidence
+from src.main import should_continue
+from src.tools import llm_cache
+from tests.helpers import FakeLLM
+
+
+def techs(rsi, signal):
+    return {"momentum": {"rsi": {"value": rsi, "signal": "Neutral"}}, "overall_signal": {"signal": signal}}
+
+
+def memo(call, confidence, extra=""):
+    return f"**Executive Summary:** The Call: {call}. Target $150.\nConfidence Score: {confidence}%\n{extra}"
+
+
+def test_extracts_call_and_confidence():
+    assert extract_call(memo("Strong Buy", 80)) == "BUY"
+    assert extract_call("We rate the stock a SELL given margins.") == "SELL"
+    assert extract_call("No view here.") is None
+    assert extract_call("**Executive Summary:** The Call (Buy/Sell): We issue a SELL on NVDA.") == "SELL"
+    assert extract_call("Recall the buyback. Format: BUY/SELL/HOLD. Verdict: hold.") == "HOLD"
+    assert extract_confidence(memo("BUY", 72.5)) == 72.5
+    assert extract_confidence("confident tone, no number") is None
+
+
+@pytest.mark.parametrize("call,rsi,signal", [("BUY", 75, "Hold"), ("SELL", 25, "Hold"), ("BUY", 50, "Sell")])
+def test_hard_rules_reject_without_llm(call, rsi, signal):
+    rules = evaluate_rules(memo(call, 80), techs(rsi, signal))
+    assert rules["violations"]
+
+
+def test_clean_memo_needs_no_judgement():
+    rules = evaluate_rules(memo("BUY", 80), techs(55, "Buy"))
+    assert rules["violations"] == [] and rules["judgement"] == []
+
+
+def test_judgement_checks_left_for_llm():
+    low_confidence = evaluate_rules(memo("BUY", 35), techs(55, "Buy"))
+    assert len(low_confidence["judgement"]) == 1
+
+    argued = evaluate_rules(memo("BUY", 80, "Despite the overall signal of Sell, ..."), techs(55, "Sell"))
+    assert argued["violations"] == [] and len(argued["judgement"]) == 1
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    fake = FakeLLM("DECISION: REJECT\nFEEDBACK: Tone too aggressive for 35% confidence.")
+    monkeypatch.setattr(risk_manager, "get_llm", lambda temperature: fake)
+    monkeypatch.setattr(llm_cache, "llm_cache", None)
+    return fake
+
+
+def test_node_skips_llm_when_rules_decide(llm):
+    approved = risk_manager.risk_manager_node({"analyst_draft": memo("BUY", 80), "technicals": techs(55, "Buy"),
+                                               "market_data": {}, "revision_number": 0})
+    rejected = risk_manager.risk_manager_node({"analyst_draft": memo("BUY", 80), "technicals": techs(75, "Buy"),
+                                               "market_data": {}, "revision_number": 0})
+    assert llm.calls == 0
+    assert approved["critique"].startswith("APPROVE")
+    assert "RSI is 75" in rejected["critique"]
+
+
+def test_node_asks_llm_for_judgement_only(llm):
+    update = risk_manager.risk_manager_node({"analyst_draft": memo("BUY", 35), "technicals": techs(55, "Buy"),
+                                             "market_data": {}, "revision_number": 0})
+    assert llm.calls == 1
+    assert update["critique"] == "Tone too aggressive for 35% confidence."
+
+
+def test_approval_ends_the_loop():
+    assert should_continue({"critique": "APPROVE: LGTM", "revision_number": 1, "max_revisions": 3}) == "end"
+    assert should_continue({"critique": "Cannot APPROVE a BUY at RSI 75", "revision_number": 1, "max_revisions": 3}) == "revision"
@@ -0,0 +1,54 @@
+import sys
+import os
+import asyncio
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.screener import run_screen, select_survivors
+from src.tools.replay import replay_providers, synthetic_fixtures
+
+UNIVERSE = ["NVDA", "AAPL", "MSFT", "AMZN", "GOOGL", "META"]
+
+
+def test_select_survivors_top_n_and_thresholds():
+    ranked = [
+        {"ticker": "A", "rank": 1, "score": 4, "adx": 35.0},
+        {"ticker": "B", "rank": 2, "score": -3, "adx": 18.0},
+        {"ticker": "C", "rank": 3, "score": -3, "adx": 30.0},
+        {"ticker": "D", "rank": 4, "score": 0, "adx": 40.0},
+    ]
+    assert [r["ticker"] for r in select_survivors(ranked, top_n=2)] == ["A", "B"]
+
+    survivors = select_survivors(ranked, top_n=1, min_score=3, min_adx=25)
+    assert [(r["ticker"], r["selected_by"]) for r in survivors] == [("A", ["top_n", "threshold"]), ("C", ["threshold"])]
+
+
+def test_screen_runs_agents_only_for_survivors():
+    fixtures = synthetic_fixtures(UNIVERSE)
+    stored = []
+    with replay_providers(fixtures, latency_scale=0):
+        report = asyncio.run(run_screen(UNIVERSE + ["NOPE"], top_n=2, on_result=lambda s, t: stored.append(s)))
+
+    assert report["screened"] == len(UNIVERSE) and report["unscreened"] == ["NOPE"]
+    scores = [abs(row["score"]) for row in report["ranking"]]
+    assert scores == sorted(scores, reverse=True)
+
+    survivors = [row["ticker"] for row in report["survivors"]]
+    assert survivors == [row["ticker"] for row in report["ranking"][:2]]
+    assert sorted(report["analyses"]) == sorted(survivors) == sorted(s["ticker"] for s in stored)
+    assert all("The Call:" in a["analyst_draft"] for a in report["analyses"].values())
+
+    llm = report["llm"]
+    assert llm["analyses_skipped"] == len(UNIVERSE) - 2
+    assert llm["calls_made"] >= 2  # the analyst at least once per survivor (rule-approved drafts skip the LLM review)
+    assert llm["calls_avoided_estimate"] == round(llm["analyses_skipped"] * llm["calls_made"] / 2)
+
+
+def test_dry_run_makes_no_llm_calls():
+    fixtures = synthetic_fixtures(UNIVERSE)
+    with replay_providers(fixtures, latency_scale=0):
+        report = asyncio.run(run_screen(UNIVERSE, top_n=3, analyze=False))
+
+    assert len(report["survivors"]) == 3 and report["analyses"] == {}
+    assert report["llm"]["calls_made"] == 0 and report["llm"]["calls_avoided_estimate"] == 2 * len(UNIVERSE)
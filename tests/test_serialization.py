@@ -0,0 +1,86 @@
+import sys
+import os
+import asyncio
+import json
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+from src.tools.results_store import ResultsStore
+from src.tools import serialization
+from src.tools.serialization import ARROW_MEDIA_TYPE, dumps, pa, price_history_columns
+
+
+def history():
+    return pd.DataFrame({
+        "Close": [101.123456789, np.nan, 103.5],
+        "Volume": [1_000_000, 2_000_000, 3_000_000],
+    }, index=pd.bdate_range("2024-01-01", periods=3, name="Date"))
+
+
+def test_columnar_json_round_trips():
+    body = json.loads(dumps({"price_history": price_history_columns(history())}))["price_history"]
+    assert body["index"] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert body["columns"]["Close"] == [101.123456789, None, 103.5]  # NaN -> null
+    assert body["columns"]["Volume"] == [1_000_000, 2_000_000, 3_000_000]
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    payload = {"price_history": price_history_columns(history()), "rsi": float("nan"), "nested": [{"x": np.inf}]}
+    fast = json.loads(dumps(payload))
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(dumps(payload)) == fast
+    assert fast["rsi"] is None and fast["nested"] == [{"x": None}]
+
+
+def test_float32_is_smaller_and_close():
+    full = dumps(price_history_columns(history()))
+    single = dumps(price_history_columns(history(), float32=True))
+    assert len(single) < len(full)
+    assert json.loads(single)["columns"]["Close"][0] == pytest.approx(101.123456789, rel=1e-6)
+
+
+@pytest.fixture
+def client_get(tmp_path, monkeypatch):
+    from src import api
+
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    store.save({
+        "ticker": "NVDA", "max_revisions": 2, "market_data": {"current_price": 103.5}, "technicals": {},
+        "news": [], "analyst_draft": "memo " * 400, "critique": "APPROVE: ok", "price_history": history(),
+    })
+    monkeypatch.setattr(api, "get_results_store", lambda: store)
+
+    def get(url, **headers):
+        async def main():
+            transport = httpx.ASGITransport(app=api.api)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.get(url, headers=headers)
+        return asyncio.run(main())
+
+    return get
+
+
+def test_records_format_still_available(client_get):
+    body = client_get("/analysis/NVDA/latest?price_format=records").json()
+    assert [row["Date"] for row in body["price_history"]][0].startswith("2024-01-01")
+
+
+def test_large_json_is_gzipped_on_request(client_get):
+    response = client_get("/analysis/NVDA/latest", **{"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["analyst_draft"].startswith("memo")
+
+
+@pytest.mark.skipif(pa is None, reason="pyarrow not installed")
+def test_arrow_negotiation(client_get):
+    response = client_get("/analysis/NVDA/latest", Accept=ARROW_MEDIA_TYPE)
+    assert response.headers["content-type"] == ARROW_MEDIA_TYPE
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column("Close").to_pylist()[2] == 103.5
+    result = json.loads(table.schema.metadata[b"result"])
+    assert result["ticker"] == "NVDA" and "price_history" not in result
@@ -0,0 +1,132 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+import pytest
+from src.tools import market_data
+from src.tools.results_store import ResultsStore
+from src.tools.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight("test")
+    calls = {"n": 0}
+
+    def slow():
+        calls["n"] += 1
+        time.sleep(0.1)
+        return "value"
+
+    with ThreadPoolExecutor(5) as pool:
+        results = list(pool.map(lambda _: flight.do("NVDA", slow), range(5)))
+
+    assert calls["n"] == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(value == "value" for value, _ in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_followers_see_the_leaders_error():
+    flight = SingleFlight("test")
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("provider down")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", failing)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    leader.join(); follower.join()
+    assert errors == ["provider down", "provider down"]
+
+
+def test_async_flight_survives_a_cancelled_caller():
+    flight = AsyncSingleFlight("test")
+    calls = {"n": 0}
+
+    async def slow():
+        calls["n"] += 1
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        first = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()  # first client goes away
+        return await second
+
+    assert asyncio.run(main()) == (42, True)
+    assert calls["n"] == 1
+
+
+def test_fetch_market_data_is_coalesced(monkeypatch):
+    calls = {"n": 0}
+
+    def fake_fetch(ticker, history=None):
+        calls["n"] += 1
+        time.sleep(0.1)
+        return {"ticker": ticker, "history_df": "frame"}
+
+    monkeypatch.setattr(market_data, "_fetch_market_data", fake_fetch)
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: market_data.fetch_market_data("nvda"), range(4)))
+
+    assert calls["n"] == 1
+    results[0].pop("history_df")  # nodes pop keys; other callers keep theirs
+    assert all(r["history_df"] == "frame" for r in results[1:])
+
+
+def test_identical_analyze_requests_share_a_graph_run(monkeypatch, tmp_path):
+    from src import api
+
+    runs = {"n": 0}
+
+    class FakeApp:
+        async def aget_state(self, config):
+            return SimpleNamespace(next=(), values={})
+
+        async def ainvoke(self, state, config):
+            runs["n"] += 1
+            await asyncio.sleep(0.1)
+            return {**state, "analyst_draft": "memo"}
+
+    monkeypatch.setattr(api, "get_checkpointed_app", lambda: FakeApp())
+    monkeypatch.setattr(api, "get_checkpointer", lambda: SimpleNamespace(delete_thread=lambda thread_id: None,
+                                                                    expire=lambda max_age: 0,
+                                                                    running=lambda thread_id: nullcontext()))
+    monkeypatch.setattr(api, "get_results_store", lambda: ResultsStore(str(tmp_path / "results.sqlite")))
+    monkeypatch.setattr(api, "analysis_flight", AsyncSingleFlight("analysis"))
+
+    async def main():
+        transport = httpx.ASGITransport(app=api.api)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/analyze", json={"ticker": "nvda"}) for _ in range(3)))
+
+    responses = asyncio.run(main())
+    assert runs["n"] == 1
+    bodies = [r.json() for r in responses]
+    assert all(b["analyst_draft"] == "memo" for b in bodies)
+    assert sum(bool(b["timings"].get("coalesced")) for b in bodies) == 2
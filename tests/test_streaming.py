@@ -0,0 +1,39 @@
+import sys
+import os
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from typing import TypedDict
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import StateGraph, START, END
+from src.streaming import iter_events
+
+
+class MiniState(TypedDict):
+    ticker: str
+    analyst_draft: str
+
+
+def build_app():
+    def analyst(state):
+        llm = GenericFakeChatModel(messages=iter([AIMessage(content="BUY NVDA, confidence 80%")]))
+        return {"analyst_draft": llm.invoke([HumanMessage(content=state["ticker"])]).content}
+
+    graph = StateGraph(MiniState)
+    graph.add_node("analyst", analyst)
+    graph.add_edge(START, "analyst")
+    graph.add_edge("analyst", END)
+    return graph.compile()
+
+
+def test_tokens_arrive_before_node_completion_and_result():
+    events = list(iter_events(build_app(), {"ticker": "NVDA"}))
+    types = [e["type"] for e in events]
+
+    tokens = [e["content"] for e in events if e["type"] == "token"]
+    assert len(tokens) > 1
+    assert "".join(tokens) == "BUY NVDA, confidence 80%"
+    assert types.index("node") > types.index("token")
+    assert events[-1] == {"type": "result", "state": {"ticker": "NVDA", "analyst_draft": "BUY NVDA, confidence 80%"}}
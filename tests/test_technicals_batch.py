@@ -0,0 +1,40 @@
+import sys
+import os
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.technicals import calculate_technicals
+from src.tools.technicals_batch import build_panels, calculate_technicals_batch
+from tests.helpers import assert_same, random_walk
+
+
+def test_batch_matches_per_ticker_path():
+    # Ragged lengths: the panel has NaN padding for the shorter histories
+    histories = {f"T{i}": random_walk(bars, seed=i) for i, bars in enumerate([250, 210, 126, 60, 28])}
+
+    batch = calculate_technicals_batch(*build_panels(histories))
+
+    for ticker, hist in histories.items():
+        assert_same(calculate_technicals(hist), batch[ticker], ticker)
+
+
+def test_batch_reports_short_histories_as_errors():
+    histories = {"LONG": random_walk(120, seed=1), "SHORT": random_walk(10, seed=2)}
+
+    batch = calculate_technicals_batch(*build_panels(histories))
+
+    assert batch["LONG"]["success"] is True
+    assert "error" in batch["SHORT"]
+
+
+def test_sma_cross_needs_its_warmup():
+    full = calculate_technicals(random_walk(210, seed=3))
+    short = calculate_technicals(random_walk(120, seed=3))
+
+    assert full["trend"]["sma"]["signal"] in ("Bullish", "Bearish")
+    assert short["trend"]["sma"]["signal"] == "Insufficient data"
+    assert "Price above SMA support" not in short["overall_signal"]["reasoning"]
+
+    # MACD's signal line isn't defined before MACD_SLOW + MACD_SIGNAL - 1 bars, so that is the minimum
+    assert "error" in calculate_technicals(random_walk(30, seed=3))
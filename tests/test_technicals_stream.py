@@ -0,0 +1,50 @@
+import sys
+import os
+import json
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from src.tools.technicals import calculate_technicals
+from src.tools.technicals_stream import RollingStats, StreamingTechnicals
+from tests.helpers import assert_same, random_walk
+
+
+def test_stream_matches_full_recompute_bar_by_bar():
+    df = random_walk(240, seed=7)
+    stream = StreamingTechnicals.from_history(df.iloc[:30])
+
+    for i in range(30, len(df)):
+        bar = df.iloc[i]
+        stream.update(bar["High"], bar["Low"], bar["Close"], timestamp=df.index[i])
+        assert_same(calculate_technicals(df.iloc[:i + 1]), stream.result(), f"bar {i}")
+
+
+def test_snapshot_restore_round_trip():
+    df = random_walk(220, seed=11)
+    stream = StreamingTechnicals.from_history(df.iloc[:-1])
+
+    restored = StreamingTechnicals.restore(json.loads(json.dumps(stream.snapshot())))
+    last = df.iloc[-1]
+    stream.update(last["High"], last["Low"], last["Close"])
+    restored.update(last["High"], last["Low"], last["Close"])
+
+    assert_same(stream.result(), restored.result())
+    assert restored.last_timestamp == df.index[-2].isoformat()
+
+
+def test_not_enough_bars():
+    stream = StreamingTechnicals.from_history(random_walk(10, seed=1))
+    assert "error" in stream.result()
+
+
+def test_rolling_stats_do_not_drift():
+    rng = np.random.default_rng(3)
+    closes = 5_000 + np.cumsum(rng.normal(0, 1, 200_000))
+    stats = RollingStats(20)
+    for close in closes:
+        stats.update(float(close))
+
+    assert abs(stats.mean - closes[-20:].mean()) <= 1e-9
+    assert abs(stats.std / closes[-20:].std() - 1) <= 1e-9
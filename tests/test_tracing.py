@@ -0,0 +1,77 @@
+import sys
+import os
+import asyncio
+
+# Fix path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from src.main import build_workflow
+from src.tools import tracing
+from tests.helpers import ARTICLE, FakeLLM, fake_market_data, initial_state, patch_providers
+
+
+def traced_market_data(ticker, history=None):
+    tracing.record_call("yfinance", 2048)
+    return fake_market_data(ticker, history)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    llm = FakeLLM(usage={"input_tokens": 100, "output_tokens": 20, "total_tokens": 120})
+
+    def get_news(query):
+        tracing.record_call("tavily", 512)
+        return [ARTICLE]
+
+    patch_providers(monkeypatch, llm, market_data=traced_market_data, news=get_news)
+    return build_workflow().compile()
+
+
+def test_trace_breaks_down_a_run(app):
+    with tracing.start_trace() as trace:
+        app.invoke(initial_state())
+    summary = trace.summary()
+
+    assert set(summary["by_node"]) == {"data_gatherer", "technicals", "news", "analyst", "risk_manager"}
+    assert all(entry["status"] == "ok" for entry in summary["nodes"])
+    assert summary["external_calls"] == {"yfinance": 1, "tavily": 1, "groq": 2}
+    assert summary["payload_bytes"]["yfinance"] == 2048
+    assert summary["llm_tokens"] == {"prompt": 200, "completion": 40}
+    assert summary["revisions"] == 0
+
+
+def test_async_run_is_traced_too(app):
+    async def run():
+        with tracing.start_trace() as trace:
+            await app.ainvoke(initial_state())
+        return trace.summary()
+
+    summary = asyncio.run(run())
+    assert summary["external_calls"]["groq"] == 2
+    assert "analyst" in summary["by_node"]
+
+
+def test_metrics_are_attributed_to_nodes(app):
+    before = tracing.LLM_TOKENS.value("analyst", "prompt")
+    runs_before = tracing.NODE_RUNS.value("news", "ok")
+
+    app.invoke(initial_state())  # no trace active -> only the process-wide metrics record
+
+    assert tracing.LLM_TOKENS.value("analyst", "prompt") == before + 100
+    assert tracing.NODE_RUNS.value("news", "ok") == runs_before + 1
+    text = tracing.render_prometheus()
+    assert '# TYPE agent_node_duration_seconds histogram' in text
+    assert 'agent_node_duration_seconds_bucket{node="analyst",le="+Inf"}' in text
+    assert 'agent_external_calls_total{provider="tavily",node="news"}' in text
+
+
+def test_node_exception_is_recorded_and_reraised():
+    def boom(state):
+        raise RuntimeError("provider down")
+
+    wrapped = tracing.traced_node("boom", boom)
+    with tracing.start_trace() as trace:
+        with pytest.raises(RuntimeError):
+            wrapped({})
+    assert trace.summary()["nodes"][0]["status"] == "exception"